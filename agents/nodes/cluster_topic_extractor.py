@@ -0,0 +1,59 @@
+"""
+Topic discovery from the existing chunk embeddings, with no LLM calls.
+
+The vectors in ``embeddings/vector_store`` are clustered with k-means, and
+each cluster is named from its top TF-IDF terms and source files (see
+``tools/topic_clusters.py``). The run is fast, free and deterministic for a
+given seed, and it covers every chunk in the corpus.
+"""
+from typing import Optional
+
+from agents.state import TutorAgentState
+from tools.ann_index import FLAT_INDEX_FILE
+from tools.chunk_store import open_corpus
+from tools.topic_assignments import save_topics
+from tools.topic_clusters import DEFAULT_INDEX_DIR, DEFAULT_SEED, MIN_CLUSTER_CHUNKS, cluster_topics, load_vectors
+
+
+async def cluster_extract_topics_from_docs(
+    state: TutorAgentState,
+    k: Optional[int] = None,
+    seed: int = DEFAULT_SEED,
+    min_chunks: int = MIN_CLUSTER_CHUNKS,
+) -> TutorAgentState:
+    """
+    Extract topics by clustering the indexed chunk embeddings.
+
+    Parameters
+    ----------
+    state : TutorAgentState
+        ``state.topics`` is replaced with the discovered topics.
+    k : int, optional
+        Number of clusters; defaults to ``tools.topic_clusters.default_clusters``.
+    seed : int
+        Seed for the k-means initialisation.
+    min_chunks : int
+        Clusters with fewer chunks are not reported as topics.
+    """
+
+    docs = open_corpus()
+    if docs is None or not (DEFAULT_INDEX_DIR / FLAT_INDEX_FILE).exists():
+        print("❌ No indexed documentation found. Please run tools/prep_docs.py first.")
+        state.topics = []
+        return state
+
+    vectors = load_vectors(DEFAULT_INDEX_DIR)
+    print(f"📚 Clustering {len(docs)} documentation chunk embeddings into topics...")
+    topics = cluster_topics(docs, vectors, k, seed, min_chunks)
+
+    per_category = {category: sum(t["category"] == category for t in topics) for category in ("LangChain", "LangGraph")}
+    print(f"✅ Found {per_category['LangChain']} LangChain topics and {per_category['LangGraph']} LangGraph topics")
+
+    state.topics = topics
+
+    # Save the extracted topics
+    extracted_topics_path = save_topics(topics, docs.fingerprint(), "clusters")
+
+    print(f"💾 Saved {len(topics)} topics to {extracted_topics_path}")
+
+    return state
@@ -3,12 +3,11 @@
 import json
 from typing import List
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from tools.clients import get_chat_model
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
 from agents.state import TutorAgentState
 from agents.types import ConceptQuestion
+from tools.retrieval import search_docs
 
 # Load environment variables
 load_dotenv(override=True)
@@ -67,17 +66,10 @@ async def search_documentation_references(state: TutorAgentState) -> TutorAgentS
         return state
     
     try:
-        # Load vector store for documentation search
-        embeddings = OpenAIEmbeddings()
-        vectorstore = FAISS.load_local(
-            "embeddings/vector_store", 
-            embeddings,
-            allow_dangerous_deserialization=True
-        )
-        
-        # Perform semantic search with more results for doc search
+        # Hybrid (lexical + semantic) search with more results for doc search
         search_query = f"documentation reference for {state.user_input} {state.target_concept_id or ''}"
-        docs = vectorstore.similarity_search(search_query, k=8)  # More results for comprehensive search
+        # More results for comprehensive search, within the target topic's category
+        docs = search_docs(search_query, k=8, topic_id=state.target_concept_id)
         
         if not docs:
             state.questions = [ConceptQuestion(
@@ -106,7 +98,7 @@ async def search_documentation_references(state: TutorAgentState) -> TutorAgentS
         context = "\n\n---\n\n".join(doc_content)
         
         # Generate documentation search response
-        llm = ChatOpenAI(temperature=0.1)  # Low temperature for precise references
+        llm = get_chat_model("doc_search")  # Low temperature for precise references
         prompt_messages = PROMPT_TEMPLATE.format_messages(
             query=state.user_input, 
             context=context
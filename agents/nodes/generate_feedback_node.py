@@ -1,26 +1,64 @@
-"""Node that generates feedback on the user's answer."""
+"""Node that generates feedback on the user's answer.
+
+Grading results are cached on disk (see ``tools/feedback_cache.py``), so a
+repeated question/answer/context combination is answered without an LLM call.
+:func:`stream_feedback` yields the feedback as it is generated, for the CLI
+and the Gradio UI.
+"""
+
+import hashlib
+import json
+import time
+from typing import Any, AsyncIterator, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from agents.state import TutorAgentState
 from prompts.feedback_prompt import FEEDBACK_PROMPT
+from tools.clients import chat_settings, get_chat_model
+from tools.feedback_cache import feedback_key, get_feedback_cache
+from tools.streaming import stream_text
 
 
 # Load environment variables so the OpenAI API key is picked up from .env
 load_dotenv(override=True)
 
-# Instantiate the model once at module import time. Using a fixed temperature
+# The shared, pooled "feedback" model (gpt-4). Using a fixed temperature
 # encourages consistent feedback phrasing.
-_llm = ChatOpenAI(model="gpt-4", temperature=0)
+def _llm():
+    return get_chat_model("feedback")
+
+
 _prompt = ChatPromptTemplate.from_messages(FEEDBACK_PROMPT)
 
+# Everything besides the inputs that changes the grading; part of every cache key
+_cache_settings = {
+    **chat_settings("feedback"),
+    "prompt": hashlib.sha256(json.dumps(FEEDBACK_PROMPT).encode("utf-8")).hexdigest(),
+}
 
-async def generate_feedback(state: TutorAgentState) -> TutorAgentState:
-    """Evaluate the user's answer and provide constructive feedback."""
-    if not state.current_question:
-        return state
 
+def _is_correct(feedback_text: str) -> bool:
+    """More robust correct answer detection on the finished feedback text."""
+    lowered = feedback_text.lower()
+    return (
+        lowered.startswith("correct") or 
+        "correct!" in lowered or
+        "your answer is correct" in lowered or
+        "you're right" in lowered or
+        "that's right" in lowered or
+        "good job" in lowered or
+        "you're on the right track!" in lowered or
+        lowered.startswith("you're on the right track")
+    )
+
+
+def _prepare(state: TutorAgentState) -> Tuple[Optional[Tuple[str, bool]], Any, str, List[Any]]:
+    """Look up the cache and build the prompt.
+
+    Returns ``(cached, cache, cache_key, messages)``; ``cached`` is the
+    earlier ``(feedback, correct)`` result for identical inputs, if any.
+    """
     question = state.current_question.text
     user_answer = state.user_input
     
@@ -30,36 +68,56 @@ async def generate_feedback(state: TutorAgentState) -> TutorAgentState:
         # Use the first chunk as context to help the LLM understand the topic better
         context_info = f"\nRELEVANT DOCUMENTATION CONTEXT:\n{state.retrieved_chunks[0][:500]}...\n"
     
-    # Create enhanced prompt messages with context
+    # Reuse the grading of an identical earlier attempt
+    cache = get_feedback_cache()
+    cache_key = feedback_key(_cache_settings, question, user_answer, context_info)
     try:
-        # Format the base prompt
-        base_messages = _prompt.format_messages(question=question, answer=user_answer)
-        
-        # If we have context, add it to the system message
-        if context_info:
-            system_message = base_messages[0]
-            enhanced_system_content = system_message.content + context_info
-            base_messages[0].content = enhanced_system_content
-        
-        result = await _llm.ainvoke(base_messages)
-        feedback_text = result.content.strip()
-        
-        # More robust correct answer detection
-        correct_flag = (
-            feedback_text.lower().startswith("correct") or 
-            "correct!" in feedback_text.lower() or
-            "your answer is correct" in feedback_text.lower() or
-            "you're right" in feedback_text.lower() or
-            "that's right" in feedback_text.lower() or
-            "good job" in feedback_text.lower() or
-            "you're on the right track!" in feedback_text.lower() or
-            feedback_text.lower().startswith("you're on the right track")
-        )
-        
-        # Update state fields directly
-        state.last_feedback = feedback_text
-        state.last_correct = correct_flag
+        cached = cache.get(cache_key)
+    except Exception as e:
+        print(f"⚠️ Feedback cache unavailable: {e}")
+        cache, cached = None, None
+    
+    # Format the base prompt
+    base_messages = _prompt.format_messages(question=question, answer=user_answer)
+    
+    # If we have context, add it to the system message
+    if context_info:
+        system_message = base_messages[0]
+        enhanced_system_content = system_message.content + context_info
+        base_messages[0].content = enhanced_system_content
+    return cached, cache, cache_key, base_messages
+
+
+def _finish(state: TutorAgentState, feedback_text: str, latency: float, cache: Any, cache_key: str) -> None:
+    """Grade the complete feedback text, cache it and update the state."""
+    feedback_text = feedback_text.strip()
+    correct_flag = _is_correct(feedback_text)
+    
+    if cache is not None:
+        try:
+            cache.put(cache_key, feedback_text, correct_flag, latency)
+        except Exception as e:
+            print(f"⚠️ Could not cache feedback: {e}")
+    
+    # Update state fields directly
+    state.last_feedback = feedback_text
+    state.last_correct = correct_flag
+
+
+async def generate_feedback(state: TutorAgentState) -> TutorAgentState:
+    """Evaluate the user's answer and provide constructive feedback."""
+    if not state.current_question:
+        return state
+
+    try:
+        cached, cache, cache_key, messages = _prepare(state)
+        if cached is not None:
+            state.last_feedback, state.last_correct = cached
+            return state
         
+        started = time.perf_counter()
+        result = await _llm().ainvoke(messages)
+        _finish(state, result.content, time.perf_counter() - started, cache, cache_key)
         return state
     except Exception as e:
         state.last_feedback = f"[⚠️] Error generating feedback: {e}"
@@ -67,5 +125,46 @@ async def generate_feedback(state: TutorAgentState) -> TutorAgentState:
         return state
 
 
+async def stream_feedback(state: TutorAgentState) -> AsyncIterator[str]:
+    """Streaming variant of :func:`generate_feedback`.
+
+    Yields the feedback text as the model produces it (a cached result is
+    yielded in one piece). ``state.last_feedback`` and ``state.last_correct``
+    are set once the stream completes; time to first token is recorded under
+    ``"feedback"`` (see ``tools/streaming.py``).
+
+    Parameters
+    ----------
+    state : TutorAgentState
+        State with ``current_question`` and the answer in ``user_input``;
+        updated in place.
+
+    Yields
+    ------
+    str
+        Pieces of the feedback text.
+    """
+    if not state.current_question:
+        return
+
+    try:
+        cached, cache, cache_key, messages = _prepare(state)
+        if cached is not None:
+            state.last_feedback, state.last_correct = cached
+            yield state.last_feedback
+            return
+        
+        started = time.perf_counter()
+        pieces = []
+        async for text in stream_text(_llm(), messages, "feedback"):
+            pieces.append(text)
+            yield text
+        _finish(state, "".join(pieces), time.perf_counter() - started, cache, cache_key)
+    except Exception as e:
+        state.last_feedback = f"[⚠️] Error generating feedback: {e}"
+        state.last_correct = False
+        yield state.last_feedback
+
+
 # Alias used when adding this node to a graph
 node = generate_feedback
\ No newline at end of file
@@ -1,14 +1,19 @@
-"""Node for generating questions from retrieved documentation."""
+"""Node for generating questions from retrieved documentation.
 
-import json
-from pathlib import Path
-from typing import List
+:func:`stream_questions` yields the questions as they are written; the graph
+node consumes it, so the CLI and the Gradio UI stream through the graph.
+"""
+
+from typing import Any, AsyncIterator, List, Optional, Tuple
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from agents.state import TutorAgentState
 from agents.types import ConceptQuestion
 from prompts.question_generation_prompt import QUESTION_GENERATION_PROMPT
+from tools.clients import get_chat_model
+from tools.notices import notice
+from tools.question_bank import asked_questions, serve_questions, split_questions, usable_chunk
+from tools.streaming import stream_text
 
 
 # Load environment variables
@@ -18,52 +23,28 @@ load_dotenv(override=True)
 PROMPT_TEMPLATE = ChatPromptTemplate.from_messages(QUESTION_GENERATION_PROMPT)
 
 
-async def generate_concept_and_code_questions(state: TutorAgentState) -> TutorAgentState:
-    """Generate concept and code questions based on retrieved documentation.
-
-    The function concatenates up to four of the retrieved document chunks into a
-    single context string, skipping chunks that are too short or likely to be
-    headings. If insufficient context is available, a simple fallback question
-    based on the ``target_concept_id`` is used instead.
-
-    This function now also checks previously asked questions to avoid repetition.
-
-    Parameters
-    ----------
-    state : TutorAgentState
-        The current agent state containing ``retrieved_chunks`` and the target
-        concept ID.
+def _prepare(state: TutorAgentState) -> Tuple[Optional[List[ConceptQuestion]], Optional[List[Any]], List[str]]:
+    """Serve from the bank or a fallback, or build the generation prompt.
 
-    Returns
-    -------
-    TutorAgentState
-        The updated state with a list of ``ConceptQuestion`` objects on
-        ``state.questions``.
+    Returns ``(questions, prompt_messages, previously_asked)``; exactly one
+    of ``questions`` and ``prompt_messages`` is set.
     """
+    # Serve pre-generated questions while the topic's bank pool lasts
+    banked = serve_questions(state.target_concept_id)
+    if banked is not None:
+        notice(f"🏦 Serving {len(banked['questions'])} pre-generated questions")
+        state.retrieved_chunks = banked["chunks"]
+        questions = [ConceptQuestion(concept_id=state.target_concept_id, text=text) for text in banked["questions"]]
+        return questions, None, []
+
     if not state.retrieved_chunks:
         raise ValueError("No documentation chunks provided.")
 
     # Load previously asked questions to avoid repetition
-    previously_asked = []
-    question_log_path = Path("logs/question_log.json")
-    if question_log_path.exists() and question_log_path.stat().st_size > 0:
-        try:
-            with open(question_log_path, "r", encoding="utf-8") as f:
-                past_questions = json.load(f)
-                # Get questions for the same concept
-                previously_asked = [
-                    entry["question"] for entry in past_questions
-                    if entry.get("concept_id") == state.target_concept_id
-                ]
-        except (json.JSONDecodeError, Exception) as e:
-            print(f"[⚠️] Could not load question log: {e}")
+    previously_asked = asked_questions(state.target_concept_id)
 
     # Filter out very short chunks or ones that look like headings
-    filtered_chunks: List[str] = [
-        chunk
-        for chunk in state.retrieved_chunks
-        if len(chunk.strip()) > 80 and not chunk.strip().startswith(("-", "|", "#"))
-    ]
+    filtered_chunks: List[str] = [chunk for chunk in state.retrieved_chunks if usable_chunk(chunk)]
 
     context_str = "\n\n".join(filtered_chunks[:4])
 
@@ -85,66 +66,130 @@ async def generate_concept_and_code_questions(state: TutorAgentState) -> TutorAg
             # If all fallbacks have been used, add some variation
             chosen_question = f"Can you provide more details about '{state.target_concept_id}' and its applications?"
         
-        state.questions = [ConceptQuestion(concept_id=state.target_concept_id or "unknown", text=chosen_question)]
-        return state
+        return [ConceptQuestion(concept_id=state.target_concept_id or "unknown", text=chosen_question)], None, previously_asked
 
     # Format the prompt with the context and previously asked questions
-    try:
-        # Create an enhanced prompt that includes previously asked questions
-        context_with_history = context_str
-        if previously_asked:
-            context_with_history += f"\n\nPreviously asked questions to avoid repeating:\n" + "\n".join(f"- {q}" for q in previously_asked[-5:])  # Show last 5
-        
-        prompt_messages = PROMPT_TEMPLATE.format_messages(context=context_with_history)
-        llm = ChatOpenAI(temperature=0.3)
-        response = await llm.ainvoke(prompt_messages)
-        raw_output = response.content.strip()
-
-        # Split the output into individual questions, stripping bullets and whitespace
-        questions = []
-        for q in raw_output.split("\n"):
-            if q.strip():
-                question_text = q.strip("- ").strip()
-                # Only add questions that haven't been asked before
-                if question_text not in previously_asked and question_text not in [qu.text for qu in questions]:
-                    questions.append(ConceptQuestion(concept_id=state.target_concept_id or "unknown", text=question_text))
-        
-        # If no new questions were generated, fall back to a diverse question
-        if not questions:
-            fallback_questions = [
-                f"What advanced features of '{state.target_concept_id}' should developers know?",
-                f"How does '{state.target_concept_id}' integrate with other LangChain components?",
-                f"What are some best practices when using '{state.target_concept_id}'?",
-                f"Can you explain the architecture behind '{state.target_concept_id}'?",
-                f"What are common use cases for '{state.target_concept_id}'?"
-            ]
-            
-            available_fallbacks = [q for q in fallback_questions if q not in previously_asked]
-            if available_fallbacks:
-                chosen_question = available_fallbacks[0]
-                questions = [ConceptQuestion(concept_id=state.target_concept_id or "unknown", text=chosen_question)]
-        
-        state.questions = questions
-        
-    except Exception as e:
-        print(f"[⚠️] Error generating questions: {e}")
-        # Use a diverse fallback that hasn't been asked
+    context_with_history = context_str
+    if previously_asked:
+        context_with_history += f"\n\nPreviously asked questions to avoid repeating:\n" + "\n".join(f"- {q}" for q in previously_asked[-5:])  # Show last 5
+    
+    return None, PROMPT_TEMPLATE.format_messages(context=context_with_history), previously_asked
+
+
+def _parse_questions(state: TutorAgentState, raw_output: str, previously_asked: List[str]) -> List[ConceptQuestion]:
+    """Turn the model output into new questions, with a fallback if none are new."""
+    # Split the output into individual questions, stripping bullets and whitespace
+    questions = []
+    for question_text in split_questions(raw_output):
+        # Only add questions that haven't been asked before
+        if question_text not in previously_asked and question_text not in [qu.text for qu in questions]:
+            questions.append(ConceptQuestion(concept_id=state.target_concept_id or "unknown", text=question_text))
+    
+    # If no new questions were generated, fall back to a diverse question
+    if not questions:
         fallback_questions = [
-            f"What is the purpose of '{state.target_concept_id}' in LangChain?",
-            f"How do you implement '{state.target_concept_id}' in your applications?",
-            f"What makes '{state.target_concept_id}' unique in the LangChain ecosystem?"
+            f"What advanced features of '{state.target_concept_id}' should developers know?",
+            f"How does '{state.target_concept_id}' integrate with other LangChain components?",
+            f"What are some best practices when using '{state.target_concept_id}'?",
+            f"Can you explain the architecture behind '{state.target_concept_id}'?",
+            f"What are common use cases for '{state.target_concept_id}'?"
         ]
         
         available_fallbacks = [q for q in fallback_questions if q not in previously_asked]
         if available_fallbacks:
             chosen_question = available_fallbacks[0]
-        else:
-            chosen_question = f"Please explain your understanding of '{state.target_concept_id}' in detail."
-        
-        state.questions = [ConceptQuestion(concept_id=state.target_concept_id or "unknown", text=chosen_question)]
+            questions = [ConceptQuestion(concept_id=state.target_concept_id or "unknown", text=chosen_question)]
     
+    return questions
+
+
+def _error_fallback(state: TutorAgentState, previously_asked: List[str]) -> List[ConceptQuestion]:
+    """Question to ask when generation fails."""
+    # Use a diverse fallback that hasn't been asked
+    fallback_questions = [
+        f"What is the purpose of '{state.target_concept_id}' in LangChain?",
+        f"How do you implement '{state.target_concept_id}' in your applications?",
+        f"What makes '{state.target_concept_id}' unique in the LangChain ecosystem?"
+    ]
+    
+    available_fallbacks = [q for q in fallback_questions if q not in previously_asked]
+    if available_fallbacks:
+        chosen_question = available_fallbacks[0]
+    else:
+        chosen_question = f"Please explain your understanding of '{state.target_concept_id}' in detail."
+    
+    return [ConceptQuestion(concept_id=state.target_concept_id or "unknown", text=chosen_question)]
+
+
+async def generate_concept_and_code_questions(state: TutorAgentState) -> TutorAgentState:
+    """Generate concept and code questions based on retrieved documentation.
+
+    The function concatenates up to four of the retrieved document chunks into a
+    single context string, skipping chunks that are too short or likely to be
+    headings. If insufficient context is available, a simple fallback question
+    based on the ``target_concept_id`` is used instead.
+
+    This function now also checks previously asked questions to avoid repetition.
+    When the question bank (``tools/question_bank.py``) has unasked questions
+    for the concept, those are served instead and no LLM call is made. The
+    model is called with ``astream`` (see :func:`stream_questions`), so
+    running the graph with ``stream_mode="messages"`` streams the questions.
+
+    Parameters
+    ----------
+    state : TutorAgentState
+        The current agent state containing ``retrieved_chunks`` and the target
+        concept ID.
+
+    Returns
+    -------
+    TutorAgentState
+        The updated state with a list of ``ConceptQuestion`` objects on
+        ``state.questions``.
+    """
+    # Generated through the streaming variant, so the model output reaches
+    # ``graph.astream(..., stream_mode="messages")`` as it is written
+    async for _ in stream_questions(state):
+        pass
     return state
 
 
+async def stream_questions(state: TutorAgentState) -> AsyncIterator[str]:
+    """Streaming variant of :func:`generate_concept_and_code_questions`.
+
+    Yields the model output as it arrives; questions served from the bank or
+    a fallback are yielded in one piece. ``state.questions`` is set once the
+    stream completes, and time to first token is recorded under
+    ``"questions"`` (see ``tools/streaming.py``).
+
+    Parameters
+    ----------
+    state : TutorAgentState
+        State with ``retrieved_chunks`` and ``target_concept_id``; updated in
+        place.
+
+    Yields
+    ------
+    str
+        Pieces of the question list as text.
+    """
+    questions, prompt_messages, previously_asked = _prepare(state)
+    if questions is not None:
+        state.questions = questions
+        yield "\n".join(f"- {q.text}" for q in questions)
+        return
+
+    try:
+        pieces = []
+        async for text in stream_text(get_chat_model("questions"), prompt_messages, "questions"):
+            pieces.append(text)
+            yield text
+        state.questions = _parse_questions(state, "".join(pieces).strip(), previously_asked)
+    except Exception as e:
+        notice(f"[⚠️] Error generating questions: {e}")
+        state.questions = _error_fallback(state, previously_asked)
+        yield "\n".join(f"- {q.text}" for q in state.questions)
+
+
 # Alias used when adding this node to a graph
 node = generate_concept_and_code_questions
\ No newline at end of file
@@ -1,39 +1,38 @@
 """
 Intelligent topic extraction agent that analyzes loaded documentation
 to discover and extract all main topics from LangChain and LangGraph.
+
+Set ``TUTOR_TOPIC_EXTRACTION=map_reduce`` to cover the whole corpus within a
+token budget instead of a single sampled call.
 """
 import json
-import pickle
+import os
 from pathlib import Path
 from typing import List, Dict, Set
 from agents.state import TutorAgentState
-from langchain_openai import ChatOpenAI
+from tools.chunk_store import open_corpus
+from tools.topic_assignments import save_topics
+from tools.topic_mapreduce import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_SEED,
+    DEFAULT_TOKEN_BUDGET,
+    MAP_OUTPUT_TOKENS,
+    map_reduce_topics,
+    parse_topics_json,
+)
+from tools.clients import get_chat_model
 from langchain_core.prompts import ChatPromptTemplate
 
 
-async def extract_topics_from_docs(state: TutorAgentState) -> TutorAgentState:
-    """
-    Analyze the loaded documentation to extract comprehensive topics.
-    This replaces the limited static concepts.json with dynamic analysis.
-    """
-    
-    # Check if we have loaded documentation
-    raw_docs_path = Path("data/raw_docs.pkl")
-    if not raw_docs_path.exists():
-        state.messages.append("No loaded documentation found. Please run doc preparation first.")
-        state.topics = []
-        return state
-    
-    # Load the documentation
-    with open(raw_docs_path, "rb") as f:
-        docs = pickle.load(f)
-    
-    print(f"📚 Analyzing {len(docs)} documentation chunks for topics...")
+# "sample" (one call over a seeded sample) or "map_reduce" (whole corpus)
+EXTRACTION_MODE = os.getenv("TUTOR_TOPIC_EXTRACTION", "sample")
+
+
+async def _sample_extract_topics(docs, llm, seed: int) -> List[Dict]:
+    """Single LLM call over excerpts from a seeded sample of chunks."""
     
     # Sample representative chunks from the documentation
-    sample_size = min(50, len(docs))  # Analyze up to 50 chunks to avoid token limits
-    import random
-    sample_docs = random.sample(docs, sample_size)
+    sample_docs = docs.sample(50, seed=seed)  # Analyze up to 50 chunks to avoid token limits
     
     # Combine sample content for analysis
     sample_content = "\n\n".join([
@@ -74,20 +73,55 @@ Aim for 15-25 comprehensive topics that cover the breadth of LangChain and LangG
         ("user", f"Please analyze this documentation and extract the main topics:\n\n{sample_content}")
     ])
     
-    # Use GPT-4 for intelligent topic extraction
-    llm = ChatOpenAI(model="gpt-4", temperature=0.1)
+    response = await llm.ainvoke(topic_extraction_prompt.format_messages())
+    return parse_topics_json(response.content)
+
+
+async def extract_topics_from_docs(
+    state: TutorAgentState,
+    mode: str = EXTRACTION_MODE,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    seed: int = DEFAULT_SEED,
+    llm=None,
+) -> TutorAgentState:
+    """
+    Analyze the loaded documentation to extract comprehensive topics.
+    This replaces the limited static concepts.json with dynamic analysis.
+
+    Parameters
+    ----------
+    mode : str
+        ``"sample"`` sends excerpts of a seeded sample of chunks to one LLM
+        call. ``"map_reduce"`` covers the whole corpus in batches, up to
+        ``token_budget`` tokens, and merges the per-batch topics (see
+        ``tools/topic_mapreduce.py``).
+    token_budget, concurrency : int
+        Map-reduce only: total token budget and maximum concurrent calls.
+    seed : int
+        Seed for chunk sampling and the model, so runs are reproducible.
+    llm : chat model, optional
+        Defaults to GPT-4 at temperature 0.
+    """
+    
+    # Open the chunk store; only the sampled chunks are decoded
+    docs = open_corpus()
+    if docs is None:
+        state.messages.append("No loaded documentation found. Please run doc preparation first.")
+        state.topics = []
+        return state
+    
+    print(f"📚 Analyzing {len(docs)} documentation chunks for topics ({mode})...")
+    if llm is None:
+        # Map calls are budgeted with a fixed output reservation, so cap replies to it
+        caps = {"max_tokens": MAP_OUTPUT_TOKENS} if mode == "map_reduce" else {}
+        llm = get_chat_model("topics", seed=seed, **caps)
     
     try:
-        response = await llm.ainvoke(topic_extraction_prompt.format_messages())
-        
-        # Parse the JSON response
-        topics_text = response.content.strip()
-        if topics_text.startswith("```json"):
-            topics_text = topics_text[7:-3].strip()
-        elif topics_text.startswith("```"):
-            topics_text = topics_text[3:-3].strip()
-            
-        topics = json.loads(topics_text)
+        if mode == "map_reduce":
+            topics = await map_reduce_topics(docs, llm, token_budget, concurrency, seed)
+        else:
+            topics = await _sample_extract_topics(docs, llm, seed)
         
         # Filter and validate topics
         validated_topics = []
@@ -99,22 +133,24 @@ Aim for 15-25 comprehensive topics that cover the breadth of LangChain and LangG
                 topic["category"] in ["LangChain", "LangGraph"] and
                 topic["id"] not in seen_ids):
                 
-                validated_topics.append({
+                validated = {
                     "id": topic["id"],
                     "name": topic["name"],
                     "category": topic["category"],
                     "description": topic.get("description", ""),
                     "keywords": topic.get("keywords", [])
-                })
+                }
+                if "support" in topic:
+                    validated["support"] = topic["support"]
+                validated_topics.append(validated)
                 seen_ids.add(topic["id"])
         
         print(f"✅ Extracted {len(validated_topics)} topics from documentation")
         state.topics = validated_topics
         
-        # Optionally save the extracted topics for future use
-        extracted_topics_path = Path("data/extracted_topics.json")
-        with open(extracted_topics_path, "w", encoding="utf-8") as f:
-            json.dump(validated_topics, f, indent=2, ensure_ascii=False)
+        # Save the extracted topics with the fingerprint of the corpus they came from
+        extractor = "map_reduce" if mode == "map_reduce" else "intelligent"
+        extracted_topics_path = save_topics(validated_topics, docs.fingerprint(), extractor)
         
         print(f"💾 Saved extracted topics to {extracted_topics_path}")
         
@@ -142,24 +178,12 @@ Aim for 15-25 comprehensive topics that cover the breadth of LangChain and LangG
 async def get_cached_or_extract_topics(state: TutorAgentState) -> TutorAgentState:
     """
     Get topics from cache if available, otherwise extract from documentation.
-    This provides a faster experience for repeated runs.
+    This provides a faster experience for repeated runs. A cached list that
+    is older than the indexed docs is handled as described in
+    ``agents/nodes/load_topics_node.py``; without one, topics are extracted
+    with the LLM.
     """
-    
-    # Check for cached extracted topics first
-    extracted_topics_path = Path("data/extracted_topics.json")
-    
-    if extracted_topics_path.exists():
-        try:
-            with open(extracted_topics_path, "r", encoding="utf-8") as f:
-                cached_topics = json.load(f)
-            
-            print(f"📋 Using cached topics ({len(cached_topics)} topics found)")
-            state.topics = cached_topics
-            return state
-            
-        except Exception as e:
-            print(f"⚠️ Error reading cached topics: {e}")
-    
-    # If no cache or error, extract from documentation
-    print("🔍 No cached topics found, analyzing documentation...")
-    return await extract_topics_from_docs(state)
+    from agents.nodes.load_topics_node import load_or_extract_topics
+
+    discovery = "map_reduce" if EXTRACTION_MODE == "map_reduce" else "intelligent"
+    return await load_or_extract_topics(state, discovery=discovery)
@@ -0,0 +1,109 @@
+"""Node that loads the topic list, re-extracting it only when that is safe.
+
+Topic ids key learner progress, question-bank pools, the learn-mode topic
+cache and the ``topic_ids`` tagged on chunks, so replacing the list is not
+free. The cached ``data/extracted_topics.json`` is therefore kept unless:
+
+- there is none, in which case the ``TUTOR_TOPIC_DISCOVERY`` extractor runs
+  (``quick`` by default);
+- it is stale (see ``tools/topic_assignments.py``) and was produced by the
+  quick extractor, whose ids come from fixed pattern tables, so a re-run only
+  rescans new chunks and keeps the ids;
+- it is stale and ``TUTOR_TOPIC_REFRESH=1`` asks for a refresh, in which
+  case the extractor named in its sidecar runs again.
+
+Any other stale list (LLM, map-reduce, clusters, or hand-curated) is kept
+with a warning.
+"""
+
+import os
+from typing import Optional
+
+from agents.state import TutorAgentState
+from tools.topic_assignments import TOPICS_PATH, topics_status
+
+
+TOPIC_DISCOVERY = os.getenv("TUTOR_TOPIC_DISCOVERY", "quick")
+REFRESH_TOPICS = os.getenv("TUTOR_TOPIC_REFRESH", "0") == "1"
+
+# Extractors whose topic ids do not depend on the corpus they ran on
+AUTO_REFRESH_EXTRACTORS = ("quick",)
+EXTRACTORS = ("quick", "clusters", "intelligent", "map_reduce")
+
+
+async def run_extractor(name: str, state: TutorAgentState) -> TutorAgentState:
+    """Run the topic extractor recorded as ``name`` by ``save_topics``."""
+    if name == "quick":
+        from agents.nodes.quick_topic_extractor import quick_extract_topics_from_docs
+        return await quick_extract_topics_from_docs(state)
+    if name == "clusters":
+        from agents.nodes.cluster_topic_extractor import cluster_extract_topics_from_docs
+        return await cluster_extract_topics_from_docs(state)
+    if name in ("intelligent", "map_reduce"):
+        from agents.nodes.intelligent_topic_extractor import extract_topics_from_docs
+        return await extract_topics_from_docs(state, mode="map_reduce" if name == "map_reduce" else "sample")
+    raise ValueError(f"Unknown topic extractor {name!r}; expected one of {EXTRACTORS}")
+
+
+async def load_or_extract_topics(
+    state: TutorAgentState,
+    discovery: str = TOPIC_DISCOVERY,
+    refresh: bool = REFRESH_TOPICS,
+) -> TutorAgentState:
+    """Populate ``state.topics`` from the cached list or a topic extractor.
+
+    Parameters
+    ----------
+    state : TutorAgentState
+        The current agent state.
+    discovery : str
+        Extractor used when there is no topic list yet.
+    refresh : bool
+        Re-run the recorded extractor for a stale list even when that may
+        change topic ids.
+
+    Returns
+    -------
+    TutorAgentState
+        The updated state with ``topics`` populated.
+    """
+    topics, status, meta = topics_status()
+    extractor: Optional[str] = meta.get("extractor")
+
+    if status == "legacy":
+        print(f"[ℹ️] {TOPICS_PATH} predates corpus fingerprints; keeping it (set TUTOR_TOPIC_REFRESH=1 to re-extract).")
+        if refresh:
+            extractor = discovery
+        else:
+            state.topics = topics
+            return state
+    elif status == "stale":
+        if extractor not in EXTRACTORS:
+            print(f"[⚠️] {TOPICS_PATH} is older than the indexed docs but was not written by a known extractor; keeping it.")
+            state.topics = topics
+            return state
+        if not refresh and extractor not in AUTO_REFRESH_EXTRACTORS:
+            print(
+                f"[⚠️] {TOPICS_PATH} ({extractor}) is older than the indexed docs; keeping it. "
+                "Set TUTOR_TOPIC_REFRESH=1 to re-extract (topic ids may change)."
+            )
+            state.topics = topics
+            return state
+        print(f"🔄 Docs were re-indexed; refreshing topics with the {extractor} extractor...")
+    elif status != "missing":
+        state.topics = topics
+        return state
+    else:
+        extractor = discovery
+        print("🔍 Analyzing documentation to extract topics...")
+
+    previous_ids = {topic["id"] for topic in topics or []}
+    state = await run_extractor(extractor, state)
+    dropped = sorted(previous_ids - {topic["id"] for topic in state.topics})
+    if dropped:
+        print(f"[⚠️] {len(dropped)} topic ids are gone after the refresh; their progress and banked questions are no longer served: {', '.join(dropped)}")
+    return state
+
+
+# Alias used when adding this node to a graph
+node = load_or_extract_topics
@@ -1,147 +1,278 @@
 """
 Quick topic extraction that analyzes file names and content patterns
 to find comprehensive topics without requiring OpenAI API calls.
+
+All pattern tables are compiled once into a single Aho-Corasick automaton
+(see ``tools/pattern_matcher.py``), so each chunk is scanned in one pass.
+Chunk ranges are spread over a process pool. Every topic gets a frequency:
+the number of chunks that mention it, in their text or their file path.
+Topics are ranked by that count, and those found in fewer than
+``min_chunks`` chunks are dropped.
+
+Per-chunk topic assignments are cached by chunk id
+(``tools/topic_assignments.py``), so after a docs update only new or
+changed chunks are scanned.
 """
+import hashlib
 import json
-import pickle
-import re
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
 from agents.state import TutorAgentState
+from tools.chunk_store import ChunkStore, open_corpus
+from tools.pattern_matcher import PatternMatcher, unpack_bits
+from tools.topic_assignments import TopicAssignments, save_topics
+
+
+# Common LangChain patterns
+LANGCHAIN_PATTERNS = {
+    'chains': 'Chains and LCEL',
+    'prompt': 'Prompt Templates',
+    'embedding': 'Embeddings',
+    'vectorstore': 'Vector Stores',
+    'retriever': 'Retrievers',
+    'agent': 'Agents',
+    'tool': 'Tools',
+    'memory': 'Memory',
+    'callback': 'Callbacks',
+    'chat_model': 'Chat Models',
+    'llm': 'Language Models',
+    'output_parser': 'Output Parsers',
+    'document_loader': 'Document Loaders',
+    'text_splitter': 'Text Splitters',
+    'rag': 'RAG (Retrieval Augmented Generation)',
+    'runnable': 'Runnables',
+    'invoke': 'Invocation Patterns',
+    'stream': 'Streaming'
+}
+
+# Common LangGraph patterns
+LANGGRAPH_PATTERNS = {
+    'stategraph': 'StateGraph Basics',
+    'add_node': 'Graph Nodes',
+    'add_edge': 'Graph Edges',
+    'conditional_edge': 'Conditional Routing',
+    'checkpoint': 'Checkpointing',
+    'interrupt': 'Human-in-the-Loop',
+    'parallel': 'Parallel Execution',
+    'subgraph': 'Subgraphs',
+    'compile': 'Graph Compilation',
+    'workflow': 'Workflows',
+    'state': 'State Management',
+    'branch': 'Branching Logic'
+}
+
+# File path patterns, applied only to paths containing the category name
+LANGCHAIN_PATH_PATTERNS = {
+    'agent': 'Agents',
+    'chain': 'Chains and LCEL',
+    'prompt': 'Prompt Engineering',
+    'retriev': 'Retrievers',
+    'embed': 'Embeddings',
+    'vector': 'Vector Stores',
+    'tool': 'Tools',
+    'memory': 'Memory',
+    'callback': 'Callbacks'
+}
+
+LANGGRAPH_PATH_PATTERNS = {
+    'state': 'State Management',
+    'graph': 'Graph Construction',
+    'node': 'Graph Nodes',
+    'edge': 'Graph Edges',
+    'workflow': 'Workflows',
+    'checkpoint': 'Checkpointing'
+}
+
+CATEGORY_TABLES = {
+    "LangChain": (LANGCHAIN_PATTERNS, LANGCHAIN_PATH_PATTERNS),
+    "LangGraph": (LANGGRAPH_PATTERNS, LANGGRAPH_PATH_PATTERNS),
+}
+
+# A topic must be mentioned by at least this many chunks to be kept
+MIN_TOPIC_CHUNKS = int(os.getenv("TUTOR_MIN_TOPIC_CHUNKS", "2"))
+
+# Chunks scanned per process-pool task
+CHUNKS_PER_TASK = 4096
+
+
+def topic_labels() -> List[Tuple[str, str]]:
+    """Every ``(category, topic)`` pair in the tables; the list index is its label."""
+    return sorted({
+        (category, topic)
+        for category, tables in CATEGORY_TABLES.items()
+        for table in tables
+        for topic in table.values()
+    })
+
+
+def table_key() -> str:
+    """Identifies the pattern tables; cached assignments are only reused under the same key."""
+    return hashlib.sha256(json.dumps(CATEGORY_TABLES, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def _matchers() -> Tuple[PatternMatcher, PatternMatcher, np.ndarray]:
+    """Content and path automata, plus the category index of every label."""
+    labels = {pair: i for i, pair in enumerate(topic_labels())}
+    categories = list(CATEGORY_TABLES)
+    content = PatternMatcher(
+        (pattern, labels[(category, topic)])
+        for category, (table, _) in CATEGORY_TABLES.items()
+        for pattern, topic in table.items()
+    )
+    path = PatternMatcher(
+        (pattern, labels[(category, topic)])
+        for category, (_, table) in CATEGORY_TABLES.items()
+        for pattern, topic in table.items()
+    )
+    label_category = np.array([categories.index(category) for category, _ in labels])
+    return content, path, label_category
+
+
+def _source_labels(sources: List[str]) -> Dict[str, np.ndarray]:
+    """Labels suggested by each file path, as a bool row per source."""
+    _, path_matcher, label_category = _matchers()
+    hits = unpack_bits(path_matcher.label_bits(sources), path_matcher.num_labels)
+    lowered = [source.lower() for source in sources]
+    for i, category in enumerate(CATEGORY_TABLES):
+        in_category = np.array([category.lower() in source for source in lowered], dtype=bool)
+        hits[~in_category[:, None] & (label_category == i)[None, :]] = False
+    return dict(zip(sources, hits))
+
+
+def chunk_topic_bits(docs: Any, rows: Sequence[int]) -> np.ndarray:
+    """Label bitmask per chunk in ``rows``: topics in its text or its path."""
+    content_matcher = _matchers()[0]
+    bits = content_matcher.label_bits(docs.text(row) for row in rows)
+    by_source = {
+        source: pack_labels(hits)
+        for source, hits in _source_labels([source for source in docs.sources if source]).items()
+    }
+    for i, row in enumerate(rows):
+        source_bits = by_source.get(docs.source(row))
+        if source_bits is not None:
+            bits[i] |= source_bits
+    return bits
+
 
+def pack_labels(hits: np.ndarray) -> np.ndarray:
+    """Inverse of ``unpack_bits`` for one row of bools."""
+    padded = np.zeros(-(-len(hits) // 64) * 64, dtype=bool)
+    padded[:len(hits)] = hits
+    return np.packbits(padded, bitorder="little").view("<u8").astype(np.uint64)
 
-async def quick_extract_topics_from_docs(state: TutorAgentState) -> TutorAgentState:
+
+def _bits_worker(args) -> np.ndarray:
+    """Process-pool task: topic bitmasks for some rows of a chunk store."""
+    path, rows = args
+    return chunk_topic_bits(ChunkStore(Path(path)), rows)
+
+
+def scan_rows(docs: Any, rows: Sequence[int], workers: int = 1) -> np.ndarray:
+    """Topic bitmasks for ``rows``, split into tasks across ``workers`` processes."""
+    tasks = [list(rows[start:start + CHUNKS_PER_TASK]) for start in range(0, len(rows), CHUNKS_PER_TASK)]
+    if workers <= 1 or len(tasks) <= 1 or not isinstance(docs, ChunkStore):
+        return chunk_topic_bits(docs, rows)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return np.concatenate(list(pool.map(_bits_worker, [(str(docs.path), task) for task in tasks])))
+
+
+def count_topics(docs: Any, workers: int = 1, assignments: Optional[TopicAssignments] = None) -> np.ndarray:
+    """Per-label number of chunks mentioning each topic.
+
+    With ``assignments``, chunks already in it are not rescanned, and it is
+    updated to hold exactly the current chunks.
+    """
+    num_labels = len(topic_labels())
+    if assignments is None:
+        return unpack_bits(scan_rows(docs, range(len(docs)), workers), num_labels).sum(axis=0)
+
+    chunk_ids = [docs.chunk_id(row) for row in range(len(docs))]
+    bits = np.zeros((len(docs), -(-num_labels // 64)), dtype=np.uint64)
+    new_rows = []
+    for row, cid in enumerate(chunk_ids):
+        cached = assignments.get(cid)
+        if cached is None:
+            new_rows.append(row)
+        else:
+            bits[row] = cached
+    if new_rows:
+        bits[new_rows] = scan_rows(docs, new_rows, workers)
+    print(f"🔁 Scanned {len(new_rows)} new or changed chunks; reused assignments for {len(docs) - len(new_rows)}")
+    assignments.replace(chunk_ids, bits)
+    return unpack_bits(bits, num_labels).sum(axis=0)
+
+
+def _topic_id(category: str, topic: str) -> str:
+    slug = topic.lower().replace(' ', '_').replace('(', '').replace(')', '').replace('/', '_')
+    return f"{category.lower()}.{slug}"
+
+
+async def quick_extract_topics_from_docs(
+    state: TutorAgentState,
+    workers: int = None,
+    min_chunks: int = MIN_TOPIC_CHUNKS,
+) -> TutorAgentState:
     """
     Quickly analyze loaded documentation to extract topics based on patterns.
     This is a fast alternative that doesn't require LLM calls.
+
+    Topics are ordered by ``frequency`` (chunks mentioning them) within each
+    category, and topics seen in fewer than ``min_chunks`` chunks are skipped.
+    Only chunks without a cached topic assignment are scanned; the list is
+    saved with the corpus fingerprint so later runs can tell if it is stale.
     """
-    
-    # Check if we have loaded documentation
-    raw_docs_path = Path("data/raw_docs.pkl")
-    if not raw_docs_path.exists():
+
+    # Open the chunk store; chunks are decoded one at a time while scanning
+    docs = open_corpus()
+    if docs is None:
         print("❌ No loaded documentation found.")
         state.topics = []
         return state
-    
-    # Load the documentation
-    with open(raw_docs_path, "rb") as f:
-        docs = pickle.load(f)
-    
-    print(f"📚 Analyzing {len(docs)} documentation chunks for topics...")
-    
-    # Pattern-based topic extraction
-    langchain_topics = set()
-    langgraph_topics = set()
-    
-    # Common LangChain patterns
-    langchain_patterns = {
-        'chains': 'Chains and LCEL',
-        'prompt': 'Prompt Templates',
-        'embedding': 'Embeddings',
-        'vectorstore': 'Vector Stores',
-        'retriever': 'Retrievers', 
-        'agent': 'Agents',
-        'tool': 'Tools',
-        'memory': 'Memory',
-        'callback': 'Callbacks',
-        'chat_model': 'Chat Models',
-        'llm': 'Language Models',
-        'output_parser': 'Output Parsers',
-        'document_loader': 'Document Loaders',
-        'text_splitter': 'Text Splitters',
-        'rag': 'RAG (Retrieval Augmented Generation)',
-        'runnable': 'Runnables',
-        'invoke': 'Invocation Patterns',
-        'stream': 'Streaming'
-    }
-    
-    # Common LangGraph patterns  
-    langgraph_patterns = {
-        'stategraph': 'StateGraph Basics',
-        'add_node': 'Graph Nodes',
-        'add_edge': 'Graph Edges', 
-        'conditional_edge': 'Conditional Routing',
-        'checkpoint': 'Checkpointing',
-        'interrupt': 'Human-in-the-Loop',
-        'parallel': 'Parallel Execution',
-        'subgraph': 'Subgraphs',
-        'compile': 'Graph Compilation',
-        'workflow': 'Workflows',
-        'state': 'State Management',
-        'branch': 'Branching Logic'
-    }
-    
-    # Analyze documentation content
-    for doc in docs:
-        content = doc.page_content.lower()
-        
-        # Check for LangChain topics
-        for pattern, topic in langchain_patterns.items():
-            if pattern in content:
-                langchain_topics.add(topic)
-        
-        # Check for LangGraph topics  
-        for pattern, topic in langgraph_patterns.items():
-            if pattern in content:
-                langgraph_topics.add(topic)
-    
-    # Also check metadata for file paths to identify more topics
-    for doc in docs:
-        if hasattr(doc, 'metadata') and 'source' in doc.metadata:
-            source = doc.metadata['source'].lower()
-            
-            # Extract topics from file paths
-            if 'langchain' in source:
-                if 'agent' in source: langchain_topics.add('Agents')
-                if 'chain' in source: langchain_topics.add('Chains and LCEL')
-                if 'prompt' in source: langchain_topics.add('Prompt Engineering')
-                if 'retriev' in source: langchain_topics.add('Retrievers')
-                if 'embed' in source: langchain_topics.add('Embeddings')
-                if 'vector' in source: langchain_topics.add('Vector Stores')
-                if 'tool' in source: langchain_topics.add('Tools')
-                if 'memory' in source: langchain_topics.add('Memory')
-                if 'callback' in source: langchain_topics.add('Callbacks')
-                
-            if 'langgraph' in source:
-                if 'state' in source: langgraph_topics.add('State Management')
-                if 'graph' in source: langgraph_topics.add('Graph Construction')
-                if 'node' in source: langgraph_topics.add('Graph Nodes')
-                if 'edge' in source: langgraph_topics.add('Graph Edges')
-                if 'workflow' in source: langgraph_topics.add('Workflows')
-                if 'checkpoint' in source: langgraph_topics.add('Checkpointing')
-    
-    # Create structured topic list
-    topics = []
-    
-    # Add LangChain topics
-    for i, topic in enumerate(sorted(langchain_topics), 1):
-        topics.append({
-            "id": f"langchain.{topic.lower().replace(' ', '_').replace('(', '').replace(')', '').replace('/', '_')}",
-            "name": topic,
-            "category": "LangChain",
-            "description": f"Learn about {topic} in LangChain",
-            "keywords": [topic.lower()]
-        })
-    
-    # Add LangGraph topics
-    for i, topic in enumerate(sorted(langgraph_topics), 1):
-        topics.append({
-            "id": f"langgraph.{topic.lower().replace(' ', '_').replace('(', '').replace(')', '').replace('/', '_')}",
+
+    workers = workers or os.cpu_count() or 1
+    print(f"📚 Analyzing {len(docs)} documentation chunks for topics ({workers} workers)...")
+    labels = topic_labels()
+    assignments = TopicAssignments.load(table_key(), -(-len(labels) // 64))
+    counts = count_topics(docs, workers, assignments)
+    assignments.save()
+
+    # Create structured topic list, most frequent first within each category
+    ranked = sorted(
+        ((category, topic, int(count)) for (category, topic), count in zip(labels, counts)),
+        key=lambda item: (list(CATEGORY_TABLES).index(item[0]), -item[2], item[1]),
+    )
+    topics = [
+        {
+            "id": _topic_id(category, topic),
             "name": topic,
-            "category": "LangGraph", 
-            "description": f"Learn about {topic} in LangGraph",
-            "keywords": [topic.lower()]
-        })
-    
-    print(f"✅ Found {len(langchain_topics)} LangChain topics and {len(langgraph_topics)} LangGraph topics")
-    
+            "category": category,
+            "description": f"Learn about {topic} in {category}",
+            "keywords": [topic.lower()],
+            "frequency": frequency,
+        }
+        for category, topic, frequency in ranked
+        if frequency >= min_chunks
+    ]
+
+    per_category = {category: sum(t["category"] == category for t in topics) for category in CATEGORY_TABLES}
+    skipped = sum(1 for *_, frequency in ranked if 0 < frequency < min_chunks)
+    print(
+        f"✅ Found {per_category['LangChain']} LangChain topics and {per_category['LangGraph']} LangGraph topics"
+        f" ({skipped} seen in fewer than {min_chunks} chunks skipped)"
+    )
+
     state.topics = topics
-    
+
     # Save the extracted topics
-    extracted_topics_path = Path("data/extracted_topics.json")
-    with open(extracted_topics_path, "w", encoding="utf-8") as f:
-        json.dump(topics, f, indent=2, ensure_ascii=False)
-    
+    extracted_topics_path = save_topics(topics, docs.fingerprint(), "quick")
+
     print(f"💾 Saved {len(topics)} topics to {extracted_topics_path}")
-    
+
     return state
@@ -1,10 +1,11 @@
 """Node responsible for retrieving documentation from a vector store."""
 
+import asyncio
 from typing import List
 from dotenv import load_dotenv
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
 from agents.state import TutorAgentState
+from tools.question_bank import serve_questions
+from tools.retrieval import search_docs
 
 
 # Load environment variables so embedding credentials are available
@@ -12,12 +13,17 @@ load_dotenv(override=True)
 
 
 async def retrieve_context_from_docs(state: TutorAgentState) -> TutorAgentState:
-    """Retrieve relevant documentation chunks using a similarity search.
+    """Retrieve relevant documentation chunks using hybrid search.
 
     Expects the user's input (concept name or query) to be stored on
-    ``state.user_input``. Uses a local FAISS vector store to find the top k
-    documents related to the query and stores their page contents on
-    ``state.retrieved_chunks`` for downstream question generation.
+    ``state.user_input``. Uses ``tools.retrieval.search_docs`` (BM25 fused with
+    the shared FAISS index) to find the top k documents related to the query
+    and stores their page contents on ``state.retrieved_chunks`` for
+    downstream question generation. When ``state.target_concept_id`` is set,
+    only chunks in that topic's category (LangChain or LangGraph) are searched.
+    If the question bank (``tools/question_bank.py``) still has unasked
+    questions for that topic, the search is skipped and the chunks those
+    questions were generated from are used instead.
 
     Parameters
     ----------
@@ -29,17 +35,21 @@ async def retrieve_context_from_docs(state: TutorAgentState) -> TutorAgentState:
     TutorAgentState
         The updated state with ``retrieved_chunks`` populated.
     """
+    # The search blocks (BM25 + FAISS + query embedding); keep it off the event loop
+    return await asyncio.to_thread(retrieve_chunks, state)
+
+
+def retrieve_chunks(state: TutorAgentState) -> TutorAgentState:
+    """Blocking body of :func:`retrieve_context_from_docs`."""
     if not state.user_input:
         raise ValueError("No user input provided to retrieve context.")
 
-    embeddings = OpenAIEmbeddings()
-    vectorstore = FAISS.load_local(
-        "embeddings/vector_store",
-        embeddings,
-        allow_dangerous_deserialization=True,
-    )
+    banked = serve_questions(state.target_concept_id)
+    if banked is not None:
+        state.retrieved_chunks = banked["chunks"]
+        return state
 
-    docs = vectorstore.similarity_search(state.user_input, k=4)
+    docs = search_docs(state.user_input, k=4, topic_id=state.target_concept_id)
     retrieved_text: List[str] = [doc.page_content for doc in docs]
     state.retrieved_chunks = retrieved_text
     return state
@@ -4,7 +4,7 @@ import json
 import random
 from pathlib import Path
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from tools.clients import get_chat_model
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from agents.state import TutorAgentState
@@ -72,7 +72,7 @@ async def suggest_review_questions(state: TutorAgentState) -> TutorAgentState:
 
     try:
         prompt_messages = prompt.format_messages(seen_questions=formatted_qas)
-        llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0.5)
+        llm = get_chat_model("review")
         response = await llm.ainvoke(prompt_messages)
         result = response.content.strip()
         
@@ -12,8 +12,14 @@ async def suggest_next_unseen_concept(state: TutorAgentState) -> TutorAgentState
     and their prerequisites. This function looks for the first concept whose
     prerequisites are all contained in ``state.covered_concepts`` and that has
     not itself been covered. The chosen concept's name is stored on
-    ``state.next_suggestion``. If no such concept exists, ``next_suggestion``
-    will be set to ``None``.
+    ``state.next_suggestion`` and its ID on ``state.next_suggestion_id``. If no
+    such concept exists, both will be set to ``None``.
+
+    When ``state.topics`` holds the extracted topic list, only topic ids are
+    suggested, since retrieval partitions, the topic cache and the question
+    bank are all keyed by them. Concepts from the graph that are also topics
+    come first (prerequisites that are not topics are ignored), then the
+    remaining topics in list order.
 
     Parameters
     ----------
@@ -25,30 +31,41 @@ async def suggest_next_unseen_concept(state: TutorAgentState) -> TutorAgentState
     TutorAgentState
         The updated state with ``next_suggestion`` populated or cleared.
     """
+    all_concepts = []
     concepts_file = Path("data/concepts.json")
     if not concepts_file.exists():
-        print("[⚠️] Missing data/concepts.json; cannot suggest next concept.")
-        state.next_suggestion = None
-        return state
-
-    try:
-        with open(concepts_file, "r", encoding="utf-8") as f:
-            all_concepts = json.load(f)
-    except Exception as e:
-        print(f"[⚠️] Failed to load concepts: {e}")
-        state.next_suggestion = None
-        return state
+        if not state.topics:
+            print("[⚠️] Missing data/concepts.json; cannot suggest next concept.")
+            state.next_suggestion = state.next_suggestion_id = None
+            return state
+    else:
+        try:
+            with open(concepts_file, "r", encoding="utf-8") as f:
+                all_concepts = json.load(f)
+        except Exception as e:
+            print(f"[⚠️] Failed to load concepts: {e}")
+            state.next_suggestion = state.next_suggestion_id = None
+            return state
 
     covered = set(state.covered_concepts or [])
-    suggestion = None
+    if state.topics:
+        topic_ids = {topic["id"] for topic in state.topics}
+        all_concepts = [
+            {**concept, "prerequisites": [p for p in concept.get("prerequisites", []) if p in topic_ids]}
+            for concept in all_concepts
+            if concept.get("id") in topic_ids
+        ] + list(state.topics)
+
+    suggestion = suggestion_id = None
     for concept in all_concepts:
         concept_id = concept.get("id")
         prereqs = set(concept.get("prerequisites", []))
         if concept_id not in covered and prereqs.issubset(covered):
-            suggestion = concept.get("name", concept_id)
+            suggestion, suggestion_id = concept.get("name", concept_id), concept_id
             break
 
     state.next_suggestion = suggestion
+    state.next_suggestion_id = suggestion_id
     return state
 
 
@@ -0,0 +1,134 @@
+"""Speculative preparation of the learner's next session.
+
+While the learner types answers, the CLI sits idle, and once the session
+ends the next session still waits on retrieval and question generation.
+:class:`SessionPrefetcher` predicts the next concept with the
+``suggest_next_unseen_concept`` node, as if the current concept were
+covered. Like the CLI's own suggestion, the prediction is drawn from the
+extracted topic ids. It then runs retrieval and question generation for
+that concept in a background task. If the learner starts the predicted
+concept, its questions are ready (or partly done). If the learner goes
+elsewhere, the task is cancelled. Messages the task reports are held back while the
+learner types and shown when its session is taken.
+
+Speculative spend is capped: at most ``TUTOR_PREFETCH_MAX_SESSIONS``
+sessions (default 3) are prepared per process. ``TUTOR_PREFETCH=0`` turns
+prefetching off.
+"""
+
+import asyncio
+import os
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from agents.nodes.generate_questions import generate_concept_and_code_questions
+from agents.nodes.read_docs_node import retrieve_chunks
+from agents.nodes.suggest_next_node import suggest_next_unseen_concept
+from agents.state import TutorAgentState
+from tools.notices import deferred_notices, notice
+
+
+PREFETCH_ENABLED = os.getenv("TUTOR_PREFETCH", "1") != "0"
+MAX_SPECULATIVE_SESSIONS = int(os.getenv("TUTOR_PREFETCH_MAX_SESSIONS", "3"))
+
+
+async def predict_next_concept(covered: Iterable[str], topics: Optional[List[Dict[str, Any]]] = None) -> Optional[str]:
+    """ID of the concept ``suggest_next_unseen_concept`` would suggest after ``covered``.
+
+    Pass the extracted ``topics`` the CLI suggests from, so the prediction is
+    a topic id with a retrieval partition, topic cache entry and bank pool.
+    """
+    state = await suggest_next_unseen_concept(TutorAgentState(covered_concepts=list(covered), topics=list(topics or [])))
+    return state.next_suggestion_id
+
+
+async def prepare_session(concept_id: str, covered: Iterable[str]) -> TutorAgentState:
+    """Retrieve context and generate questions for a learn session on ``concept_id``."""
+    state = TutorAgentState(
+        mode="learn",
+        target_concept_id=concept_id,
+        user_input=concept_id,
+        covered_concepts=list(covered),
+    )
+    # Retrieval blocks (BM25 + FAISS), so keep it off the event loop
+    state = await asyncio.to_thread(retrieve_chunks, state)
+    return await generate_concept_and_code_questions(state)
+
+
+class SessionPrefetcher:
+    """Prepares at most one predicted next session in the background."""
+
+    def __init__(self, max_sessions: int = MAX_SPECULATIVE_SESSIONS, enabled: bool = PREFETCH_ENABLED):
+        self.max_sessions = max_sessions
+        self.enabled = enabled
+        self.concept_id: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats: Counter = Counter()
+
+    async def start(self, covered: Iterable[str], topics: Optional[List[Dict[str, Any]]] = None) -> Optional[str]:
+        """Begin preparing the session predicted to follow ``covered``.
+
+        Returns the predicted concept ID, or ``None`` when nothing is being
+        prepared (prefetching is off, no concept is left, or the spend cap is
+        reached). A running task for a different concept is cancelled.
+        """
+        if not self.enabled:
+            return None
+        covered = list(covered)
+        concept_id = await predict_next_concept(covered, topics)
+        if concept_id is not None and concept_id == self.concept_id and self._task is not None:
+            return concept_id
+        self.cancel()
+        if concept_id is None:
+            return None
+        if self._stats["started"] >= self.max_sessions:
+            self._stats["skipped"] += 1
+            return None
+        self._stats["started"] += 1
+        self.concept_id = concept_id
+        self._task = asyncio.create_task(self._run(concept_id, covered))
+        return concept_id
+
+    async def _run(self, concept_id: str, covered: Iterable[str]) -> Tuple[Optional[TutorAgentState], List[str]]:
+        # Printing now would interrupt the learner's answer prompt
+        with deferred_notices() as notices:
+            try:
+                state = await prepare_session(concept_id, covered)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                notice(f"[⚠️] Could not prepare the next session for {concept_id}: {e}")
+                self._stats["failed"] += 1
+                state = None
+        return (state if state is not None and state.questions else None), notices
+
+    async def take(self, concept_id: str) -> Optional[TutorAgentState]:
+        """The prepared session for ``concept_id``, waiting for it if still running.
+
+        Returns ``None`` (and cancels any prefetch) when a different concept
+        was prepared, nothing was, or preparation failed. Messages held back
+        during preparation are printed here.
+        """
+        if self._task is None or concept_id != self.concept_id:
+            self.cancel()
+            return None
+        task, self._task, self.concept_id = self._task, None, None
+        self._stats["ready" if task.done() else "waited"] += 1
+        state, notices = await task
+        for message in notices:
+            print(message)
+        if state is not None:
+            self._stats["used"] += 1
+        return state
+
+    def cancel(self) -> None:
+        """Drop the current prefetch, cancelling it if it is still running."""
+        if self._task is not None:
+            if not self._task.done():
+                self._task.cancel()
+            self._stats["discarded"] += 1
+        self._task, self.concept_id = None, None
+
+    def stats(self) -> Dict[str, int]:
+        """Counts of sessions started, used, discarded, failed and skipped by the cap."""
+        return {key: self._stats[key] for key in ("started", "used", "ready", "waited", "discarded", "failed", "skipped")}
@@ -53,6 +53,8 @@ class TutorAgentState(BaseModel):
     # A suggested next concept for the learner to explore. Set by the
     # ``suggest_next_unseen_concept`` node.
     next_suggestion: Optional[str] = None
+    # The concept ID of ``next_suggestion``, used to start that concept's session.
+    next_suggestion_id: Optional[str] = None
     # List of available topics extracted from the concepts database. Used for
     # topic selection in CLI and web UI.
     topics: Annotated[List[Dict[str, str]], add] = Field(default_factory=list)
@@ -1,5 +1,6 @@
 """Definition of the LangGraph tutor agent."""
 
+from typing import Any, AsyncIterator, Dict, Tuple
 from langgraph.graph import StateGraph, END
 from agents.state import TutorAgentState
 
@@ -52,4 +53,26 @@ async def define_graph() -> StateGraph:
     # Define transitions for the doc search path
     graph.add_edge("doc_search", END)
 
-    return graph.compile()
\ No newline at end of file
+    return graph.compile()
+
+
+async def stream_graph(graph: Any, state: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+    """Run ``graph`` on ``state`` while streaming the generated questions.
+
+    Yields ``("text", piece)`` as the ``generate_questions`` node's model
+    writes, then ``("state", result)`` with the final state as a dict.
+    Questions served from the question bank or a fallback produce no model
+    tokens; they are yielded in one piece once the run completes.
+    """
+    result, streamed = dict(state), False
+    async for mode, chunk in graph.astream(state, stream_mode=["messages", "values"]):
+        if mode == "values":
+            result = chunk
+            continue
+        message, metadata = chunk
+        if metadata.get("langgraph_node") == "generate_questions" and isinstance(message.content, str) and message.content:
+            streamed = True
+            yield "text", message.content
+    if not streamed and result.get("questions"):
+        yield "text", "\n".join(f"- {q.text}" for q in result["questions"])
+    yield "state", result
@@ -3,7 +3,7 @@
 import asyncio
 import json
 from pathlib import Path
-from agents.tutor_agent import define_graph
+from agents.tutor_agent import define_graph, stream_graph
 from agents.state import TutorAgentState
 from agents.nodes.store_answers_node import embed_and_store_user_answers
 from dotenv import load_dotenv
@@ -13,6 +13,107 @@ from dotenv import load_dotenv
 load_dotenv(override=True)
 
 
+async def run_questions(result: dict) -> None:
+    """Ask the session's questions, streaming feedback on each answer.
+
+    Input is read in a worker thread so background tasks, such as the
+    prefetch of the next session (``agents/prefetch.py``), keep running
+    while the learner types. ``result`` is updated in place.
+    """
+    # Main learning loop - continues until user says stop
+    question_index = 0
+    while question_index < len(result["questions"]):
+        question = result["questions"][question_index]
+        result["current_question"] = question
+        
+        correct = False
+        attempts = 0
+        max_attempts = 3
+        
+        while not correct and attempts < max_attempts:
+            print(f"\nQ: {question.text}")
+            user_answer = (await asyncio.to_thread(input, "Your Answer: ")).strip()
+            
+            # Check for exit commands
+            if user_answer.lower() in {"stop", "exit", "quit"}:
+                print("👋 Ending learning session...")
+                break
+                
+            if not user_answer:
+                print("⚠️ You must enter an answer to continue.\n")
+                continue
+            
+            attempts += 1
+            
+            # Update user input and get feedback
+            result["user_input"] = user_answer
+            result["last_feedback"] = None
+            result["last_correct"] = False
+            
+            # Stream feedback as it is generated; correctness is known once it completes
+            from agents.nodes.generate_feedback_node import stream_feedback
+            state_obj = TutorAgentState(**result)
+            print("\n🧠 Feedback: ", end="", flush=True)
+            async for text in stream_feedback(state_obj):
+                print(text, end="", flush=True)
+            print("\n")
+            result.update(state_obj.model_dump())
+            
+            correct = result.get("last_correct", False)
+            
+            if correct:
+                print("✅ Great! Let's continue building on this understanding.\n")
+                # Store the correct answer
+                from agents.nodes.store_answers_node import store_answer
+                state_obj = TutorAgentState(**result)
+                state_obj = await store_answer(state_obj)
+                result.update(state_obj.model_dump())
+                
+            elif attempts < max_attempts:
+                print("💭 Let me ask this in a different way or give you a hint...\n")
+                
+            else:
+                print("💡 No worries! Let's build on what you do know and continue learning.")
+                if result.get("retrieved_chunks"):
+                    context = result["retrieved_chunks"][0][:300] + "..."
+                    print(f"📖 Here's some context: {context}")
+                print("✅ Let's move forward with your learning journey.\n")
+                correct = True
+                
+                # Store the answer for learning purposes
+                from agents.nodes.store_answers_node import store_answer
+                state_obj = TutorAgentState(**result)
+                state_obj = await store_answer(state_obj)
+                result.update(state_obj.model_dump())
+        
+        # Check if user wants to exit
+        if user_answer.lower() in {"stop", "exit", "quit"}:
+            break
+            
+        question_index += 1
+        
+        # After each question, ask if they want to continue or if they have questions
+        if question_index < len(result["questions"]):
+            continue_input = (await asyncio.to_thread(
+                input, "Ready for the next question? (press Enter to continue, or type 'stop' to end): "
+            )).strip()
+            if continue_input.lower() in {"stop", "exit", "quit"}:
+                print("👋 Great learning session!")
+                break
+
+
+async def stream_learn_session(graph, state: dict) -> dict:
+    """Run the graph's learn branch on ``state``, printing the questions as they are written."""
+    result = state
+    async for kind, value in stream_graph(graph, state):
+        if kind == "text":
+            print(value, end="", flush=True)
+        else:
+            result = value
+    print()
+    return result
+
+
 async def run_cli() -> None:
     """Run an interactive command‑line tutoring session."""
     # Initialize log files if they don't exist
@@ -37,18 +138,12 @@ async def run_cli() -> None:
         print("=" * 60)
 
     # Extract main topics from the database
-    # First try to use cached topics, then extract if needed
-    extracted_topics_path = Path("data/extracted_topics.json")
-    if extracted_topics_path.exists():
+    # Cached topics are kept unless they are missing or can be refreshed
+    # without changing topic ids; only new or changed chunks are rescanned
+    from agents.nodes.load_topics_node import load_or_extract_topics
+    topics = (await load_or_extract_topics(TutorAgentState(mode="extract_topics"))).topics
+    if topics:
         print("📋 Loading comprehensive topics from documentation analysis...")
-        with open(extracted_topics_path, "r", encoding="utf-8") as f:
-            topics = json.load(f)
-    else:
-        print("🔍 Analyzing documentation to extract topics...")
-        from agents.nodes.quick_topic_extractor import quick_extract_topics_from_docs
-        topic_state = TutorAgentState(mode="extract_topics")
-        topics_result = await quick_extract_topics_from_docs(topic_state)
-        topics = topics_result.topics
     if not topics:
         print("❌ No topics found in the database. Exiting.")
         return
@@ -89,8 +184,13 @@ async def run_cli() -> None:
         "next_suggestion": None,
     }
 
-    # Invoke the graph to retrieve context and/or sample past questions
-    result = await graph.ainvoke(state)
+    if mode == "learn":
+        # Run the graph's learn branch, printing the questions as they are written
+        print("📝 Preparing questions...")
+        result = await stream_learn_session(graph, state)
+    else:
+        # Invoke the graph to retrieve context and/or sample past questions
+        result = await graph.ainvoke(state)
 
     # Handle doc_search mode differently - just display results
     if mode == "doc_search":
@@ -109,109 +209,82 @@ async def run_cli() -> None:
         print("⚠️ No questions generated. Try a different topic or check your docs.")
         return
 
-    print_separator()
-    print(f"[🗣️] Learning session started for: {concept_input}")
-    print("Type 'stop', 'exit', or 'quit' at any time to end the session.")
-    print_separator()
+    # Prepare the likely next session in the background while the learner answers
+    from agents.prefetch import SessionPrefetcher
+    from agents.nodes.suggest_next_node import suggest_next_unseen_concept
+    prefetcher = SessionPrefetcher()
 
-    # Main learning loop - continues until user says stop
-    question_index = 0
-    while question_index < len(result["questions"]):
-        question = result["questions"][question_index]
-        result["current_question"] = question
-        
-        correct = False
-        attempts = 0
-        max_attempts = 3
-        
-        while not correct and attempts < max_attempts:
-            print(f"\nQ: {question.text}")
-            user_answer = input("Your Answer: ").strip()
-            
-            # Check for exit commands
-            if user_answer.lower() in {"stop", "exit", "quit"}:
-                print("👋 Ending learning session...")
-                break
-                
-            if not user_answer:
-                print("⚠️ You must enter an answer to continue.\n")
-                continue
-            
-            attempts += 1
-            
-            # Update user input and get feedback
-            result["user_input"] = user_answer
-            result["last_feedback"] = None
-            result["last_correct"] = False
-            
-            # Generate feedback directly using state object
-            from agents.nodes.generate_feedback_node import generate_feedback
-            state_obj = TutorAgentState(**result)
-            state_obj = await generate_feedback(state_obj)
-            result.update(state_obj.model_dump())
-            
-            feedback = result.get("last_feedback", "[No feedback received]")
-            print(f"\n🧠 Feedback: {feedback}\n")
-            
-            correct = result.get("last_correct", False)
-            
-            if correct:
-                print("✅ Great! Let's continue building on this understanding.\n")
-                # Store the correct answer
-                from agents.nodes.store_answers_node import store_answer
-                state_obj = TutorAgentState(**result)
-                state_obj = await store_answer(state_obj)
-                result.update(state_obj.model_dump())
-                
-            elif attempts < max_attempts:
-                print("💭 Let me ask this in a different way or give you a hint...\n")
-                
-            else:
-                print("💡 No worries! Let's build on what you do know and continue learning.")
-                if result.get("retrieved_chunks"):
-                    context = result["retrieved_chunks"][0][:300] + "..."
-                    print(f"📖 Here's some context: {context}")
-                print("✅ Let's move forward with your learning journey.\n")
-                correct = True
-                
-                # Store the answer for learning purposes
-                from agents.nodes.store_answers_node import store_answer
-                state_obj = TutorAgentState(**result)
-                state_obj = await store_answer(state_obj)
-                result.update(state_obj.model_dump())
-        
-        # Check if user wants to exit
-        if user_answer.lower() in {"stop", "exit", "quit"}:
-            break
-            
-        question_index += 1
-        
-        # After each question, ask if they want to continue or if they have questions
-        if question_index < len(result["questions"]):
-            continue_input = input("Ready for the next question? (press Enter to continue, or type 'stop' to end): ").strip()
-            if continue_input.lower() in {"stop", "exit", "quit"}:
-                print("👋 Great learning session!")
-                break
+    while True:
+        covered = list(dict.fromkeys(list(result.get("covered_concepts") or []) + [concept_input]))
+        await prefetcher.start(covered, topics)
 
-    # Session complete
-    print("\n🎉 Learning session complete!")
-    
-    # Get next suggestion
-    from agents.nodes.suggest_next_node import suggest_next_unseen_concept
-    state_obj = TutorAgentState(**result)
-    state_obj = await suggest_next_unseen_concept(state_obj)
-    result.update(state_obj.model_dump())
-    
-    if result.get("next_suggestion"):
+        print_separator()
+        print(f"[🗣️] Learning session started for: {concept_input}")
+        print("Type 'stop', 'exit', or 'quit' at any time to end the session.")
+        print_separator()
+
+        await run_questions(result)
+
+        # Session complete
+        print("\n🎉 Learning session complete!")
+        result["covered_concepts"] = covered
+
+        # If there are any correct answers queued for embedding, process them
+        if result.get("pending_embeddings"):
+            print("📎 Saving your learning progress...")
+            # The embedding call blocks; keep the prefetch task running meanwhile
+            await asyncio.to_thread(embed_and_store_user_answers, result["pending_embeddings"])
+            result["pending_embeddings"] = []
+            print("✅ Your learning progress has been saved!")
+
+        # Get next suggestion
+        # Suggest from the extracted topics, as the prefetcher predicted
+        state_obj = TutorAgentState(**{**result, "topics": topics})
+        state_obj = await suggest_next_unseen_concept(state_obj)
+        result.update(state_obj.model_dump())
+
+        next_id = result.get("next_suggestion_id")
+        if not next_id:
+            break
         print(f"👉 Suggested next concept to explore: {result['next_suggestion']}")
-        
-    # If there are any correct answers queued for embedding, process them
-    if result.get("pending_embeddings"):
-        print("📎 Saving your learning progress...")
-        embed_and_store_user_answers(result["pending_embeddings"])
-        result["pending_embeddings"] = []
-        print("✅ Your learning progress has been saved!")
-    
+        start_next = (await asyncio.to_thread(input, "Start it now? (y/N): ")).strip().lower()
+        if start_next not in {"y", "yes"}:
+            break
+
+        next_state = await prefetcher.take(next_id)
+        if next_state is not None:
+            print("⚡ Questions were prepared while you were answering:")
+            print("\n".join(f"- {q.text}" for q in next_state.questions))
+        else:
+            print("📝 Preparing questions...")
+            next_state = TutorAgentState(**await stream_learn_session(graph, dict(
+                TutorAgentState(mode="learn", target_concept_id=next_id, user_input=next_id, covered_concepts=covered)
+            )))
+        if not next_state.questions:
+            print("⚠️ No questions generated. Try a different topic or check your docs.")
+            break
+        concept_input = next_id
+        result = dict(next_state)
+
+    prefetcher.cancel()
+
+    from tools.feedback_cache import feedback_cache_stats
+    cache_stats = feedback_cache_stats()
+    if cache_stats["hits"]:
+        print(
+            f"⚡ Reused {cache_stats['hits']} graded answers from the feedback cache "
+            f"(hit rate {cache_stats['hit_rate']:.0%}, ~{cache_stats['saved_seconds']:.1f}s saved)"
+        )
+    from tools.streaming import stream_stats
+    for name, timing in stream_stats().items():
+        print(f"⏱️ {name}: first token after {timing['ttft_avg_ms']:.0f} ms on average ({timing['streams']} streams)")
+    prefetch_stats = prefetcher.stats()
+    if prefetch_stats["started"]:
+        print(
+            f"🔮 Prepared {prefetch_stats['started']} sessions ahead of time: "
+            f"{prefetch_stats['used']} used, {prefetch_stats['discarded']} discarded"
+        )
+
     print_separator()
     print("Thanks for learning with the LangGraph Tutor Agent! 🚀")
 
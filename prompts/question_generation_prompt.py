@@ -2,7 +2,7 @@
 
 # The prompt is represented as a list of (role, content) tuples. It instructs
 # the model to produce two conceptual questions and one coding challenge based
-# directly on the provided documentation context. The ``{{context}}`` variable
+# directly on the provided documentation context. The ``{context}`` variable
 # will be replaced with the combined text of the retrieved documentation
 # chunks.
 
@@ -27,6 +27,6 @@ Return the questions as a list of strings, one per line, starting with a dash (-
     ),
     (
         "user",
-        "{{context}}",
+        "{context}",
     ),
 ]
\ No newline at end of file
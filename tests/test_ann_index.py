@@ -0,0 +1,86 @@
+"""Tests for the ANN index variants built next to the flat index."""
+
+import numpy as np
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import FAISS
+
+from tools.ann_index import AnnConfig, build_ann_index, load_index_meta, read_search_index
+from tools.mmap_store import save_store
+from tools.vector_registry import VectorStoreRegistry
+
+
+def _build_flat(path, n=600, d=16, decay=None):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((n, d)).astype(np.float32)
+    if decay:
+        # Front-load the variance like Matryoshka embeddings, so truncation is meaningful
+        vectors *= np.exp(-np.arange(d) / decay).astype(np.float32)
+    store = FAISS.from_embeddings(
+        [(f"chunk {i}", v.tolist()) for i, v in enumerate(vectors)],
+        DeterministicFakeEmbedding(size=d),
+        metadatas=[{"source": f"docs/{i % 7}.md"} for i in range(n)],
+        ids=[f"{i:064x}" for i in range(n)],
+    )
+    save_store(store, path)
+    return store
+
+
+def test_ann_kinds_build_and_load(tmp_path):
+    print("🧪 Testing ANN index kinds...")
+    store = _build_flat(tmp_path)
+    for kind in ("ivf_flat", "hnsw", "ivf_pq"):
+        meta = build_ann_index(store.index, tmp_path, AnnConfig(kind=kind, pq_m=4, pq_nbits=6))
+        assert meta["kind"] == kind
+        assert meta["recall_at_10"] > 0.5
+        index, loaded_kind = read_search_index(tmp_path, mmap=True)
+        assert loaded_kind == kind
+        assert index.ntotal == 600
+
+        handle = VectorStoreRegistry(embeddings_factory=lambda: DeterministicFakeEmbedding(size=16)).get(str(tmp_path))
+        assert handle.stats.index_kind == kind
+        assert len(handle.search_rows("chunk 3", k=5, nprobe=4, ef_search=32)) == 5
+        print(f"✅ {kind}: recall@10 {meta['recall_at_10']}")
+
+    # Switching back to flat removes the ANN variant
+    build_ann_index(store.index, tmp_path, AnnConfig(kind="flat"))
+    assert load_index_meta(tmp_path)["kind"] == "flat"
+    assert not (tmp_path / "index.ann.faiss").exists()
+
+
+def test_small_corpus_falls_back_to_flat(tmp_path):
+    store = _build_flat(tmp_path, n=50)
+    meta = build_ann_index(store.index, tmp_path, AnnConfig(kind="ivf_pq"))
+    assert meta["kind"] == "flat"
+    assert read_search_index(tmp_path)[1] == "flat"
+
+
+def test_quantized_storage_with_rescoring(tmp_path):
+    print("🧪 Testing quantized + truncated storage...")
+    store = _build_flat(tmp_path, n=600, d=32, decay=6)
+    meta = build_ann_index(store.index, tmp_path, AnnConfig(kind="flat", storage="int8", dims=16, rescore=8))
+    assert meta["storage"] == "int8" and meta["dims"] == 16
+    assert meta["search"]["rescore"] == 8
+    # int8 x 16 dims instead of float32 x 32 dims: well under a quarter of the flat vectors
+    assert meta["bytes"] < 600 * 32 * 4 / 4
+    assert meta["recall_at_10"] >= meta["recall_at_10_raw"]
+    assert meta["recall_at_10"] > 0.9
+
+    handle = VectorStoreRegistry(embeddings_factory=lambda: DeterministicFakeEmbedding(size=32)).get(str(tmp_path))
+    assert handle.stats.mapped_bytes > handle.stats.resident_bytes
+    query = store.index.reconstruct(7).reshape(1, -1)
+    _, exact = store.index.search(query, 5)
+    _, found = handle._store.index.search(query, 5)
+    assert found[0][0] == exact[0][0] == 7
+    assert len(handle.search_rows("chunk 7", k=5, rescore=2)) == 5
+    print(f"✅ int8/16-dim storage: recall@10 {meta['recall_at_10_raw']} raw, {meta['recall_at_10']} re-scored")
+
+
+def test_storage_report_rows(tmp_path):
+    from tools.ann_index import storage_report
+
+    store = _build_flat(tmp_path, n=300, d=32)
+    rows = storage_report(store.index, AnnConfig())
+    assert {(r["storage"], r["dims"]) for r in rows} >= {("float32", 32), ("float16", 16), ("int8", 8)}
+    full = next(r for r in rows if r["storage"] == "float32" and r["dims"] == 32)
+    assert full["recall"] == 1.0 and full["ratio"] == 1.0
+    assert next(r for r in rows if r["storage"] == "int8" and r["dims"] == 32)["ratio"] == 4.0
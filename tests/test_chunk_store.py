@@ -0,0 +1,39 @@
+"""Tests for the compact chunk store."""
+
+from langchain_core.documents import Document
+
+from tools.chunk_store import ChunkStore, write_chunk_store
+
+
+def _rows():
+    return [
+        ("a" * 64, Document(page_content="StateGraph basics ✨", metadata={"source": "docs/langgraph/a.md", "start_index": 0})),
+        ("b" * 64, Document(page_content="", metadata={"source": "docs/langgraph/a.md", "start_index": 20})),
+        ("c" * 64, Document(page_content="Tools are functions.", metadata={"source": "docs/langchain/tools.md", "category": "LangChain"})),
+    ]
+
+
+def test_chunk_store_round_trip(tmp_path):
+    print("🧪 Testing chunk store round trip...")
+    rows = _rows()
+    assert write_chunk_store(rows, tmp_path / "chunks") == 3
+
+    store = ChunkStore(tmp_path / "chunks")
+    assert len(store) == 3
+    # Sources are interned: two chunks share one entry
+    assert store.sources == ["docs/langgraph/a.md", "docs/langchain/tools.md"]
+    for row, (doc_id, doc) in enumerate(rows):
+        loaded = store.document(row)
+        assert loaded.id == doc_id
+        assert loaded.page_content == doc.page_content
+        assert loaded.metadata == doc.metadata
+    assert list(store.iter_texts()) == [doc.page_content for _, doc in rows]
+    assert {d.id for d in store.sample(2, seed=1)} <= {doc_id for doc_id, _ in rows}
+    print("✅ Chunks, ids and metadata survive the round trip")
+
+
+def test_chunk_store_rewrite_replaces_previous(tmp_path):
+    write_chunk_store(_rows(), tmp_path / "chunks")
+    write_chunk_store(_rows()[:1], tmp_path / "chunks")
+    assert len(ChunkStore(tmp_path / "chunks")) == 1
+    assert not (tmp_path / "chunks.tmp").exists()
@@ -0,0 +1,67 @@
+"""Tests for the shared, pooled LLM and embedding clients."""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tools import clients
+
+
+class StandInOpenAI(BaseHTTPRequestHandler):
+    """Minimal chat-completions endpoint that records the client port of each request."""
+
+    protocol_version = "HTTP/1.1"
+    ports = []
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        StandInOpenAI.ports.append(self.client_address[1])
+        body = json.dumps({
+            "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-4",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "Correct!"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_clients_reuse_one_connection(monkeypatch):
+    print("🧪 Testing pooled client connection reuse...")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInOpenAI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    clients.reset_clients()
+    StandInOpenAI.ports = []
+    try:
+        async def session():
+            assert clients.get_chat_model("feedback") is clients.get_chat_model("feedback")
+            for role in ("feedback", "questions", "review"):
+                await clients.get_chat_model(role).ainvoke("Is this right?")
+
+        asyncio.run(session())
+        for _ in range(2):
+            clients.get_chat_model("doc_search").invoke("Where is StateGraph documented?")
+
+        # Three async calls over one pooled connection, two blocking calls over another
+        assert len(StandInOpenAI.ports) == 5
+        assert len(set(StandInOpenAI.ports[:3])) == 1 and len(set(StandInOpenAI.ports[3:])) == 1
+        assert clients.get_embeddings().http_client is clients.sync_http_client()
+        print(f"✅ 5 requests over {len(set(StandInOpenAI.ports))} connections; {clients.client_stats()}")
+    finally:
+        clients.reset_clients()
+        server.shutdown()
+        server.server_close()
+
+
+def test_chat_settings_per_role(monkeypatch):
+    monkeypatch.setenv("TUTOR_MODEL_REVIEW", "gpt-4o-mini")
+    assert clients.chat_settings("review") == {"model": "gpt-4o-mini", "temperature": 0.5}
+    assert clients.chat_settings("topics", seed=3)["seed"] == 3
@@ -0,0 +1,108 @@
+"""Tests for the batched, resumable embedding pipeline."""
+
+import asyncio
+
+import numpy as np
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from tools.embed_pipeline import aembed_texts
+
+
+class FlakyEmbeddings(DeterministicFakeEmbedding):
+    calls: int = 0
+    fail_on_call: int = 0
+
+    async def aembed_documents(self, texts):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise RuntimeError("simulated API outage")
+        return self.embed_documents(texts)
+
+
+def test_batches_preserve_order(tmp_path):
+    texts = [f"chunk {i}" for i in range(10)]
+    embeddings = FlakyEmbeddings(size=8)
+    vectors = asyncio.run(aembed_texts(texts, embeddings, batch_size=3, concurrency=2, checkpoint_dir=tmp_path))
+    assert embeddings.calls == 4
+    assert np.allclose(vectors[7], DeterministicFakeEmbedding(size=8).embed_query("chunk 7"), atol=1e-6)
+
+
+def test_interrupted_build_resumes_from_checkpoints(tmp_path):
+    print("🧪 Testing resumable embedding...")
+    texts = [f"chunk {i}" for i in range(9)]
+    embeddings = FlakyEmbeddings(size=8, fail_on_call=3)
+    try:
+        asyncio.run(aembed_texts(texts, embeddings, batch_size=3, concurrency=1, checkpoint_dir=tmp_path, max_retries=1))
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("Expected the simulated outage to abort the build")
+    assert len(list(tmp_path.glob("*.npy"))) == 2
+
+    resumed = FlakyEmbeddings(size=8)
+    vectors = asyncio.run(aembed_texts(texts, resumed, batch_size=3, concurrency=1, checkpoint_dir=tmp_path))
+    assert resumed.calls == 1
+    assert len(vectors) == 9
+    print("✅ Only the unfinished batch was re-embedded")
+
+
+def test_streaming_bounds_batches_in_flight(tmp_path):
+    print("🧪 Testing bounded in-flight streaming...")
+    from tools.embed_pipeline import aembed_batches
+
+    produced = []
+
+    def batches():
+        for i in range(20):
+            produced.append(i)
+            yield i, [f"chunk {i}"]
+
+    async def consume():
+        lag = []
+        async for payload, vectors in aembed_batches(
+            batches(), FlakyEmbeddings(size=8), max_in_flight=3, checkpoint_dir=None
+        ):
+            lag.append(len(produced) - payload)
+            assert vectors.shape == (1, 8)
+        return lag
+
+    lag = asyncio.run(consume())
+    assert max(lag) <= 3
+    print("✅ Never more than 3 batches read ahead of the consumer")
+
+
+def test_blocking_producer_runs_off_the_event_loop(tmp_path):
+    print("🧪 Testing threaded batch producer...")
+    import threading
+    import time
+    from tools.embed_pipeline import aembed_batches, aiter_in_thread
+
+    producer_threads = set()
+
+    def batches():
+        for i in range(6):
+            producer_threads.add(threading.get_ident())
+            time.sleep(0.01)  # waiting on the splitter's process pool
+            yield i, [f"chunk {i}"]
+
+    async def consume():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        tick_task = asyncio.create_task(ticker())
+        payloads = [payload async for payload, _ in aembed_batches(
+            aiter_in_thread(batches(), block_size=2), FlakyEmbeddings(size=8), checkpoint_dir=None
+        )]
+        tick_task.cancel()
+        return payloads, ticks
+
+    payloads, ticks = asyncio.run(consume())
+    assert payloads == list(range(6))
+    assert threading.get_ident() not in producer_threads
+    assert ticks > 10  # the event loop kept running while the producer blocked
+    print("✅ Producer ran in a worker thread without stalling the event loop")
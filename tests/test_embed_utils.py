@@ -0,0 +1,47 @@
+"""Tests for the append-only user answer index."""
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from tools import embed_utils
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    embedded: int = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return super().embed_documents(texts)
+
+
+def test_sessions_append_and_skip_duplicates(tmp_path, monkeypatch):
+    print("🧪 Testing incremental user answer index...")
+    monkeypatch.setattr(embed_utils, "VECTORSTORE_ROOT", tmp_path)
+    monkeypatch.setattr(embed_utils, "COMPACT_EVERY", 3)
+    embeddings = CountingEmbeddings(size=8)
+    meta = {"concept_id": "langgraph.stategraph_basics", "question": "What is a StateGraph?"}
+
+    embed_utils.embed_texts_and_save(["A graph of nodes sharing state"], [meta], embeddings=embeddings)
+    embed_utils.embed_texts_and_save(
+        ["A graph of nodes sharing state", "It wires nodes with edges"], [meta, meta], embeddings=embeddings
+    )
+    # The repeated answer is not embedded twice
+    assert embeddings.embedded == 2
+    store = embed_utils.load_user_answers_store(embeddings=embeddings)
+    assert store.index.ntotal == 2
+
+    # The third segment triggers compaction into the base index
+    embed_utils.embed_texts_and_save(["Compile it before invoking"], [meta], embeddings=embeddings)
+    assert (tmp_path / "user_answers" / "index.faiss").exists()
+    # No compressed copy that nothing would read
+    assert not (tmp_path / "user_answers" / "index.ann.faiss").exists()
+    assert not list((tmp_path / "user_answers").glob("segments/seg_*.npy"))
+    assert embed_utils.load_user_answers_store(embeddings=embeddings).index.ntotal == 3
+    print("✅ Sessions append new answers and compact periodically")
+
+
+def test_namespace_is_honoured(tmp_path, monkeypatch):
+    monkeypatch.setattr(embed_utils, "VECTORSTORE_ROOT", tmp_path)
+    embeddings = CountingEmbeddings(size=8)
+    embed_utils.embed_texts_and_save(["answer"], [{"concept_id": "x"}], namespace="other", embeddings=embeddings)
+    assert (tmp_path / "other" / "hashes.txt").exists()
+    assert not (tmp_path / "user_answers").exists()
@@ -0,0 +1,49 @@
+"""Tests for the two-tier query embedding cache."""
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from tools.embedding_cache import CachedQueryEmbeddings, QueryEmbeddingCache
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    calls: int = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        return super().embed_query(text)
+
+
+def test_query_cache_tiers(tmp_path):
+    print("🧪 Testing query embedding cache...")
+    db_path = tmp_path / "query_cache.sqlite"
+    inner = CountingEmbeddings(size=8)
+    cached = CachedQueryEmbeddings(inner, QueryEmbeddingCache(db_path, max_memory_items=2))
+
+    first = cached.embed_query("langgraph.stategraph_basics")
+    again = cached.embed_query("  langgraph.stategraph_basics ")
+    assert first == again
+    assert inner.calls == 1
+    assert cached.cache.stats()["memory_hits"] == 1
+
+    # A fresh process (new cache object) is served from the SQLite tier
+    restarted = CachedQueryEmbeddings(inner, QueryEmbeddingCache(db_path))
+    assert restarted.embed_query("langgraph.stategraph_basics") == first
+    assert inner.calls == 1
+    stats = restarted.cache.stats()
+    assert stats["disk_hits"] == 1 and stats["misses"] == 0
+    print(f"✅ Cache stats: {stats}")
+
+
+def test_query_cache_lru_eviction():
+    cache = QueryEmbeddingCache(path=None, max_memory_items=2)
+    for text in ("a", "b", "c"):
+        cache.put("model", text, [1.0])
+    assert cache.get("model", "a") is None
+    assert cache.get("model", "c") == [1.0]
+    assert cache.stats()["misses"] == 1
+
+
+def test_query_cache_keyed_by_model():
+    cache = QueryEmbeddingCache(path=None)
+    cache.put("text-embedding-3-small", "tools", [0.5])
+    assert cache.get("text-embedding-ada-002", "tools") is None
@@ -0,0 +1,74 @@
+"""Tests for the persistent feedback cache."""
+
+import asyncio
+
+from langchain_core.messages import AIMessage
+
+from agents.nodes import generate_feedback_node
+from agents.state import TutorAgentState
+from agents.types import ConceptQuestion
+from tools.feedback_cache import FeedbackCache, feedback_key
+
+
+SETTINGS = {"model": "gpt-4", "temperature": 0, "prompt": "p"}
+
+
+class CountingLLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        return AIMessage(content="Correct! Chains compose runnables.")
+
+
+def test_feedback_cache_ttl_and_eviction(tmp_path):
+    print("🧪 Testing feedback cache...")
+    path = tmp_path / "feedback.sqlite"
+    cache = FeedbackCache(path, max_entries=2)
+    keys = [feedback_key(SETTINGS, "What is LCEL?", answer, "") for answer in ("a", "b", "c")]
+    assert feedback_key(SETTINGS, "What is LCEL?", "  The PIPE operator. ", "") == \
+        feedback_key(SETTINGS, "What is LCEL?", "the pipe operator", "")
+    # Code answers keep identifier case, so a wrong spelling is graded on its own
+    assert feedback_key(SETTINGS, "Which checkpointer?", "Use MemorySaver", "") != \
+        feedback_key(SETTINGS, "Which checkpointer?", "use memorysaver", "")
+    assert feedback_key(SETTINGS, "Which checkpointer?", "Use  MemorySaver\n", "") == \
+        feedback_key(SETTINGS, "Which checkpointer?", "Use MemorySaver", "")
+    assert feedback_key(SETTINGS, "What is LCEL?", "a", "") != feedback_key({**SETTINGS, "model": "gpt-4o"}, "What is LCEL?", "a", "")
+
+    for key in keys:
+        cache.put(key, f"feedback {key[:4]}", True, latency=2.0)
+    assert cache.get(keys[0]) is None  # least recently used, evicted
+    assert cache.get(keys[2]) == (f"feedback {keys[2][:4]}", True)
+
+    # A new process sees the entry and its lifetime reuse count
+    stats = FeedbackCache(path).stats()
+    assert stats["entries"] == 2 and stats["lifetime_hits"] == 1 and stats["lifetime_saved_seconds"] == 2.0
+
+    expired = FeedbackCache(path, ttl_seconds=0)
+    assert expired.get(keys[2]) is None
+    assert cache.stats()["hit_rate"] == 0.5
+    print("✅ LRU eviction, TTL expiry and hit stats work")
+
+
+def test_generate_feedback_reuses_cached_grading(monkeypatch):
+    print("🧪 Testing cached feedback node...")
+    llm = CountingLLM()
+    cache = FeedbackCache(":memory:")
+    monkeypatch.setattr(generate_feedback_node, "_llm", lambda: llm)
+    monkeypatch.setattr(generate_feedback_node, "get_feedback_cache", lambda: cache)
+
+    def attempt(answer):
+        state = TutorAgentState(
+            user_input=answer,
+            current_question=ConceptQuestion(concept_id="langchain", text="What does the | operator do?"),
+            retrieved_chunks=["LCEL composes runnables with |."],
+        )
+        return asyncio.run(generate_feedback_node.generate_feedback(state))
+
+    first = attempt("It chains runnables.")
+    again = attempt("it chains runnables")
+    assert llm.calls == 1
+    assert (again.last_feedback, again.last_correct) == (first.last_feedback, True)
+    assert cache.stats()["hits"] == 1
+    print("✅ Repeated answer graded without an LLM call")
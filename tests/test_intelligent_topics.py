@@ -10,11 +10,12 @@ async def test_extraction():
     print("🔧 Environment check:")
     print(f"  - OpenAI API Key: {'✅' if 'OPENAI_API_KEY' in os.environ else '❌'}")
     
-    raw_docs_path = Path('data/raw_docs.pkl')
-    print(f"  - Raw docs exist: {'✅' if raw_docs_path.exists() else '❌'}")
+    chunk_store_path = Path('embeddings/vector_store/chunks')
+    print(f"  - Chunk store exists: {'✅' if chunk_store_path.exists() else '❌'}")
     
-    if raw_docs_path.exists():
-        print(f"  - Raw docs size: {raw_docs_path.stat().st_size:,} bytes")
+    if chunk_store_path.exists():
+        size = sum(f.stat().st_size for f in chunk_store_path.iterdir())
+        print(f"  - Chunk store size: {size:,} bytes")
     
     # Check cached topics
     cached_path = Path('data/extracted_topics.json')
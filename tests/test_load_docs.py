@@ -0,0 +1,77 @@
+"""Tests for the incremental docs sync in tools/load_docs.py."""
+
+import subprocess
+
+from tools import load_docs
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        check=True,
+        capture_output=True,
+    )
+
+
+def test_sync_copies_only_changed_files(tmp_path, monkeypatch):
+    print("🧪 Testing change-aware doc sync...")
+    monkeypatch.chdir(tmp_path)
+    remote = tmp_path / "remote"
+    (remote / "docs/how_to").mkdir(parents=True)
+    (remote / "docs/how_to/agents.md").write_text("Agents call tools.", encoding="utf-8")
+    (remote / "docs/how_to/graphs.md").write_text("Graphs have nodes.", encoding="utf-8")
+    (remote / "docs/how_to/setup.py").write_text("print('ignored')", encoding="utf-8")
+    subprocess.run(["git", "init", "-q", str(remote)], check=True)
+    _git(remote, "add", "-A")
+    _git(remote, "commit", "-q", "-m", "initial")
+
+    dest = tmp_path / "docs/example"
+    repos = {"Example": (f"file://{remote}", load_docs.UNCLEANED_DIR / "example_repo", dest)}
+
+    state = load_docs.clone_and_extract_docs(repos=repos)
+    assert state["Example"]["mode"] == "full"
+    assert sorted(p.name for p in dest.iterdir()) == ["docs_how_to_agents.md", "docs_how_to_graphs.md"]
+
+    # Upstream edits one file and deletes another
+    (remote / "docs/how_to/agents.md").write_text("Agents call tools in a loop.", encoding="utf-8")
+    _git(remote, "rm", "-q", "docs/how_to/graphs.md")
+    _git(remote, "commit", "-q", "-am", "update")
+
+    state = load_docs.clone_and_extract_docs(repos=repos)
+    assert state["Example"]["mode"] == "incremental"
+    assert (state["Example"]["written"], state["Example"]["deleted"]) == (1, 1)
+    assert [p.name for p in dest.iterdir()] == ["docs_how_to_agents.md"]
+    assert (dest / "docs_how_to_agents.md").read_text(encoding="utf-8") == "Agents call tools in a loop."
+    assert load_docs.load_sync_state()["Example"]["commit"] == state["Example"]["commit"]
+    print("✅ Only the changed files were synced")
+
+
+def test_sync_resolves_colliding_flattened_names(tmp_path, monkeypatch):
+    print("🧪 Testing flattened-name collisions...")
+    monkeypatch.chdir(tmp_path)
+    remote = tmp_path / "remote"
+    for lib, text in (("a", "From lib a."), ("b", "From lib b.")):
+        (remote / f"libs/{lib}/docs/guide").mkdir(parents=True)
+        (remote / f"libs/{lib}/docs/guide/x.md").write_text(text, encoding="utf-8")
+    subprocess.run(["git", "init", "-q", str(remote)], check=True)
+    _git(remote, "add", "-A")
+    _git(remote, "commit", "-q", "-m", "initial")
+
+    dest = tmp_path / "docs/example"
+    repos = {"Example": (f"file://{remote}", load_docs.UNCLEANED_DIR / "example_repo", dest)}
+    load_docs.clone_and_extract_docs(repos=repos)
+    assert (dest / "docs_guide_x.md").read_text(encoding="utf-8") == "From lib a."
+
+    # Editing the shadowed source changes nothing
+    (remote / "libs/b/docs/guide/x.md").write_text("From lib b, edited.", encoding="utf-8")
+    _git(remote, "commit", "-q", "-am", "edit b")
+    state = load_docs.clone_and_extract_docs(repos=repos)
+    assert (state["Example"]["written"], state["Example"]["deleted"]) == (0, 0)
+
+    # Deleting the winner keeps the file, now with the remaining source
+    _git(remote, "rm", "-q", "libs/a/docs/guide/x.md")
+    _git(remote, "commit", "-q", "-m", "drop a")
+    state = load_docs.clone_and_extract_docs(repos=repos)
+    assert (state["Example"]["written"], state["Example"]["deleted"]) == (1, 0)
+    assert (dest / "docs_guide_x.md").read_text(encoding="utf-8") == "From lib b, edited."
+    print("✅ Colliding sources resolve to one deterministic file")
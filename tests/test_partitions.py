@@ -0,0 +1,81 @@
+"""Tests for category-partitioned retrieval."""
+
+import json
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from tools import prep_docs, retrieval
+from tools.chunk_store import ChunkStore
+from tools.vector_registry import VectorStoreRegistry
+
+
+DOCS = {
+    "langchain/tools.md": "Tools are functions an agent can call.",
+    "langchain/agents.md": "Agents decide which tool to call next.",
+    "langchain/memory.md": "Memory keeps earlier messages around for the agent.",
+    "langgraph/checkpoints.md": "Checkpointers persist graph state between runs.",
+    "langgraph/graphs.md": "A StateGraph is compiled before it can be invoked.",
+}
+
+TOPICS = [
+    {"id": "langchain.tools", "name": "Tools", "category": "LangChain", "keywords": ["tools"]},
+    {"id": "langgraph.checkpointing", "name": "Checkpointing", "category": "LangGraph", "keywords": ["checkpointers"]},
+]
+
+
+def test_target_topic_searches_its_category_only(tmp_path, monkeypatch):
+    print("🧪 Testing category partitions...")
+    monkeypatch.chdir(tmp_path)
+    for name, text in DOCS.items():
+        path = tmp_path / "docs" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data/extracted_topics.json").write_text(json.dumps(TOPICS), encoding="utf-8")
+    embeddings = DeterministicFakeEmbedding(size=16)
+    prep_docs.prepare_and_index_docs(embeddings=embeddings)
+
+    store = ChunkStore(tmp_path / "embeddings/vector_store/chunks")
+    tags = {store.source(row): store.metadata(row) for row in range(len(store))}
+    assert tags["docs/langgraph/checkpoints.md"]["category"] == "LangGraph"
+    assert tags["docs/langgraph/checkpoints.md"]["topic_ids"] == ["langgraph.checkpointing"]
+    assert tags["docs/langchain/tools.md"]["topic_ids"] == ["langchain.tools"]
+
+    registry = VectorStoreRegistry(embeddings_factory=lambda: embeddings, load_mode="mmap")
+    monkeypatch.setattr(retrieval, "get_vector_store", registry.get)
+    handle = registry.get(prep_docs.VECTORSTORE_PATH)
+    assert {key: len(p) for key, p in handle.partitions.items()} == {"langchain": 3, "langgraph": 2}
+    # Partitions filter the main search index; no second copy of the vectors
+    assert not list((tmp_path / "embeddings/vector_store/partitions").glob("*.faiss"))
+
+    for query in ("how do agents call tools", "Checkpointers", "langchain.tools"):
+        docs = retrieval.search_docs(query, k=2, topic_id="langgraph.checkpointing", use_topic_cache=False)
+        assert {d.metadata["category"] for d in docs} == {"LangGraph"}
+    docs = retrieval.search_docs("how do agents call tools", k=5)
+    assert len(docs) == 5
+    print("✅ Searches for a target topic stay inside its category")
+
+
+def test_partition_filters_compressed_ann_index(tmp_path):
+    print("🧪 Testing partition filtering on ANN indexes...")
+    import faiss
+    import numpy as np
+
+    from tools.ann_index import AnnConfig, _build, _with_rescore, search_parameters
+    from tools.partitions import build_partitions, load_partitions
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((600, 32), dtype=np.float32)
+    flat = faiss.IndexFlatL2(32)
+    flat.add(vectors)
+    metadatas = [{"source": f"docs/{'langgraph' if row % 3 == 0 else 'langchain'}/x.md"} for row in range(600)]
+    build_partitions(len(metadatas), metadatas, tmp_path)
+    part = load_partitions(tmp_path, 600)["langgraph"]
+    assert len(part) == 200
+
+    for config in (AnnConfig(kind="hnsw", storage="int8"), AnnConfig(kind="ivf_flat", storage="float16", dims=16)):
+        index, _, _ = _build(config, vectors)
+        index = _with_rescore(index, flat, 4)
+        _, rows = index.search(vectors[:20], 5, params=search_parameters(index, selector=part.selector))
+        assert all(row in part for row in rows.ravel() if row != -1)
+    print("✅ Filtered searches keep the configured index and stay in the partition")
@@ -0,0 +1,46 @@
+"""Tests for the Aho-Corasick matcher and quick topic counting."""
+
+import random
+
+import numpy as np
+from langchain_core.documents import Document
+
+from agents.nodes import quick_topic_extractor as quick
+from tools.chunk_store import ChunkStore, write_chunk_store
+from tools.pattern_matcher import PatternMatcher
+
+
+def test_matcher_agrees_with_substring_search():
+    print("🧪 Testing single-pass pattern matching...")
+    patterns = ["state", "stategraph", "graph", "add_edge", "edge", "tool", "tools", "é"]
+    matcher = PatternMatcher((p, i) for i, p in enumerate(patterns))
+    rng = random.Random(0)
+    vocab = ["StateGraph", "add_edge", "tools", "node", "Edges", "café", "x", "stat", "grap"]
+    texts = [" ".join(rng.choice(vocab) for _ in range(rng.randint(0, 30))) for _ in range(300)]
+    bits = [matcher.labels(text) for text in texts]
+    assert bits == [{i for i, p in enumerate(patterns) if p in text.lower()} for text in texts]
+    assert matcher.count(["StateGraph", "state", "none"]).tolist()[:3] == [2, 1, 1]
+    print("✅ Automaton finds every (nested) pattern in one pass")
+
+
+def test_topic_counts_match_across_workers(tmp_path, monkeypatch):
+    print("🧪 Testing parallel topic frequency counts...")
+    rows = []
+    for i in range(40):
+        category = "langgraph" if i % 2 else "langchain"
+        text = f"Chunk {i}: " + ("Build a StateGraph and add_node" if i % 4 == 1 else "An agent calls a tool")
+        rows.append((f"c{i}", Document(page_content=text, metadata={"source": f"docs/{category}/page_{i % 5}.md"})))
+    write_chunk_store(rows, tmp_path)
+    store = ChunkStore(tmp_path)
+
+    serial = quick.count_topics(store, workers=1)
+    monkeypatch.setattr(quick, "CHUNKS_PER_TASK", 7)
+    parallel = quick.count_topics(store, workers=2)
+    assert np.array_equal(serial, parallel)
+
+    counts = dict(zip(quick.topic_labels(), serial.tolist()))
+    assert counts[("LangChain", "Agents")] == 30
+    assert counts[("LangGraph", "StateGraph Basics")] == 10
+    # Path patterns only apply under their category: every docs/langgraph chunk counts
+    assert counts[("LangGraph", "Graph Construction")] == 20
+    print("✅ Topic frequencies identical for serial and pooled scans")
@@ -0,0 +1,110 @@
+"""Tests for the speculative next-session prefetcher."""
+
+import asyncio
+import json
+
+from agents import prefetch
+from agents.prefetch import SessionPrefetcher
+from agents.types import ConceptQuestion
+from tools.notices import notice
+
+
+CONCEPTS = [
+    {"id": "langchain.prompt_templates", "name": "Prompt Templates", "prerequisites": []},
+    {"id": "langgraph.stategraph", "name": "StateGraph Basics", "prerequisites": []},
+    {"id": "langgraph.conditional_edges", "name": "Conditional Edges", "prerequisites": ["langgraph.stategraph"]},
+]
+
+
+def fake_pipeline(monkeypatch, delay=0.0):
+    calls = []
+
+    def retrieve(state):
+        calls.append(("retrieve", state.target_concept_id))
+        state.retrieved_chunks = [f"Docs about {state.target_concept_id}."]
+        return state
+
+    async def generate(state):
+        calls.append(("generate", state.target_concept_id))
+        notice(f"🏦 Serving questions for {state.target_concept_id}")
+        await asyncio.sleep(delay)
+        state.questions = [ConceptQuestion(concept_id=state.target_concept_id, text=f"What is {state.target_concept_id}?")]
+        return state
+
+    monkeypatch.setattr(prefetch, "retrieve_chunks", retrieve)
+    monkeypatch.setattr(prefetch, "generate_concept_and_code_questions", generate)
+    return calls
+
+
+def write_concepts(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "concepts.json").write_text(json.dumps(CONCEPTS), encoding="utf-8")
+
+
+def test_prefetched_session_is_ready_for_the_suggested_concept(monkeypatch, tmp_path, capsys):
+    print("🧪 Testing session prefetch...")
+    write_concepts(monkeypatch, tmp_path)
+    calls = fake_pipeline(monkeypatch)
+
+    async def session():
+        prefetcher = SessionPrefetcher(max_sessions=3, enabled=True)
+        predicted = await prefetcher.start(["langchain.prompt_templates", "langgraph.stategraph"])
+        await asyncio.sleep(0.05)  # the learner is answering
+        assert "Serving" not in capsys.readouterr().out
+        state = await prefetcher.take(predicted)
+        return predicted, state, prefetcher.stats()
+
+    predicted, state, stats = asyncio.run(session())
+    assert predicted == "langgraph.conditional_edges"
+    assert [q.text for q in state.questions] == ["What is langgraph.conditional_edges?"]
+    assert state.covered_concepts == ["langchain.prompt_templates", "langgraph.stategraph"]
+    assert calls == [("retrieve", predicted), ("generate", predicted)]
+    assert f"🏦 Serving questions for {predicted}" in capsys.readouterr().out
+    assert stats["used"] == 1 and stats["ready"] == 1 and stats["discarded"] == 0
+    print("✅ Next session prepared in the background and handed over")
+
+
+def test_prefetch_is_cancelled_and_capped(monkeypatch, tmp_path):
+    print("🧪 Testing prefetch cancellation and spend cap...")
+    write_concepts(monkeypatch, tmp_path)
+    fake_pipeline(monkeypatch, delay=10)
+
+    async def session():
+        prefetcher = SessionPrefetcher(max_sessions=1, enabled=True)
+        await prefetcher.start(["langchain.prompt_templates"])
+        await asyncio.sleep(0.05)
+        task = prefetcher._task
+        # The learner picks another concept: the running prefetch is dropped
+        assert await prefetcher.take("langchain.prompt_templates") is None
+        await asyncio.sleep(0)
+        assert task.cancelled()
+        # The cap of one speculative session is spent
+        assert await prefetcher.start(["langgraph.stategraph"]) is None
+        assert await SessionPrefetcher(enabled=False).start([]) is None
+        return prefetcher.stats()
+
+    stats = asyncio.run(session())
+    assert stats["started"] == 1 and stats["discarded"] == 1 and stats["skipped"] == 1 and stats["used"] == 0
+    print("✅ Unused prefetch cancelled and further speculation capped")
+
+
+def test_prediction_follows_the_extracted_topics(monkeypatch, tmp_path):
+    print("🧪 Testing prefetch prediction from extracted topics...")
+    write_concepts(monkeypatch, tmp_path)
+    topics = [
+        {"id": "langgraph.checkpointing", "name": "Checkpointing", "category": "LangGraph"},
+        {"id": "langgraph.conditional_edges", "name": "Conditional Edges", "category": "LangGraph"},
+        {"id": "langgraph.stategraph", "name": "StateGraph Basics", "category": "LangGraph"},
+    ]
+
+    async def predict(covered):
+        return await prefetch.predict_next_concept(covered, topics)
+
+    # Graph order among the concepts that are topics, then the other topics
+    assert asyncio.run(predict([])) == "langgraph.stategraph"
+    assert asyncio.run(predict(["langgraph.stategraph"])) == "langgraph.conditional_edges"
+    assert asyncio.run(predict(["langgraph.stategraph", "langgraph.conditional_edges"])) == "langgraph.checkpointing"
+    # Without a topic list the concept graph is used as before
+    assert asyncio.run(prefetch.predict_next_concept([])) == "langchain.prompt_templates"
+    print("✅ Predictions are topic ids the retrieval and question caches know")
@@ -0,0 +1,121 @@
+"""Tests for incremental documentation indexing in tools/prep_docs.py."""
+
+import json
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from tools import prep_docs
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    embedded: int = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return super().embed_documents(texts)
+
+
+def _write_docs(root, files):
+    for name, text in files.items():
+        path = root / "docs" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+
+def test_incremental_reindex(tmp_path, monkeypatch):
+    print("🧪 Testing incremental re-indexing...")
+    monkeypatch.chdir(tmp_path)
+    _write_docs(tmp_path, {
+        "langgraph/graphs.md": "StateGraph lets you add nodes and edges to build a graph.",
+        "langchain/tools.md": "Tools are functions an agent can call.",
+        "langchain/prompts.md": "ChatPromptTemplate formats messages for chat models.",
+    })
+    embeddings = CountingEmbeddings(size=16)
+
+    prep_docs.prepare_and_index_docs(embeddings=embeddings, dedup=False)
+    assert embeddings.embedded == 3
+
+    # Nothing changed: nothing is embedded again
+    prep_docs.prepare_and_index_docs(embeddings=embeddings, dedup=False)
+    assert embeddings.embedded == 3
+
+    # One file edited, one removed, one copied verbatim into a new file
+    _write_docs(tmp_path, {
+        "langchain/tools.md": "Tools are functions an agent can call with structured input.",
+        "langchain/tools_copy.md": "ChatPromptTemplate formats messages for chat models.",
+    })
+    (tmp_path / "docs/langgraph/graphs.md").unlink()
+    prep_docs.prepare_and_index_docs(embeddings=embeddings, dedup=False)
+    # Only the edited chunk needs the API; the copy reuses the stored vector
+    assert embeddings.embedded == 4
+
+    manifest = json.loads((tmp_path / "embeddings/vector_store/manifest.json").read_text())
+    assert sorted(manifest["files"]) == [
+        "docs/langchain/prompts.md",
+        "docs/langchain/tools.md",
+        "docs/langchain/tools_copy.md",
+    ]
+    assert len(manifest["chunks"]) == 3
+
+    # Chunks live only in the row-aligned chunk store
+    from tools.chunk_store import ChunkStore
+    store = ChunkStore(tmp_path / "embeddings/vector_store/chunks")
+    assert {store.chunk_id(row) for row in range(len(store))} == set(manifest["chunks"])
+    assert not (tmp_path / "embeddings/vector_store/index.pkl").exists()
+    print("✅ Only new or changed chunks were embedded")
+
+
+def test_near_duplicates_share_one_vector(tmp_path, monkeypatch):
+    print("🧪 Testing near-duplicate chunk elimination...")
+    monkeypatch.chdir(tmp_path)
+    page = (
+        "StateGraph lets you add nodes and edges to build a graph. Each node receives the "
+        "current state and returns an update. Edges decide which node runs next, and "
+        "conditional edges route on the state. Compile the graph before invoking it."
+    )
+    _write_docs(tmp_path, {
+        "langgraph/v1/graphs.md": page,
+        "langgraph/v2/graphs.md": page.replace("Compile the graph", "Always compile the graph"),
+        "langchain/tools.md": "Tools are functions an agent can call.",
+    })
+    embeddings = CountingEmbeddings(size=16)
+
+    prep_docs.prepare_and_index_docs(embeddings=embeddings)
+    assert embeddings.embedded == 2
+
+    from tools.chunk_store import ChunkStore
+    store_path = tmp_path / "embeddings/vector_store/chunks"
+    store = ChunkStore(store_path)
+    merged = [store.metadata(row) for row in range(len(store)) if "sources" in store.metadata(row)]
+    assert len(store) == 2
+    assert merged[0]["sources"] == ["docs/langgraph/v1/graphs.md", "docs/langgraph/v2/graphs.md"]
+
+    # Dropping the file that owns the vector keeps the chunk for the other copy
+    (tmp_path / "docs/langgraph/v1/graphs.md").unlink()
+    prep_docs.prepare_and_index_docs(embeddings=embeddings)
+    assert embeddings.embedded == 2
+    store = ChunkStore(store_path)
+    sources = sorted(store.source(row) for row in range(len(store)))
+    assert sources == ["docs/langchain/tools.md", "docs/langgraph/v2/graphs.md"]
+    assert all("sources" not in store.metadata(row) for row in range(len(store)))
+    print("✅ Near-duplicates folded into one chunk with every source recorded")
+
+
+def test_parallel_split_matches_serial(tmp_path):
+    print("🧪 Testing parallel splitting determinism...")
+    from tools.doc_loader import iter_split_files
+
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"doc_{i}.md"
+        path.write_text("\n\n".join(f"Paragraph {j} of doc {i}. " * 20 for j in range(8)), encoding="utf-8")
+        paths.append(path)
+
+    def flatten(results):
+        return [(str(p), c.page_content, c.metadata) for p, chunks in results for c in chunks]
+
+    serial = flatten(iter_split_files(paths, workers=1))
+    parallel = flatten(iter_split_files(paths, workers=2))
+    assert serial == parallel
+    assert all("start_index" in meta and meta["source"] == src for src, _, meta in serial)
+    print("✅ Parallel output identical to serial")
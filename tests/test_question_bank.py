@@ -0,0 +1,73 @@
+"""Tests for the pre-generated question bank."""
+
+import asyncio
+import json
+from pathlib import Path
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+
+import tools.retrieval
+from agents.nodes.generate_questions import generate_concept_and_code_questions
+from agents.state import TutorAgentState
+from tools.chunk_store import CHUNK_STORE_PATH, ChunkStore, write_chunk_store
+from tools.question_bank import build_question_bank, serve_questions
+
+
+TOPIC = "langgraph.checkpointing"
+
+
+class NumberedQuestionLLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        assert "MemorySaver" in messages[-1].content
+        return AIMessage(content="\n".join(f"- Question {self.calls}.{i}?" for i in range(3)))
+
+
+def _write_corpus(extra=""):
+    text = "The MemorySaver checkpointer stores graph state per thread so runs can resume later. " * 2
+    rows = [(f"id-{i}{extra}", Document(page_content=f"{text} Part {i}.", metadata={"source": "docs/langgraph/persistence.md"})) for i in range(8)]
+    write_chunk_store(rows, CHUNK_STORE_PATH)
+
+
+def test_bank_serves_unasked_questions(tmp_path, monkeypatch):
+    print("🧪 Testing question bank...")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tools.retrieval, "search_doc_rows", lambda query, k, topic_id=None: list(range(k)))
+    _write_corpus()
+
+    llm = NumberedQuestionLLM()
+    added = asyncio.run(build_question_bank(per_topic=5, topic_ids=[TOPIC], llm=llm))
+    assert added == 5 and llm.calls == 2
+    # Pool already full: nothing regenerated
+    assert asyncio.run(build_question_bank(per_topic=5, topic_ids=[TOPIC], llm=llm)) == 0
+
+    bank = json.loads(Path("data/question_bank.json").read_text())
+    entry = bank["topics"][TOPIC][0]
+    assert entry["chunk_ids"] == ["id-0", "id-1", "id-2", "id-3"] and entry["index_version"]
+
+    hashed = []
+    fingerprint = ChunkStore.fingerprint
+    monkeypatch.setattr(ChunkStore, "fingerprint", lambda self: hashed.append(1) or fingerprint(self))
+    served = serve_questions(TOPIC)
+    assert served["questions"] == ["Question 1.0?", "Question 1.1?", "Question 1.2?"]
+    assert len(served["chunks"]) == 4
+
+    # Logged questions are skipped; the node serves the rest without a live call
+    Path("logs").mkdir()
+    Path("logs/question_log.json").write_text(json.dumps([
+        {"concept_id": TOPIC, "question": q} for q in served["questions"]
+    ]))
+    state = asyncio.run(generate_concept_and_code_questions(TutorAgentState(target_concept_id=TOPIC)))
+    assert [q.text for q in state.questions] == ["Question 2.0?", "Question 2.1?"]
+    assert state.retrieved_chunks
+    assert len(hashed) == 1  # the corpus is hashed once per index build, not per call
+
+    # Re-indexed docs: the old questions are no longer served
+    _write_corpus(extra="-v2")
+    assert serve_questions(TOPIC) is None
+    assert len(hashed) == 2
+    print("✅ Bank built concurrently, served in order, history and index version respected")
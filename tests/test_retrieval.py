@@ -0,0 +1,67 @@
+"""Tests for BM25 + vector hybrid retrieval."""
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import FAISS
+
+from tools import retrieval
+from tools.lexical_index import BM25Index, tokenize
+from tools.vector_registry import VectorStoreRegistry
+
+
+CHUNKS = [
+    "Use add_conditional_edges to route between nodes in a StateGraph.",
+    "A StateGraph is compiled before it can be invoked.",
+    "Vector stores expose similarity_search for retrieval.",
+    "Prompt templates format messages for chat models.",
+    "Checkpointers persist graph state between runs.",
+]
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    queries: int = 0
+
+    def embed_query(self, text):
+        self.queries += 1
+        return super().embed_query(text)
+
+
+def test_tokenize_splits_identifiers():
+    tokens = tokenize("add_conditional_edges on a StateGraph")
+    assert {"add_conditional_edges", "conditional", "edges", "stategraph", "state", "graph"} <= set(tokens)
+
+
+def test_bm25_ranks_exact_api_names():
+    index = BM25Index.build(CHUNKS)
+    assert index.search("similarity_search", k=1)[0][0] == 2
+
+
+def _setup(tmp_path, monkeypatch):
+    embeddings = CountingEmbeddings(size=16)
+    docs = [Document(page_content=t, metadata={"source": f"docs/{i}.md"}) for i, t in enumerate(CHUNKS)]
+    FAISS.from_documents(docs, embeddings).save_local(str(tmp_path))
+    BM25Index.build(CHUNKS).save(str(tmp_path))
+    registry = VectorStoreRegistry(embeddings_factory=lambda: embeddings, load_mode="memory")
+    monkeypatch.setattr(retrieval, "get_vector_store", registry.get)
+    return embeddings
+
+
+def test_confident_lexical_query_skips_embedding(tmp_path, monkeypatch):
+    print("🧪 Testing lexical short-circuit...")
+    embeddings = _setup(tmp_path, monkeypatch)
+    docs = retrieval.search_docs("StateGraph", k=2, path=str(tmp_path))
+    assert embeddings.queries == 0
+    assert {d.page_content for d in docs} == set(CHUNKS[:2])
+    print("✅ API-name query answered without an embedding call")
+
+
+def test_free_text_query_is_fused(tmp_path, monkeypatch):
+    embeddings = _setup(tmp_path, monkeypatch)
+    docs = retrieval.search_docs("how do I persist state between runs", k=2, path=str(tmp_path))
+    assert embeddings.queries == 1
+    assert len(docs) == 2
+    assert CHUNKS[4] in [d.page_content for d in docs]
+
+
+def test_reciprocal_rank_fusion_prefers_agreement():
+    assert retrieval.reciprocal_rank_fusion([[1, 2, 3], [3, 1, 4]])[0] == 1
@@ -0,0 +1,81 @@
+"""Tests for streaming feedback and question generation."""
+
+import asyncio
+
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from agents.nodes import generate_feedback_node, generate_questions
+from agents.state import TutorAgentState
+from agents.types import ConceptQuestion
+from tools.feedback_cache import FeedbackCache
+from tools.streaming import stream_stats
+
+
+def _fake(text):
+    return GenericFakeChatModel(messages=iter([AIMessage(content=text)]))
+
+
+async def _collect(stream):
+    return [text async for text in stream]
+
+
+def test_stream_feedback_sets_correct_after_completion(monkeypatch):
+    print("🧪 Testing streamed feedback...")
+    monkeypatch.setattr(generate_feedback_node, "_llm", lambda: _fake("Correct! Runnables compose with the pipe operator."))
+    monkeypatch.setattr(generate_feedback_node, "get_feedback_cache", lambda: FeedbackCache(":memory:"))
+    state = TutorAgentState(
+        user_input="They are chained with |",
+        current_question=ConceptQuestion(concept_id="langchain.lcel", text="How are runnables composed?"),
+    )
+    pieces = asyncio.run(_collect(generate_feedback_node.stream_feedback(state)))
+    assert len(pieces) > 1
+    assert "".join(pieces) == state.last_feedback
+    assert state.last_correct is True
+    assert stream_stats()["feedback"]["streams"] >= 1
+    print(f"✅ Feedback streamed in {len(pieces)} pieces; TTFT {stream_stats()['feedback']['ttft_avg_ms']} ms")
+
+
+def test_stream_questions_parses_when_done(tmp_path, monkeypatch):
+    print("🧪 Testing streamed question generation...")
+    monkeypatch.chdir(tmp_path)
+    output = "- What does a checkpointer store?\n- How do threads resume?\n- Add MemorySaver to a graph."
+    monkeypatch.setattr(generate_questions, "get_chat_model", lambda role: _fake(output))
+    state = TutorAgentState(
+        target_concept_id="langgraph.checkpointing",
+        retrieved_chunks=["The MemorySaver checkpointer saves graph state for every thread so a run can resume. " * 2],
+    )
+    pieces = asyncio.run(_collect(generate_questions.stream_questions(state)))
+    assert "".join(pieces) == output
+    assert [q.text for q in state.questions][0] == "What does a checkpointer store?"
+    assert len(state.questions) == 3
+    assert "questions" in stream_stats()
+    print("✅ Questions streamed and parsed once complete")
+
+
+def test_learn_graph_streams_questions(tmp_path, monkeypatch):
+    print("🧪 Testing question streaming through the compiled graph...")
+    from langchain_core.documents import Document
+    from agents.nodes import read_docs_node
+    from agents.tutor_agent import define_graph, stream_graph
+
+    monkeypatch.chdir(tmp_path)
+    output = "- What does a checkpointer store?\n- How do threads resume?\n- Add MemorySaver to a graph."
+    chunk = "The MemorySaver checkpointer saves graph state for every thread so a run can resume. " * 2
+    monkeypatch.setattr(generate_questions, "get_chat_model", lambda role: _fake(output))
+    monkeypatch.setattr(generate_questions, "serve_questions", lambda concept_id: None)
+    monkeypatch.setattr(read_docs_node, "serve_questions", lambda concept_id: None)
+    monkeypatch.setattr(read_docs_node, "search_docs", lambda query, k, topic_id: [Document(page_content=chunk)])
+
+    async def run():
+        graph = await define_graph()
+        state = dict(TutorAgentState(mode="learn", target_concept_id="langgraph.checkpointing", user_input="checkpointing"))
+        return [item async for item in stream_graph(graph, state)]
+
+    items = asyncio.run(run())
+    pieces = [value for kind, value in items if kind == "text"]
+    kind, result = items[-1]
+    assert len(pieces) > 1 and "".join(pieces) == output
+    assert kind == "state" and result["retrieved_chunks"] == [chunk]
+    assert [q.text for q in result["questions"]][0] == "What does a checkpointer store?"
+    print(f"✅ Learn branch streamed {len(pieces)} pieces through the graph")
@@ -0,0 +1,81 @@
+"""Tests for the corpus-fingerprinted, incremental topic cache."""
+
+import asyncio
+
+from langchain_core.documents import Document
+
+from agents.nodes import quick_topic_extractor as quick
+from agents.state import TutorAgentState
+from tools.chunk_store import CHUNK_STORE_PATH, write_chunk_store
+from tools.topic_assignments import topics_status
+
+
+def _write_corpus(texts):
+    rows = [(f"id-{text}", Document(page_content=text, metadata={"source": "docs/langchain/page.md"})) for text in texts]
+    write_chunk_store(rows, CHUNK_STORE_PATH)
+
+
+def _frequencies(topics):
+    return {topic["name"]: topic["frequency"] for topic in topics}
+
+
+def test_stale_topics_refresh_incrementally(tmp_path, monkeypatch):
+    print("🧪 Testing fingerprinted topic cache...")
+    monkeypatch.chdir(tmp_path)
+    scanned = []
+    scan_rows = quick.scan_rows
+    monkeypatch.setattr(quick, "scan_rows", lambda docs, rows, workers=1: scanned.append(len(rows)) or scan_rows(docs, rows, workers))
+
+    _write_corpus(["An agent calls a tool.", "Agents pick tools.", "Memory stores chat history."])
+    topics = asyncio.run(quick.quick_extract_topics_from_docs(TutorAgentState(), workers=1)).topics
+    assert _frequencies(topics)["Agents"] == 2
+    assert topics_status()[:2] == (topics, "fresh")
+
+    # Re-indexed docs: one chunk edited, one added
+    _write_corpus(["An agent calls a tool.", "Agents pick tools.", "An agent has memory.", "Another agent."])
+    assert topics_status()[1] == "stale"
+    topics = asyncio.run(quick.quick_extract_topics_from_docs(TutorAgentState(), workers=1)).topics
+    assert scanned == [3, 2]
+    assert _frequencies(topics)["Agents"] == 4
+    assert topics_status()[:2] == (topics, "fresh")
+    print("✅ Stale topic list detected; only new chunks rescanned")
+
+
+def test_stale_topics_are_only_replaced_by_their_own_extractor(tmp_path, monkeypatch):
+    print("🧪 Testing topic refresh policy...")
+    import json
+
+    from agents.nodes import load_topics_node
+    from tools.topic_assignments import TOPICS_META_PATH, TOPICS_PATH, save_topics
+
+    monkeypatch.chdir(tmp_path)
+    curated = [{"id": "langgraph.interrupts", "name": "Interrupts", "category": "LangGraph"}]
+    ran = []
+
+    async def fake_extractor(name, state):
+        ran.append(name)
+        state.topics = [{"id": "langchain.agents", "name": "Agents", "category": "LangChain"}]
+        return state
+
+    monkeypatch.setattr(load_topics_node, "run_extractor", fake_extractor)
+
+    def load(**kwargs):
+        return asyncio.run(load_topics_node.load_or_extract_topics(TutorAgentState(), **kwargs)).topics
+
+    # A list from before the sidecar existed is kept
+    _write_corpus(["An agent calls a tool."])
+    TOPICS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    TOPICS_PATH.write_text(json.dumps(curated), encoding="utf-8")
+    assert not TOPICS_META_PATH.exists()
+    assert load() == curated and topics_status()[:2] == (curated, "legacy")
+
+    # A stale LLM list is kept until a refresh is asked for, then re-extracted the same way
+    save_topics(curated, "older-corpus", "map_reduce")
+    assert load() == curated and ran == []
+    assert load(refresh=True)[0]["id"] == "langchain.agents" and ran == ["map_reduce"]
+
+    # A stale quick list is refreshed right away (its ids are stable)
+    save_topics(curated, "older-corpus", "quick")
+    load()
+    assert ran == ["map_reduce", "quick"]
+    print("✅ Legacy and LLM topic lists survive a re-index")
@@ -0,0 +1,70 @@
+"""Tests for the precomputed learn-mode topic table."""
+
+import json
+import os
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import FAISS
+
+from tools import retrieval
+from tools.lexical_index import BM25Index
+from tools.mmap_store import save_store
+from tools.topic_cache import build_topic_cache
+from tools.vector_registry import VectorStoreRegistry
+
+
+CHUNKS = [
+    "Tools are functions an agent can call.",
+    "Agents decide which tool to call next.",
+    "A StateGraph is compiled before it can be invoked.",
+    "Checkpointers persist graph state between runs.",
+]
+
+TOPICS = [
+    {"id": "langchain.tools", "name": "Tools", "category": "LangChain", "keywords": ["tools"]},
+    {"id": "langgraph.checkpointing", "name": "Checkpointing", "category": "LangGraph", "keywords": ["checkpointing", "persistence"]},
+]
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    queries: int = 0
+
+    def embed_query(self, text):
+        self.queries += 1
+        return super().embed_query(text)
+
+
+def test_topic_queries_skip_search_until_index_changes(tmp_path, monkeypatch):
+    print("🧪 Testing topic → chunk cache...")
+    embeddings = CountingEmbeddings(size=16)
+    docs = [Document(page_content=t, metadata={"source": f"docs/{i}.md"}) for i, t in enumerate(CHUNKS)]
+    save_store(FAISS.from_documents(docs, embeddings), tmp_path)
+    BM25Index.build(CHUNKS).save(str(tmp_path))
+    topics_path = tmp_path / "topics.json"
+    topics_path.write_text(json.dumps(TOPICS), encoding="utf-8")
+
+    assert build_topic_cache(str(tmp_path), topics_path, k=4, embeddings=embeddings) == 5
+    registry = VectorStoreRegistry(embeddings_factory=lambda: embeddings)
+    monkeypatch.setattr(retrieval, "get_vector_store", registry.get)
+
+    expected = retrieval.search_docs("langgraph.checkpointing", k=2, path=str(tmp_path), use_topic_cache=False)
+    embeddings.queries = 0
+    cached = retrieval.search_docs("langgraph.checkpointing", k=2, path=str(tmp_path))
+    assert [d.page_content for d in cached] == [d.page_content for d in expected]
+    # Names and keyword sets are keys too, matched case-insensitively
+    retrieval.search_docs("  checkpointing ", k=2, path=str(tmp_path))
+    retrieval.search_docs("checkpointing persistence", k=2, path=str(tmp_path))
+    assert embeddings.queries == 0
+
+    # Asking for more rows than were cached falls back to a live search
+    retrieval.search_docs("langgraph.checkpointing", k=5, path=str(tmp_path))
+    assert embeddings.queries == 1
+
+    # Rebuilding the index invalidates the table
+    index_file = tmp_path / "index.faiss"
+    stat = index_file.stat()
+    os.utime(index_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    retrieval.search_docs("langgraph.checkpointing", k=2, path=str(tmp_path))
+    assert embeddings.queries == 2
+    print("✅ Known topics served from the table; stale table ignored")
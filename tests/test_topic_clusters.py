@@ -0,0 +1,73 @@
+"""Tests for embedding-clustering topic discovery."""
+
+import asyncio
+
+import numpy as np
+from langchain_core.documents import Document
+
+from agents.nodes.cluster_topic_extractor import cluster_extract_topics_from_docs
+from agents.state import TutorAgentState
+from tools.chunk_store import CHUNK_STORE_PATH, InMemoryChunks, write_chunk_store
+from agents.nodes.load_topics_node import load_or_extract_topics
+from tools.topic_assignments import topics_status
+from tools.topic_clusters import cluster_topics, kmeans
+
+
+GROUPS = [
+    ("docs/langgraph/how-tos/persistence.md", "The MemorySaver checkpointer persists thread state between runs."),
+    ("docs/langgraph/concepts/low_level.md", "Build a StateGraph with add_node and add_edge, then compile it."),
+    ("docs/langchain/modules/retrievers.md", "A retriever returns relevant documents from a vector store."),
+]
+
+
+def _corpus(per_group=10, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = np.eye(dim, dtype=np.float32)[:len(GROUPS)] * 5
+    docs, vectors = [], []
+    for g, (source, text) in enumerate(GROUPS):
+        for i in range(per_group):
+            docs.append(Document(page_content=f"{text} Part {i}.", metadata={"source": source}))
+            vectors.append(centers[g] + rng.normal(scale=0.3, size=dim).astype(np.float32))
+    return docs, np.stack(vectors)
+
+
+def test_kmeans_recovers_groups_deterministically():
+    print("🧪 Testing spherical k-means...")
+    _, vectors = _corpus()
+    labels, centroids = kmeans(vectors, 3, seed=1)
+    assert centroids.shape == (3, 16)
+    assert all(len(set(labels[g * 10:(g + 1) * 10])) == 1 for g in range(3))
+    assert len(set(labels)) == 3
+    assert np.array_equal(kmeans(vectors, 3, seed=1)[0], labels)
+    print("✅ Separated groups recovered; same seed, same labels")
+
+
+def test_clusters_labelled_from_sources_and_terms():
+    print("🧪 Testing cluster labelling...")
+    docs, vectors = _corpus()
+    topics = cluster_topics(InMemoryChunks(docs), vectors, k=3)
+    by_id = {t["id"]: t for t in topics}
+    assert set(by_id) == {"langchain.retrievers", "langgraph.persistence", "langgraph.low_level"}
+    assert all(t["frequency"] == 10 for t in topics)
+    assert "checkpointer" in by_id["langgraph.persistence"]["keywords"]
+    assert topics == cluster_topics(InMemoryChunks(docs), vectors, k=3)
+    print("✅ Topics named from file names, keyed by category, with TF-IDF keywords")
+
+
+def test_cluster_node_saves_fingerprinted_topics(tmp_path, monkeypatch):
+    print("🧪 Testing cluster topic extraction node...")
+    import faiss
+
+    monkeypatch.chdir(tmp_path)
+    docs, vectors = _corpus()
+    write_chunk_store([(f"id-{i}", doc) for i, doc in enumerate(docs)], CHUNK_STORE_PATH)
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+    faiss.write_index(index, str(CHUNK_STORE_PATH.parent / "index.faiss"))
+
+    state = asyncio.run(cluster_extract_topics_from_docs(TutorAgentState(), k=3))
+    assert len(state.topics) == 3
+    topics, status, meta = topics_status()
+    assert topics == state.topics and status == "fresh" and meta["extractor"] == "clusters"
+    assert asyncio.run(load_or_extract_topics(TutorAgentState())).topics == state.topics
+    print("✅ Topics discovered from stored embeddings and cached")
@@ -0,0 +1,123 @@
+"""Tests for map-reduce topic extraction."""
+
+import asyncio
+import json
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+
+from agents.nodes.intelligent_topic_extractor import extract_topics_from_docs
+from agents.state import TutorAgentState
+from tools.chunk_store import CHUNK_STORE_PATH, InMemoryChunks, write_chunk_store
+from agents.nodes.load_topics_node import load_or_extract_topics
+from tools.topic_assignments import topics_status
+from tools.topic_mapreduce import MAP_OUTPUT_TOKENS, batch_cost, map_reduce_topics, map_topics, plan_batches, reduce_topics
+
+
+class TopicEchoLLM:
+    """Proposes a topic for each source file named in the prompt."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        prompt = messages[-1].content
+        topics = [
+            {"name": name, "category": "LangGraph", "keywords": [name.lower()]}
+            for marker, name in (("checkpoint", "Checkpointers"), ("state", "State Graphs"))
+            if marker in prompt
+        ]
+        return AIMessage(content=json.dumps(topics), usage_metadata={"input_tokens": 10, "output_tokens": 5, "total_tokens": 15})
+
+
+def _corpus(n):
+    return [
+        Document(page_content=f"chunk {i} " + "words " * 200, metadata={"source": f"docs/langgraph/{name}.md"})
+        for i in range(n)
+        for name in ("checkpoint", "state")
+    ]
+
+
+def test_budget_caps_coverage_and_seed_reproduces():
+    print("🧪 Testing map-reduce batch planning...")
+    docs = InMemoryChunks(_corpus(40))
+    full = plan_batches(docs, token_budget=10**7, batch_tokens=2000)
+    assert sorted(row for batch in full for row in batch.rows) == list(range(len(docs)))
+
+    capped = plan_batches(docs, token_budget=5000, batch_tokens=2000)
+    covered = [row for batch in capped for row in batch.rows]
+    assert 0 < len(covered) < len(docs)
+    # Stratified: both source files are sampled from the start
+    assert {docs.source(row) for row in covered[:2]} == {"docs/langgraph/checkpoint.md", "docs/langgraph/state.md"}
+
+    assert [b.rows for b in plan_batches(docs, 5000, seed=7, batch_tokens=2000)] == \
+        [b.rows for b in plan_batches(docs, 5000, seed=7, batch_tokens=2000)]
+    print("✅ Budget respected, sources stratified, seeded plan reproducible")
+
+
+def test_reduce_merges_duplicates():
+    print("🧪 Testing topic reduce step...")
+    topics = reduce_topics([
+        [{"name": "Agents", "category": "LangChain", "keywords": ["agent"]}],
+        [{"name": "agent", "category": "LangChain", "keywords": ["tool"]},
+         {"name": "Agents", "category": "LangGraph"}],
+        [{"name": "Agents", "category": "LangChain"}, {"name": "Bogus", "category": "Other"}],
+    ])
+    assert [(t["id"], t["support"]) for t in topics] == [("langchain.agent", 3), ("langgraph.agent", 1)]
+    assert topics[0]["name"] == "Agents"
+    assert topics[0]["keywords"] == ["agent", "tool"]
+    assert reduce_topics([[{"name": "Agents", "category": "LangChain"}]], min_support=2) == []
+    print("✅ Near-duplicate names merged and ranked by support")
+
+
+def test_map_reduce_node(tmp_path, monkeypatch):
+    print("🧪 Testing map-reduce extraction node...")
+    monkeypatch.chdir(tmp_path)
+    docs = _corpus(30)
+    write_chunk_store([(f"id-{i}", doc) for i, doc in enumerate(docs)], CHUNK_STORE_PATH)
+
+    llm = TopicEchoLLM()
+    state = asyncio.run(extract_topics_from_docs(
+        TutorAgentState(), mode="map_reduce", token_budget=10**6, concurrency=2, llm=llm,
+    ))
+    assert llm.calls > 1
+    assert {t["id"] for t in state.topics} == {"langgraph.checkpointer", "langgraph.state_graph"}
+    assert all(t["support"] >= 1 for t in state.topics)
+    topics, status, meta = topics_status()
+    assert topics == state.topics and status == "fresh" and meta["extractor"] == "map_reduce"
+    assert asyncio.run(load_or_extract_topics(TutorAgentState())).topics == state.topics
+
+    again = asyncio.run(map_reduce_topics(InMemoryChunks(docs), TopicEchoLLM(), token_budget=10**6))
+    assert [t["id"] for t in again] == [t["id"] for t in state.topics]
+    print("✅ Whole corpus mapped, reduced and saved with its fingerprint")
+
+
+class VerboseLLM(TopicEchoLLM):
+    """Reports far more tokens than the plan reserved."""
+
+    async def ainvoke(self, messages):
+        response = await super().ainvoke(messages)
+        response.usage_metadata = {"input_tokens": 1000, "output_tokens": 4000, "total_tokens": 5000}
+        return response
+
+
+def test_map_stops_when_actual_usage_exhausts_budget(monkeypatch):
+    print("🧪 Testing enforced map token budget...")
+    docs = InMemoryChunks(_corpus(40))
+    batches = plan_batches(docs, token_budget=10**7, batch_tokens=2000)
+    budget = sum(batch_cost(batch) for batch in batches[:4])
+    llm = VerboseLLM()
+    candidates, used = asyncio.run(map_topics(batches, llm, concurrency=1, token_budget=budget))
+    assert llm.calls < 4 and used <= budget + 5000
+    assert all(not c for c in candidates[llm.calls:])
+
+    # The map model's replies are capped at the reserved output
+    from agents.nodes import intelligent_topic_extractor as extractor
+    requested = {}
+    monkeypatch.setattr(extractor, "get_chat_model", lambda role, **kw: requested.update(kw) or TopicEchoLLM())
+    monkeypatch.setattr(extractor, "open_corpus", lambda: docs)
+    monkeypatch.setattr(extractor, "save_topics", lambda *args: "topics.json")
+    asyncio.run(extract_topics_from_docs(TutorAgentState(), mode="map_reduce", token_budget=budget))
+    assert requested["max_tokens"] == MAP_OUTPUT_TOKENS
+    print("✅ Map calls stop once reported usage would overrun the budget")
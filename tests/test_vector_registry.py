@@ -0,0 +1,92 @@
+"""Tests for the process-wide vector store registry."""
+
+import os
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import FAISS
+
+from tools.vector_registry import VectorStoreRegistry
+
+
+def _build_store(path, texts):
+    embeddings = DeterministicFakeEmbedding(size=16)
+    docs = [Document(page_content=t, metadata={"source": f"docs/{i}.md"}) for i, t in enumerate(texts)]
+    FAISS.from_documents(docs, embeddings).save_local(str(path))
+
+
+def test_registry_loads_once_and_reloads_on_change(tmp_path):
+    print("🧪 Testing vector store registry caching...")
+    _build_store(tmp_path, ["StateGraph basics", "add_conditional_edges routing"])
+    registry = VectorStoreRegistry(embeddings_factory=lambda: DeterministicFakeEmbedding(size=16))
+
+    first = registry.get(str(tmp_path))
+    second = registry.get(str(tmp_path))
+    assert first is second
+    assert first.num_vectors == 2
+    assert first.stats.resident_bytes > 0
+    assert first.similarity_search("StateGraph basics", k=1)[0].page_content == "StateGraph basics"
+
+    # Rewriting the index on disk must trigger a reload on the next lookup
+    _build_store(tmp_path, ["StateGraph basics", "routing", "checkpointing"])
+    index_file = tmp_path / "index.faiss"
+    stat = index_file.stat()
+    os.utime(index_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    third = registry.get(str(tmp_path))
+    assert third is not first
+    assert third.num_vectors == 3
+    assert registry.stats()[0]["num_vectors"] == 3
+    print("✅ Registry reuses handles and reloads changed indexes")
+
+
+def test_registry_missing_index(tmp_path):
+    registry = VectorStoreRegistry(embeddings_factory=lambda: DeterministicFakeEmbedding(size=16))
+    try:
+        registry.get(str(tmp_path / "missing"))
+    except FileNotFoundError:
+        return
+    raise AssertionError("Expected FileNotFoundError for a missing index")
+
+
+def test_registry_mmap_mode(tmp_path):
+    print("🧪 Testing memory-mapped loading mode...")
+    from tools.mmap_store import LazyDocstore, save_store
+
+    texts = ["StateGraph basics", "add_conditional_edges routing", "checkpointing"]
+    _build_store(tmp_path, texts)
+    embeddings = DeterministicFakeEmbedding(size=16)
+    save_store(FAISS.load_local(str(tmp_path), embeddings, allow_dangerous_deserialization=True), tmp_path)
+    assert not (tmp_path / "index.pkl").exists()
+
+    registry = VectorStoreRegistry(embeddings_factory=lambda: embeddings, load_mode="auto")
+    handle = registry.get(str(tmp_path))
+    assert handle.stats.mode == "mmap"
+    assert isinstance(handle._store.docstore, LazyDocstore)
+    hit = handle.similarity_search("add_conditional_edges routing", k=1)[0]
+    assert hit.page_content == "add_conditional_edges routing"
+    assert hit.metadata["source"] == "docs/1.md"
+
+    in_memory = VectorStoreRegistry(embeddings_factory=lambda: embeddings, load_mode="memory").get(str(tmp_path))
+    assert in_memory.stats.mode == "memory"
+    assert in_memory.similarity_search("add_conditional_edges routing", k=1)[0].id == hit.id
+    print("✅ mmap and in-memory modes return the same hits")
+
+
+def test_registry_auto_mode_falls_back_when_chunk_store_is_stale(tmp_path):
+    print("🧪 Testing fallback from a stale chunk store...")
+    from tools.mmap_store import save_store
+
+    embeddings = DeterministicFakeEmbedding(size=16)
+    _build_store(tmp_path, ["StateGraph basics", "routing", "checkpointing"])
+    save_store(FAISS.load_local(str(tmp_path), embeddings, allow_dangerous_deserialization=True), tmp_path)
+    # An older tool rewrites index.faiss + index.pkl but leaves the chunk store behind
+    _build_store(tmp_path, ["StateGraph basics", "routing", "checkpointing", "interrupts"])
+
+    handle = VectorStoreRegistry(embeddings_factory=lambda: embeddings, load_mode="auto").get(str(tmp_path))
+    assert handle.stats.mode == "pickle"
+    assert handle.num_vectors == 4
+    assert handle.similarity_search("interrupts", k=1)[0].page_content == "interrupts"
+
+    assert VectorStoreRegistry(embeddings_factory=lambda: embeddings, load_mode="pickle")._load_mode == "memory"
+    print("✅ auto mode warns and loads in memory; 'pickle' is still accepted")
@@ -0,0 +1,476 @@
+"""Approximate and compressed variants of the documentation search index.
+
+``tools/prep_docs.py`` always maintains an exact float32 ``IndexFlatL2`` in
+``index.faiss``. Incremental updates, vector reuse and exact re-scoring all
+depend on it. For large corpora a linear scan over full-precision vectors gets
+slow and memory hungry, so the builder can derive a search index from the flat
+vectors. It varies along two independent axes.
+
+Structure (``kind``):
+
+- ``flat``: brute-force scan
+- ``ivf_flat``: inverted lists; ``nprobe`` lists are scanned per query
+- ``hnsw``: HNSW graph; tuned with ``efSearch``
+- ``ivf_pq``: inverted lists of product-quantized codes (smallest)
+
+Storage (``storage`` and ``dims``):
+
+- ``float32``, ``float16`` or ``int8`` (scalar-quantized) vector codes
+- optionally truncated to the first ``dims`` dimensions and re-normalized,
+  which suits Matryoshka-trained models such as ``text-embedding-3-*``
+
+Lossy settings re-score the top ``rescore`` x k candidates against the exact
+vectors. Those are read from the memory-mapped ``index.faiss``, so only the
+candidates' pages are touched and resident memory stays compressed. The
+savings are in RAM, not on disk: ``index.faiss`` is always kept, so a
+compressed variant adds its own size to the index directory.
+
+The variant is written to ``index.ann.faiss`` with its row order identical to
+the flat index, so the chunk store and BM25 postings stay valid. It is
+described by ``index_meta.json``. Loaders call :func:`read_search_index`,
+which returns whichever index the metadata selects, so retrieval nodes never
+need to know which variant was built.
+"""
+
+import json
+import math
+import os
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+INDEX_KINDS = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+DEFAULT_INDEX_KIND = os.getenv("TUTOR_INDEX_KIND", "flat")
+
+# Vector code used by the flat, IVF and HNSW kinds, as index_factory suffixes.
+STORAGE_CODES = {"float32": "Flat", "float16": "SQfp16", "int8": "SQ8"}
+DEFAULT_STORAGE = os.getenv("TUTOR_INDEX_STORAGE", "float32")
+DEFAULT_DIMS = int(os.getenv("TUTOR_INDEX_DIMS", "0")) or None
+DEFAULT_RESCORE = 4
+
+FLAT_INDEX_FILE = "index.faiss"
+ANN_INDEX_FILE = "index.ann.faiss"
+INDEX_META_FILE = "index_meta.json"
+INDEX_META_VERSION = 1
+
+# Upper bound on the vectors used to train IVF centroids / quantizers.
+MAX_TRAINING_VECTORS = 100_000
+# Rows sampled as queries for the build-time recall checks.
+RECALL_QUERIES = 200
+RECALL_K = 10
+
+
+@dataclass
+class AnnConfig:
+    """Build and default search settings for the search index.
+
+    ``None`` values are derived from the corpus size and dimension at build
+    time (see :func:`factory_string`). ``rescore`` is the candidate multiple
+    re-scored at full precision when the stored vectors are lossy (``1``
+    disables it). ``report`` prints the recall-vs-size table even when the
+    default float32 storage is kept.
+    """
+
+    kind: str = DEFAULT_INDEX_KIND
+    storage: str = DEFAULT_STORAGE
+    dims: Optional[int] = DEFAULT_DIMS
+    nlist: Optional[int] = None
+    pq_m: Optional[int] = None
+    pq_nbits: int = 8
+    hnsw_m: int = 32
+    ef_construction: int = 200
+    nprobe: Optional[int] = None
+    ef_search: int = 64
+    rescore: int = DEFAULT_RESCORE
+    report: bool = False
+
+    @property
+    def lossy(self) -> bool:
+        return self.kind == "ivf_pq" or self.storage != "float32" or bool(self.dims)
+
+    @property
+    def exact(self) -> bool:
+        """True when the settings describe the plain flat float32 index."""
+        return self.kind == "flat" and not self.lossy
+
+
+def _default_nlist(n: int) -> int:
+    # ~4*sqrt(n) lists, but keep >= 39 training points per centroid
+    return max(1, min(int(4 * math.sqrt(n)), n // 39))
+
+
+def _default_pq_m(d: int) -> int:
+    # Largest divisor of d that is at most d/16 (1536 dims -> 96 bytes/vector)
+    target = max(1, d // 16)
+    return next(m for m in range(target, 0, -1) if d % m == 0)
+
+
+def factory_string(config: AnnConfig, d: int, n: int) -> Tuple[str, Dict[str, Any]]:
+    """Return the ``faiss.index_factory`` spec and the resolved parameters.
+
+    ``d`` is the stored dimension, i.e. after any truncation.
+    """
+    if config.storage not in STORAGE_CODES:
+        raise ValueError(f"Unknown storage {config.storage!r}; expected one of {tuple(STORAGE_CODES)}")
+    code = STORAGE_CODES[config.storage]
+    if config.kind == "flat":
+        return code, {}
+    if config.kind == "hnsw":
+        return f"HNSW{config.hnsw_m},{code}", {"M": config.hnsw_m, "efConstruction": config.ef_construction}
+    nlist = config.nlist or _default_nlist(n)
+    if config.kind == "ivf_flat":
+        return f"IVF{nlist},{code}", {"nlist": nlist}
+    if config.kind == "ivf_pq":
+        m = config.pq_m or _default_pq_m(d)
+        if d % m:
+            raise ValueError(f"pq_m={m} must divide the embedding dimension {d}")
+        return f"IVF{nlist},PQ{m}x{config.pq_nbits}", {"nlist": nlist, "m": m, "nbits": config.pq_nbits}
+    raise ValueError(f"Unknown index kind {config.kind!r}; expected one of {INDEX_KINDS}")
+
+
+def _min_training_points(config: AnnConfig, params: Dict[str, Any]) -> int:
+    if config.kind == "ivf_pq":
+        return max(params["nlist"], 2 ** params["nbits"])
+    return params.get("nlist", 1)
+
+
+def search_defaults(config: AnnConfig, params: Dict[str, Any]) -> Dict[str, int]:
+    search = {"rescore": config.rescore if config.lossy else 1}
+    if config.kind == "hnsw":
+        search["efSearch"] = config.ef_search
+    elif "nlist" in params:
+        # Scan ~1/16 of the lists, but never fewer than 8 (recall collapses below that)
+        search["nprobe"] = min(params["nlist"], config.nprobe or max(8, params["nlist"] // 16))
+    return search
+
+
+def _unwrap(index: Any) -> List[Any]:
+    """Return the chain of (downcast) indexes from the outermost wrapper inwards."""
+    import faiss
+
+    chain = [faiss.downcast_index(index)]
+    while True:
+        current = chain[-1]
+        if isinstance(current, faiss.IndexRefine):
+            chain.append(faiss.downcast_index(current.base_index))
+        elif isinstance(current, faiss.IndexPreTransform):
+            chain.append(faiss.downcast_index(current.index))
+        else:
+            return chain
+
+
+def index_kind(index: Any) -> str:
+    """Return the :data:`INDEX_KINDS` entry matching a loaded FAISS index."""
+    import faiss
+
+    core = _unwrap(index)[-1]
+    if isinstance(core, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(core, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(core, faiss.IndexIVF):
+        return "ivf_flat"
+    return "flat"
+
+
+def vector_bytes(index: Any) -> Tuple[int, int]:
+    """Approximate ``(search_bytes, rescore_bytes)`` held by a loaded index.
+
+    ``rescore_bytes`` are the full-precision vectors used for re-scoring,
+    which are memory-mapped from ``index.faiss``.
+    """
+    import faiss
+
+    rescore = 0
+    for layer in _unwrap(index):
+        if isinstance(layer, faiss.IndexRefine):
+            refine = faiss.downcast_index(layer.refine_index)
+            rescore += int(refine.ntotal) * int(refine.code_size)
+    core = _unwrap(index)[-1]
+    n = int(core.ntotal)
+    if isinstance(core, faiss.IndexHNSW):
+        storage = faiss.downcast_index(core.storage)
+        # Codes plus the 2*M neighbour ids per vector on the base level
+        return n * int(storage.code_size) + n * int(core.hnsw.nb_neighbors(0)) * 4, rescore
+    if isinstance(core, faiss.IndexIVF):
+        # Codes plus one 8-byte id per vector in the inverted lists
+        return n * (int(core.code_size) + 8), rescore
+    return n * int(getattr(core, "code_size", core.d * 4)), rescore
+
+
+def apply_search_params(index: Any, search: Dict[str, Any]) -> None:
+    """Set the default query-time knobs on a loaded index (wrappers included)."""
+    import faiss
+
+    space = faiss.ParameterSpace()
+    kind = index_kind(index)
+    if kind == "hnsw" and search.get("efSearch"):
+        space.set_index_parameter(index, "efSearch", int(search["efSearch"]))
+    elif kind in ("ivf_flat", "ivf_pq") and search.get("nprobe"):
+        space.set_index_parameter(index, "nprobe", int(search["nprobe"]))
+    refine = faiss.downcast_index(index)
+    if isinstance(refine, faiss.IndexRefine) and search.get("rescore"):
+        refine.k_factor = float(search["rescore"])
+
+
+def search_parameters(
+    index: Any,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    rescore: Optional[int] = None,
+    selector: Any = None,
+) -> Any:
+    """Per-query ``faiss.SearchParameters`` overriding the index defaults, or ``None``.
+
+    ``selector`` (a ``faiss.IDSelector``) restricts the search to the rows it
+    selects; see ``tools/partitions.py``. The parameters are nested to match
+    the index's wrappers (re-scoring and dimension truncation).
+    """
+    import faiss
+
+    chain = _unwrap(index)
+    core = chain[-1]
+    kind = index_kind(index)
+    params = None
+    if kind == "hnsw" and (ef_search or selector is not None):
+        # Unset fields would fall back to faiss defaults, not the index's own
+        params = faiss.SearchParametersHNSW(efSearch=int(ef_search or core.hnsw.efSearch))
+    elif kind in ("ivf_flat", "ivf_pq") and (nprobe or selector is not None):
+        params = faiss.SearchParametersIVF(nprobe=int(nprobe or core.nprobe))
+    elif selector is not None:
+        params = faiss.SearchParameters()
+    if selector is not None:
+        params.sel = selector
+        faiss.add_to_referenced_objects(params, selector)
+    if params is None and not rescore:
+        return None
+
+    for layer in reversed(chain[:-1]):
+        if isinstance(layer, faiss.IndexPreTransform):
+            if params is None:
+                continue
+            outer = faiss.SearchParametersPreTransform(index_params=params)
+        else:
+            outer = faiss.IndexRefineSearchParameters(k_factor=float(rescore or layer.k_factor))
+            if params is not None:
+                outer.base_index_params = params
+        # SWIG does not keep nested parameter objects alive on its own
+        faiss.add_to_referenced_objects(outer, params)
+        params = outer
+    return params
+
+
+def _truncate(core: Any, d: int, dims: int) -> Any:
+    """Wrap ``core`` so inputs keep their first ``dims`` dimensions, re-normalized."""
+    import faiss
+
+    index = faiss.IndexPreTransform(core)
+    index.prepend_transform(faiss.NormalizationTransform(dims))
+    index.prepend_transform(faiss.RemapDimensionsTransform(d, dims, False))
+    faiss.add_to_referenced_objects(index, core)
+    return index
+
+
+def _with_rescore(index: Any, flat_index: Any, k_factor: int) -> Any:
+    import faiss
+
+    refined = faiss.IndexRefine(index, flat_index)
+    refined.k_factor = float(k_factor)
+    faiss.add_to_referenced_objects(refined, index)
+    faiss.add_to_referenced_objects(refined, flat_index)
+    return refined
+
+
+def _train_and_add(index: Any, vectors: np.ndarray) -> None:
+    if not index.is_trained:
+        n = len(vectors)
+        rng = np.random.default_rng(0)
+        training = vectors if n <= MAX_TRAINING_VECTORS else vectors[rng.choice(n, MAX_TRAINING_VECTORS, replace=False)]
+        index.train(training)
+    index.add(vectors)
+
+
+def _build(config: AnnConfig, vectors: np.ndarray) -> Tuple[Any, str, Dict[str, Any]]:
+    import faiss
+
+    n, d = vectors.shape
+    stored_d = config.dims or d
+    if stored_d > d:
+        raise ValueError(f"dims={stored_d} exceeds the embedding dimension {d}")
+    spec, params = factory_string(config, stored_d, n)
+    core = faiss.index_factory(stored_d, spec)
+    if config.kind == "hnsw":
+        faiss.downcast_index(core).hnsw.efConstruction = config.ef_construction
+    index = _truncate(core, d, stored_d) if stored_d < d else core
+    _train_and_add(index, vectors)
+    return index, spec, params
+
+
+def recall_at_k(exact: Any, approx: Any, vectors: np.ndarray, k: int = RECALL_K, seed: int = 0) -> float:
+    """Mean overlap of ``approx``'s top-k with the exact top-k, using stored vectors as queries."""
+    n = len(vectors)
+    if n == 0:
+        return 1.0
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.choice(n, size=min(RECALL_QUERIES, n), replace=False)]
+    k = min(k, n)
+    _, truth = exact.search(queries, k)
+    _, found = approx.search(queries, k)
+    return float(np.mean([len(set(t) & set(f)) / k for t, f in zip(truth, found)]))
+
+
+def storage_report(flat_index: Any, config: AnnConfig, vectors: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+    """Print and return recall@10 vs. size for every storage/truncation option.
+
+    Each row is a brute-force index over the same vectors, so the numbers
+    isolate the effect of the stored representation. Sizes are the resident
+    search index; the exact ``index.faiss`` stays on disk alongside it.
+    """
+    if vectors is None:
+        vectors = flat_index.reconstruct_n(0, int(flat_index.ntotal))
+    n, d = vectors.shape
+    dims_options = sorted({d, d // 2, d // 4} | ({config.dims} if config.dims else set()), reverse=True)
+    rows = []
+    print(f"[📏] Storage report ({n} vectors, recall@{RECALL_K} vs exact float32, re-score x{config.rescore}):")
+    print("    storage   dims  bytes/vec    size MiB  ratio  recall  +rescore")
+    print("    (size is resident memory; the exact float32 index.faiss stays on disk for re-scoring)")
+    for storage in STORAGE_CODES:
+        for dims in dims_options:
+            if dims < 8:
+                continue
+            option = replace(config, kind="flat", storage=storage, dims=dims if dims < d else None)
+            index, _, _ = _build(option, vectors)
+            code_size, _ = vector_bytes(index)
+            raw = recall_at_k(flat_index, index, vectors)
+            rescored = recall_at_k(flat_index, _with_rescore(index, flat_index, config.rescore), vectors) if option.lossy else raw
+            row = {
+                "storage": storage,
+                "dims": dims,
+                "bytes_per_vector": code_size // max(n, 1),
+                "ratio": round(d * 4 / max(code_size / max(n, 1), 1), 1),
+                "recall": round(raw, 4),
+                "recall_rescored": round(rescored, 4),
+            }
+            rows.append(row)
+            print(
+                f"    {storage:<8} {dims:>5}  {row['bytes_per_vector']:>9}  {code_size / 1_048_576:>10.1f}  "
+                f"{row['ratio']:>4}x  {raw:>6.3f}  {rescored:>8.3f}"
+            )
+    return rows
+
+
+def load_index_meta(path: Path) -> Optional[Dict[str, Any]]:
+    meta_path = Path(path) / INDEX_META_FILE
+    if not meta_path.exists():
+        return None
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version") != INDEX_META_VERSION:
+        return None
+    return meta
+
+
+def _write_meta(path: Path, meta: Dict[str, Any]) -> None:
+    meta_path = Path(path) / INDEX_META_FILE
+    tmp_path = meta_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    tmp_path.replace(meta_path)
+
+
+def build_ann_index(flat_index: Any, path: Path, config: Optional[AnnConfig] = None) -> Dict[str, Any]:
+    """Derive the configured search index from ``flat_index`` and save it under ``path``.
+
+    Falls back to the flat index (and says so) when the corpus is too small to
+    train the requested kind. Returns the metadata written to ``index_meta.json``.
+    """
+    import faiss
+
+    config = config or AnnConfig()
+    path = Path(path)
+    n, d = int(flat_index.ntotal), int(flat_index.d)
+    meta = {"version": INDEX_META_VERSION, "kind": "flat", "storage": "float32", "dims": d, "ntotal": n}
+
+    if not config.exact and n:
+        spec, params = factory_string(config, config.dims or d, n)
+        needed = _min_training_points(config, params)
+        if n < needed:
+            print(f"[⚠️] {config.kind} needs at least {needed} vectors to train ({n} indexed); using the flat index.")
+        else:
+            start = time.perf_counter()
+            vectors = flat_index.reconstruct_n(0, n)
+            if config.lossy or config.report:
+                storage_report(flat_index, config, vectors)
+            index, spec, params = _build(config, vectors)
+            search = search_defaults(config, params)
+            apply_search_params(index, search)
+            recall_raw = recall_at_k(flat_index, index, vectors)
+            recall = recall_raw
+            if search["rescore"] > 1:
+                recall = recall_at_k(flat_index, _with_rescore(index, flat_index, search["rescore"]), vectors)
+
+            tmp_path = path / f".tmp_{ANN_INDEX_FILE}"
+            faiss.write_index(index, str(tmp_path))
+            tmp_path.replace(path / ANN_INDEX_FILE)
+            size = (path / ANN_INDEX_FILE).stat().st_size
+            flat_size = n * d * 4
+            meta.update({
+                "kind": config.kind,
+                "storage": config.storage if config.kind != "ivf_pq" else "pq",
+                "dims": config.dims or d,
+                "factory": spec,
+                "params": params,
+                "search": search,
+                f"recall_at_{RECALL_K}": round(recall, 4),
+                f"recall_at_{RECALL_K}_raw": round(recall_raw, 4),
+                "bytes": size,
+            })
+            rescored = f", {recall:.3f} after x{search['rescore']} re-score" if search["rescore"] > 1 else ""
+            print(
+                f"[🧭] Built {config.kind} index ({spec}, {config.dims or d} dims) in {time.perf_counter() - start:.1f}s: "
+                f"recall@{RECALL_K} {recall_raw:.3f} vs exact{rescored}, {size / 1_048_576:.1f} MiB "
+                f"(flat vectors {flat_size / 1_048_576:.1f} MiB), search defaults {search}"
+            )
+    elif config.report and n:
+        storage_report(flat_index, config)
+
+    if "factory" not in meta:
+        (path / ANN_INDEX_FILE).unlink(missing_ok=True)
+    _write_meta(path, meta)
+    return meta
+
+
+def read_search_index(path: Path, mmap: bool = False) -> Tuple[Any, str]:
+    """Read the index selected by ``index_meta.json`` as ``(index, kind)``.
+
+    Default search parameters come from the metadata and can be overridden
+    with the ``TUTOR_ANN_NPROBE`` / ``TUTOR_ANN_EF_SEARCH`` /
+    ``TUTOR_ANN_RESCORE`` environment variables. Lossy indexes are wrapped so
+    their top candidates are re-scored against the memory-mapped flat index.
+    Without metadata (or for the exact flat index) ``index.faiss`` is returned.
+    """
+    import faiss
+
+    path = Path(path)
+    meta = load_index_meta(path)
+    if meta and "factory" in meta and not (path / ANN_INDEX_FILE).exists():
+        print(f"[⚠️] {ANN_INDEX_FILE} missing at {path}; using the flat index.")
+        meta = None
+    if not meta or "factory" not in meta:
+        flags = faiss.IO_FLAG_MMAP_IFC if mmap else 0
+        return faiss.read_index(str(path / FLAT_INDEX_FILE), flags), "flat"
+
+    index = faiss.read_index(str(path / ANN_INDEX_FILE), faiss.IO_FLAG_MMAP if mmap else 0)
+    search = dict(meta.get("search", {}))
+    for key, env in (("nprobe", "TUTOR_ANN_NPROBE"), ("efSearch", "TUTOR_ANN_EF_SEARCH"), ("rescore", "TUTOR_ANN_RESCORE")):
+        if os.getenv(env):
+            search[key] = int(os.getenv(env))
+    if search.get("rescore", 1) > 1:
+        flat = faiss.read_index(str(path / FLAT_INDEX_FILE), faiss.IO_FLAG_MMAP_IFC)
+        index = _with_rescore(index, flat, search["rescore"])
+    apply_search_params(index, search)
+    return index, meta["kind"]
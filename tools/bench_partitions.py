@@ -0,0 +1,87 @@
+# tools/bench_partitions.py
+
+"""Benchmark unfiltered vs. category-filtered search on the configured search index.
+
+Usage::
+
+    python -m tools.bench_partitions                       # synthetic corpora
+    python -m tools.bench_partitions --sizes 20000 200000 --share 0.4
+    python -m tools.bench_partitions --kind hnsw --storage int8
+
+Each corpus is split into two categories (``--share`` of the chunks in the
+smaller one, like LangGraph next to LangChain). The search index is built
+with the same ``AnnConfig`` as ``tools/prep_docs.py`` (``TUTOR_INDEX_*``
+environment defaults, overridable here), and the partition is searched on
+that index through an ``IDSelectorBitmap``. Recall is measured against an
+exact search restricted to the same rows. Queries are single vectors, as
+issued by the learn and doc-search nodes.
+"""
+
+import argparse
+import time
+from dataclasses import replace
+
+import numpy as np
+
+from tools.ann_index import AnnConfig, RECALL_K, build_ann_index, read_search_index, search_parameters
+from tools.partitions import build_partitions, load_partitions
+
+
+DEFAULT_SIZES = (10_000, 40_000, 160_000)
+
+
+def _per_query_ms(index, queries: np.ndarray, k: int, params=None) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query[None, :], k, params=params)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def benchmark(sizes, dim: int, share: float, queries: int, k: int, config: AnnConfig, workdir: str) -> None:
+    import faiss
+
+    rng = np.random.default_rng(0)
+    print(
+        f"[⏱️] {dim}-dim vectors, {config.kind}/{config.storage} index, {share:.0%} of chunks "
+        f"in the smaller category, top-{k}, {queries} queries"
+    )
+    print(f"  {'chunks':>8}  {'full':>9}  {'partition':>9}  speedup  recall@{RECALL_K}")
+    for n in sizes:
+        vectors = rng.standard_normal((n, dim), dtype=np.float32)
+        flat = faiss.IndexFlatL2(dim)
+        flat.add(vectors)
+        faiss.write_index(flat, f"{workdir}/index.faiss")
+        build_ann_index(flat, workdir, config)
+        index, _ = read_search_index(workdir)
+        metadatas = [
+            {"source": "docs/langgraph/x.md" if i < n * share else "docs/langchain/x.md"} for i in range(n)
+        ]
+        build_partitions(n, metadatas, workdir)
+        part = load_partitions(workdir, n)["langgraph"]
+        params = search_parameters(index, selector=part.selector)
+
+        sample = rng.standard_normal((queries, dim), dtype=np.float32)
+        full_ms = _per_query_ms(index, sample, k)
+        part_ms = _per_query_ms(index, sample, k, params)
+        _, truth = flat.search(sample, RECALL_K, params=search_parameters(flat, selector=part.selector))
+        _, found = index.search(sample, RECALL_K, params=search_parameters(index, selector=part.selector))
+        recall = np.mean([len(set(t) & set(f)) / RECALL_K for t, f in zip(truth, found)])
+        print(f"  {n:>8}  {full_ms:7.2f}ms  {part_ms:7.2f}ms  x{full_ms / part_ms:5.1f}  {recall:8.3f}")
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--share", type=float, default=0.4, help="fraction of chunks in the searched category")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=8)
+    parser.add_argument("--kind", help="index kind (default: TUTOR_INDEX_KIND)")
+    parser.add_argument("--storage", help="vector storage (default: TUTOR_INDEX_STORAGE)")
+    parser.add_argument("--dims", type=int, help="truncate vectors to this many dimensions")
+    args = parser.parse_args()
+    overrides = {key: value for key, value in (("kind", args.kind), ("storage", args.storage), ("dims", args.dims)) if value}
+    with tempfile.TemporaryDirectory() as tmp:
+        benchmark(args.sizes, args.dim, args.share, args.queries, args.k, replace(AnnConfig(), **overrides), tmp)
@@ -0,0 +1,280 @@
+"""Compact, randomly accessible store of the documentation chunks.
+
+The corpus used to be kept twice: as a pickled list of LangChain ``Document``
+objects in ``data/raw_docs.pkl`` and again inside the FAISS docstore pickle.
+The chunk store replaces both. It is a directory of flat files, row-aligned
+with the FAISS index:
+
+- ``text.bin``: every chunk's UTF-8 text, concatenated
+- ``offsets.npy``: ``n + 1`` byte offsets into ``text.bin``
+- ``sources.json`` + ``source_ids.npy``: interned source paths and one index
+  per chunk
+- ``start_index.npy``: character offset of the chunk in its source (-1 if
+  unknown)
+- ``ids.npy``: chunk/docstore ids
+- ``extra.bin`` + ``extra_offsets.npy``: JSON for any other metadata keys
+- ``meta.json``: version and row count; written last
+
+All arrays are opened with ``mmap_mode="r"``. Random access, streaming scans
+and sampling therefore never load the whole corpus into Python objects.
+"""
+
+import hashlib
+import json
+import mmap
+import pickle
+import random
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+CHUNKS_DIR = "chunks"
+CHUNK_STORE_PATH = Path("embeddings/vector_store") / CHUNKS_DIR
+LEGACY_RAW_CHUNKS_PATH = Path("data/raw_docs.pkl")
+CHUNK_STORE_VERSION = 1
+META_FILE = "meta.json"
+
+# Metadata keys stored in dedicated columns; everything else goes to ``extra``.
+_COLUMN_KEYS = ("source", "start_index")
+
+
+class ChunkStore:
+    """Read-only, memory-mapped view of a chunk store directory."""
+
+    def __init__(self, path: Path = CHUNK_STORE_PATH):
+        self.path = Path(path)
+        with open(self.path / META_FILE, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != CHUNK_STORE_VERSION:
+            raise ValueError(f"Unsupported chunk store version at {self.path}; re-run tools/prep_docs.py")
+        self._count = int(meta["count"])
+        self._offsets = np.load(self.path / "offsets.npy", mmap_mode="r")
+        self._source_ids = np.load(self.path / "source_ids.npy", mmap_mode="r")
+        self._start_index = np.load(self.path / "start_index.npy", mmap_mode="r")
+        self._ids = np.load(self.path / "ids.npy", mmap_mode="r")
+        self._extra_offsets = np.load(self.path / "extra_offsets.npy", mmap_mode="r")
+        with open(self.path / "sources.json", "r", encoding="utf-8") as f:
+            self.sources: List[str] = json.load(f)
+        self._text = self._map(self.path / "text.bin")
+        self._extra = self._map(self.path / "extra.bin")
+
+    @staticmethod
+    def _map(file_path: Path):
+        if file_path.stat().st_size == 0:
+            return b""
+        with open(file_path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the text blob (the bulk of the store)."""
+        return len(self._text)
+
+    def fingerprint(self) -> str:
+        """Hash of the chunk ids in row order; changes whenever any chunk does."""
+        return hashlib.sha256(np.ascontiguousarray(self._ids).tobytes()).hexdigest()[:16]
+
+    def text(self, row: int) -> str:
+        return self._text[int(self._offsets[row]):int(self._offsets[row + 1])].decode("utf-8")
+
+    def source(self, row: int) -> str:
+        return self.sources[int(self._source_ids[row])]
+
+    def chunk_id(self, row: int) -> str:
+        return self._ids[row].decode("ascii")
+
+    def metadata(self, row: int) -> Dict:
+        metadata = {"source": self.source(row)}
+        start = int(self._start_index[row])
+        if start >= 0:
+            metadata["start_index"] = start
+        begin, end = int(self._extra_offsets[row]), int(self._extra_offsets[row + 1])
+        if end > begin:
+            metadata.update(json.loads(self._extra[begin:end]))
+        return metadata
+
+    def document(self, row: int) -> Document:
+        return Document(id=self.chunk_id(row), page_content=self.text(row), metadata=self.metadata(row))
+
+    def iter_texts(self) -> Iterator[str]:
+        for row in range(self._count):
+            yield self.text(row)
+
+    def iter_sources(self) -> Iterator[str]:
+        """Yield each chunk's source path (interned strings, no decoding)."""
+        for source_id in self._source_ids:
+            yield self.sources[int(source_id)]
+
+    def iter_documents(self) -> Iterator[Document]:
+        for row in range(self._count):
+            yield self.document(row)
+
+    def sample(self, k: int, seed: Optional[int] = None) -> List[Document]:
+        """Return ``k`` random chunks without decoding the rest."""
+        rows = random.Random(seed).sample(range(self._count), min(k, self._count))
+        return [self.document(row) for row in rows]
+
+
+class InMemoryChunks:
+    """``ChunkStore``-compatible wrapper around a list of ``Document`` objects.
+
+    Only used to keep reading a legacy ``data/raw_docs.pkl`` until the index is
+    rebuilt.
+    """
+
+    def __init__(self, docs: List[Document]):
+        self._docs = docs
+        self.sources = sorted({doc.metadata.get("source", "") for doc in docs})
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def fingerprint(self) -> str:
+        digest = hashlib.sha256()
+        for row in range(len(self._docs)):
+            digest.update(self.chunk_id(row).encode("utf-8") + b"\0")
+        return digest.hexdigest()[:16]
+
+    def text(self, row: int) -> str:
+        return self._docs[row].page_content
+
+    def source(self, row: int) -> str:
+        return self._docs[row].metadata.get("source", "")
+
+    def chunk_id(self, row: int) -> str:
+        return self._docs[row].id or str(row)
+
+    def metadata(self, row: int) -> Dict:
+        return dict(self._docs[row].metadata)
+
+    def document(self, row: int) -> Document:
+        return self._docs[row]
+
+    def iter_texts(self) -> Iterator[str]:
+        return (doc.page_content for doc in self._docs)
+
+    def iter_sources(self) -> Iterator[str]:
+        return (doc.metadata.get("source", "") for doc in self._docs)
+
+    def iter_documents(self) -> Iterator[Document]:
+        return iter(self._docs)
+
+    def sample(self, k: int, seed: Optional[int] = None) -> List[Document]:
+        return random.Random(seed).sample(self._docs, min(k, len(self._docs)))
+
+
+def has_chunk_store(path: Path = CHUNK_STORE_PATH) -> bool:
+    return (Path(path) / META_FILE).exists()
+
+
+def open_corpus(path: Path = CHUNK_STORE_PATH):
+    """Open the chunk store, falling back to a legacy ``raw_docs.pkl``.
+
+    Returns ``None`` when neither exists.
+    """
+    if has_chunk_store(path):
+        return ChunkStore(path)
+    if LEGACY_RAW_CHUNKS_PATH.exists():
+        with open(LEGACY_RAW_CHUNKS_PATH, "rb") as f:
+            return InMemoryChunks(pickle.load(f))
+    return None
+
+
+_corpus_cache: Dict[Path, Tuple[Tuple, Any, str]] = {}
+_corpus_lock = threading.Lock()
+
+
+def _corpus_signature(path: Path) -> Optional[Tuple]:
+    for file_path in (path / META_FILE, LEGACY_RAW_CHUNKS_PATH.resolve()):
+        try:
+            st = file_path.stat()
+        except FileNotFoundError:
+            continue
+        return (str(file_path), st.st_ino, st.st_mtime_ns, st.st_size)
+    return None
+
+
+def cached_corpus(path: Path = CHUNK_STORE_PATH) -> Tuple[Any, Optional[str]]:
+    """``(corpus, fingerprint)`` as from :func:`open_corpus`, opened once per index build.
+
+    The corpus and its fingerprint (a hash over every chunk id) are reused
+    until the store's ``meta.json``, or the legacy ``raw_docs.pkl``, changes
+    on disk. Per-session callers such as ``tools.question_bank.serve_questions``
+    therefore neither re-open the store nor re-hash it. Returns
+    ``(None, None)`` when there is no corpus.
+    """
+    path = Path(path).resolve()
+    signature = _corpus_signature(path)
+    if signature is None:
+        return None, None
+    with _corpus_lock:
+        cached = _corpus_cache.get(path)
+        if cached is None or cached[0] != signature:
+            docs = open_corpus(path)
+            if docs is None:
+                return None, None
+            cached = _corpus_cache[path] = (signature, docs, docs.fingerprint())
+        return cached[1], cached[2]
+
+
+def write_chunk_store(rows: Iterable[Tuple[str, Document]], path: Path = CHUNK_STORE_PATH) -> int:
+    """Stream ``(chunk_id, document)`` rows, in FAISS row order, into a new store.
+
+    The store is assembled in a temporary directory and renamed into place
+    at the end, so readers never observe a half-written store. The swap is not
+    atomic, though: the old store is renamed aside first, and a reader that
+    opens the store between the two renames, or a crash between them, finds
+    no store until the next build. Readers that already opened the old store
+    keep their memory maps. Returns the row count.
+    """
+    path = Path(path)
+    tmp_dir = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    offsets, extra_offsets = [0], [0]
+    source_ids, start_index, ids = [], [], []
+    source_table: Dict[str, int] = {}
+    with open(tmp_dir / "text.bin", "wb") as text_file, open(tmp_dir / "extra.bin", "wb") as extra_file:
+        for doc_id, doc in rows:
+            encoded = doc.page_content.encode("utf-8")
+            text_file.write(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+
+            source = doc.metadata.get("source", "")
+            source_ids.append(source_table.setdefault(source, len(source_table)))
+            start_index.append(doc.metadata.get("start_index", -1))
+            ids.append(doc_id.encode("ascii"))
+
+            extra = {k: v for k, v in doc.metadata.items() if k not in _COLUMN_KEYS}
+            encoded_extra = json.dumps(extra, ensure_ascii=False).encode("utf-8") if extra else b""
+            extra_file.write(encoded_extra)
+            extra_offsets.append(extra_offsets[-1] + len(encoded_extra))
+
+    np.save(tmp_dir / "offsets.npy", np.asarray(offsets, dtype=np.uint64))
+    np.save(tmp_dir / "extra_offsets.npy", np.asarray(extra_offsets, dtype=np.uint64))
+    np.save(tmp_dir / "source_ids.npy", np.asarray(source_ids, dtype=np.uint32))
+    np.save(tmp_dir / "start_index.npy", np.asarray(start_index, dtype=np.int64))
+    np.save(tmp_dir / "ids.npy", np.asarray(ids, dtype=f"S{max((len(i) for i in ids), default=1)}"))
+    with open(tmp_dir / "sources.json", "w", encoding="utf-8") as f:
+        json.dump(sorted(source_table, key=source_table.get), f, ensure_ascii=False)
+    with open(tmp_dir / META_FILE, "w", encoding="utf-8") as f:
+        json.dump({"version": CHUNK_STORE_VERSION, "count": len(ids)}, f)
+
+    # Two renames keep the window without a store as short as possible
+    old_dir = path.with_name(path.name + ".old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if path.exists():
+        path.replace(old_dir)
+    tmp_dir.replace(path)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    print(f"[🗃️] Wrote {len(ids)} chunks ({offsets[-1] / 1_048_576:.1f} MiB text, {len(source_table)} sources) to {path}")
+    return len(ids)
@@ -0,0 +1,158 @@
+"""Long-lived, pooled OpenAI chat and embedding clients shared by every node.
+
+Nodes used to construct a new ``ChatOpenAI`` or ``OpenAIEmbeddings`` on each
+call. Every instance brought its own HTTP client, so no connection was
+reused and each request could pay a TCP + TLS handshake. This module keeps:
+
+- a single ``httpx.Client`` for the process, whose connection pool is
+  limited and kept alive (see ``TUTOR_HTTP_*`` below);
+- one ``httpx.AsyncClient`` per event loop, since pooled async connections
+  cannot outlive the loop that opened them;
+- one chat model per role and event loop. Roles are named groups of model
+  settings in :data:`CHAT_MODELS`, overridable with ``TUTOR_MODEL_<ROLE>``.
+  Embedding clients are kept per model and event loop.
+
+All of them share the pools above. :func:`client_stats` reports how many
+clients and pools were created.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+
+MAX_CONNECTIONS = int(os.getenv("TUTOR_HTTP_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("TUTOR_HTTP_MAX_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("TUTOR_HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP_TIMEOUT = float(os.getenv("TUTOR_HTTP_TIMEOUT", "60"))
+
+# Per-role chat model settings; the model of a role can be overridden with
+# TUTOR_MODEL_<ROLE> (e.g. TUTOR_MODEL_FEEDBACK=gpt-4o).
+CHAT_MODELS: Dict[str, Dict[str, Any]] = {
+    "feedback": {"model": "gpt-4", "temperature": 0},
+    "questions": {"model": "gpt-3.5-turbo", "temperature": 0.3},
+    "review": {"model": "gpt-3.5-turbo", "temperature": 0.5},
+    "doc_search": {"model": "gpt-3.5-turbo", "temperature": 0.1},
+    "topics": {"model": "gpt-4", "temperature": 0},
+}
+
+CLIENT_STATS: Counter = Counter()
+
+_lock = threading.Lock()
+_sync_http: Optional[httpx.Client] = None
+# Keyed by event loop (or None outside one); entries go away with their loop
+_per_loop: "weakref.WeakKeyDictionary[Any, Dict[Any, Any]]" = weakref.WeakKeyDictionary()
+_no_loop: Dict[Any, Any] = {}
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def _loop_cache() -> Dict[Any, Any]:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _no_loop
+    cache = _per_loop.get(loop)
+    if cache is None:
+        cache = _per_loop[loop] = {}
+    return cache
+
+
+def sync_http_client() -> httpx.Client:
+    """The process-wide pooled HTTP client used for blocking calls."""
+    global _sync_http
+    with _lock:
+        if _sync_http is None or _sync_http.is_closed:
+            _sync_http = httpx.Client(limits=_limits(), timeout=HTTP_TIMEOUT)
+            CLIENT_STATS["http_pools"] += 1
+        return _sync_http
+
+
+def async_http_client() -> httpx.AsyncClient:
+    """The pooled async HTTP client of the running event loop."""
+    with _lock:
+        cache = _loop_cache()
+        client = cache.get("http")
+        if client is None or client.is_closed:
+            client = cache["http"] = httpx.AsyncClient(limits=_limits(), timeout=HTTP_TIMEOUT)
+            CLIENT_STATS["http_pools"] += 1
+        return client
+
+
+def chat_settings(role: str, **overrides: Any) -> Dict[str, Any]:
+    """Settings for ``role``, with the ``TUTOR_MODEL_<ROLE>`` override and ``overrides`` applied."""
+    if role not in CHAT_MODELS:
+        raise ValueError(f"Unknown chat model role {role!r}; expected one of {sorted(CHAT_MODELS)}")
+    settings = dict(CHAT_MODELS[role])
+    env_model = os.getenv(f"TUTOR_MODEL_{role.upper()}")
+    if env_model:
+        settings["model"] = env_model
+    settings.update(overrides)
+    return settings
+
+
+def get_chat_model(role: str, **overrides: Any) -> Any:
+    """Shared ``ChatOpenAI`` for ``role``; extra keyword arguments override its settings."""
+    from langchain_openai import ChatOpenAI
+
+    settings = chat_settings(role, **overrides)
+    key: Tuple = ("chat", tuple(sorted(settings.items())))
+    cache = _loop_cache()
+    llm = cache.get(key)
+    if llm is None:
+        http_client, http_async_client = sync_http_client(), async_http_client()
+        with _lock:
+            llm = cache.get(key)
+            if llm is None:
+                llm = cache[key] = ChatOpenAI(
+                    **settings, http_client=http_client, http_async_client=http_async_client,
+                )
+                CLIENT_STATS["chat_models"] += 1
+    return llm
+
+
+def get_embeddings(model: Optional[str] = None) -> Any:
+    """Shared ``OpenAIEmbeddings`` for ``model`` (the library default when ``None``)."""
+    from langchain_openai import OpenAIEmbeddings
+
+    key = ("embeddings", model)
+    cache = _loop_cache()
+    embeddings = cache.get(key)
+    if embeddings is None:
+        http_client, http_async_client = sync_http_client(), async_http_client()
+        with _lock:
+            embeddings = cache.get(key)
+            if embeddings is None:
+                kwargs = {"model": model} if model else {}
+                embeddings = cache[key] = OpenAIEmbeddings(
+                    **kwargs, http_client=http_client, http_async_client=http_async_client,
+                )
+                CLIENT_STATS["embeddings"] += 1
+    return embeddings
+
+
+def client_stats() -> Dict[str, int]:
+    """How many HTTP pools, chat models and embedding clients were created."""
+    return dict(CLIENT_STATS)
+
+
+def reset_clients() -> None:
+    """Drop every cached client and close the blocking pool (e.g. after changing ``OPENAI_BASE_URL``)."""
+    global _sync_http
+    with _lock:
+        if _sync_http is not None:
+            _sync_http.close()
+        _sync_http = None
+        _per_loop.clear()
+        _no_loop.clear()
@@ -0,0 +1,146 @@
+"""MinHash/LSH near-duplicate detection for documentation chunks.
+
+The LangChain and LangGraph repos ship many near-identical markdown files:
+versioned docs, READMEs copied between packages, the same page flattened
+under two names by ``tools/load_docs.py``. Without this stage every copy was
+embedded and competed for the handful of retrieved slots.
+
+:class:`NearDuplicateIndex` keeps a MinHash signature per indexed
+("canonical") chunk in an LSH table. ``tools/prep_docs.py`` checks each new
+chunk against it. A chunk whose estimated Jaccard similarity to a canonical
+chunk reaches ``threshold`` is recorded as an alias of that chunk instead of
+being embedded. Its source path is merged into the canonical chunk's
+``sources`` metadata.
+
+Signatures are persisted next to the index (``minhash.npz``) so incremental
+builds can match against chunks indexed in earlier runs.
+"""
+
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+DEDUP_FILE = "minhash.npz"
+DEDUP_THRESHOLD = 0.85
+NUM_PERM = 128
+# 16 bands of 8 rows: pairs above ~0.7 Jaccard almost always share a bucket
+LSH_BANDS = 16
+SHINGLE_SIZE = 3
+
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> List[str]:
+    """Lower-cased word ``size``-grams; short texts fall back to single words."""
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return words or [text]
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer; uint64 arithmetic wraps, which is what we want
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class MinHasher:
+    """Fixed-seed MinHash over word shingles."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._masks = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64, endpoint=True)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashed = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in set(shingles(text))), dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            return _mix(hashed[None, :] ^ self._masks[:, None]).min(axis=1)
+
+
+def jaccard_estimate(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.mean(a == b))
+
+
+class NearDuplicateIndex:
+    """LSH table of canonical chunk signatures, keyed by chunk id."""
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, num_perm: int = NUM_PERM, bands: int = LSH_BANDS):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.signatures: Dict[str, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, chunk_id: str, text: Optional[str] = None, signature: Optional[np.ndarray] = None) -> None:
+        if chunk_id in self.signatures:
+            return
+        signature = self.hasher.signature(text) if signature is None else signature
+        self.signatures[chunk_id] = signature
+        for band, key in self._band_keys(signature):
+            self._buckets[band].setdefault(key, []).append(chunk_id)
+
+    def remove(self, chunk_ids: Iterable[str]) -> None:
+        for chunk_id in chunk_ids:
+            signature = self.signatures.pop(chunk_id, None)
+            if signature is None:
+                continue
+            for band, key in self._band_keys(signature):
+                bucket = self._buckets[band].get(key, [])
+                if chunk_id in bucket:
+                    bucket.remove(chunk_id)
+
+    def match(self, text: str) -> Tuple[Optional[str], np.ndarray]:
+        """Return ``(canonical_id or None, signature)`` for ``text``.
+
+        The most similar candidate at or above ``threshold`` wins.
+        """
+        signature = self.hasher.signature(text)
+        candidates = {cid for band, key in self._band_keys(signature) for cid in self._buckets[band].get(key, ())}
+        best, best_score = None, self.threshold
+        for cid in sorted(candidates):
+            score = jaccard_estimate(signature, self.signatures[cid])
+            if score >= best_score:
+                best, best_score = cid, score
+        return best, signature
+
+    def save(self, directory: str) -> Path:
+        path = Path(directory) / DEDUP_FILE
+        ids = sorted(self.signatures)
+        signatures = np.stack([self.signatures[cid] for cid in ids]) if ids else np.zeros((0, self.hasher.num_perm), np.uint64)
+        tmp_path = path.with_name(f".tmp_{DEDUP_FILE}")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, ids=np.asarray(ids, dtype="S"), signatures=signatures)
+        tmp_path.replace(path)
+        return path
+
+    def load(self, directory: str, keep: Optional[set] = None) -> int:
+        """Add persisted signatures (only ids in ``keep``, if given); return the count."""
+        path = Path(directory) / DEDUP_FILE
+        if not path.exists():
+            return 0
+        data = np.load(path)
+        if data["signatures"].shape[1:] != (self.hasher.num_perm,):
+            return 0
+        loaded = 0
+        for raw_id, signature in zip(data["ids"], data["signatures"]):
+            cid = raw_id.decode("ascii")
+            if keep is None or cid in keep:
+                self.add(cid, signature=signature)
+                loaded += 1
+        return loaded
@@ -1,5 +1,8 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from langchain_community.document_loaders import DirectoryLoader, TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
 from pathlib import Path
 import pickle
 
@@ -20,12 +23,64 @@ def load_docs_from_directory(directory: str, file_extension: str = ".md") -> lis
     return loader.load()
 
 
-def split_documents(docs: list, chunk_size: int = 1000, chunk_overlap: int = 200):
-    """Splits raw documents into smaller chunks."""
-    splitter = RecursiveCharacterTextSplitter(
+def list_doc_files(directory: str, file_extension: str = ".md") -> list:
+    """Returns the documentation files under ``directory`` in a stable order."""
+    path = Path(directory)
+    if not path.exists():
+        raise FileNotFoundError(f"Directory {directory} not found.")
+    return sorted(p for p in path.glob(f"**/*{file_extension}") if p.is_file())
+
+
+def _split_file_worker(args) -> list:
+    """Process-pool task: read and split one file into ``(text, metadata)`` pairs."""
+    file_path, chunk_size, chunk_overlap = args
+    splitter = _make_splitter(chunk_size, chunk_overlap)
+    chunks = splitter.split_documents(TextLoader(file_path).load())
+    return [(chunk.page_content, chunk.metadata) for chunk in chunks]
+
+
+def iter_split_files(file_paths, workers: int = 1, chunk_size: int = 1000, chunk_overlap: int = 200):
+    """Yields ``(file_path, chunks)`` for each file, in input order.
+
+    With ``workers > 1`` files are sharded across a process pool and split in
+    the workers. Results are still yielded in input order, and only a small
+    window of files (``2 * workers``) is in flight at once, so output is
+    deterministic and memory stays bounded.
+    """
+    if workers <= 1:
+        splitter = _make_splitter(chunk_size, chunk_overlap)
+        for file_path in file_paths:
+            yield file_path, splitter.split_documents(TextLoader(str(file_path)).load())
+        return
+    yield from _iter_split_files_parallel(file_paths, workers, chunk_size, chunk_overlap)
+
+
+def _iter_split_files_parallel(file_paths, workers: int, chunk_size: int = 1000, chunk_overlap: int = 200):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        window = deque()
+        for file_path in file_paths:
+            window.append((file_path, pool.submit(_split_file_worker, (str(file_path), chunk_size, chunk_overlap))))
+            if len(window) >= 2 * workers:
+                done_path, future = window.popleft()
+                yield done_path, [Document(page_content=t, metadata=m) for t, m in future.result()]
+        while window:
+            done_path, future = window.popleft()
+            yield done_path, [Document(page_content=t, metadata=m) for t, m in future.result()]
+
+
+def _make_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    # ``add_start_index`` records each chunk's character offset in its source,
+    # so serial and parallel runs produce identical, deterministic metadata.
+    return RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
+        add_start_index=True,
     )
+
+
+def split_documents(docs: list, chunk_size: int = 1000, chunk_overlap: int = 200):
+    """Splits raw documents into smaller chunks."""
+    splitter = _make_splitter(chunk_size, chunk_overlap)
     print(f"[+] Splitting {len(docs)} documents into chunks...")
     return splitter.split_documents(docs)
 
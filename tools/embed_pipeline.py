@@ -0,0 +1,233 @@
+"""Batched, concurrent and resumable embedding of document chunks.
+
+``FAISS.from_documents`` used to embed every chunk in one synchronous call, so
+a single transient API error lost all progress and no network waits
+overlapped. This stage splits the texts into fixed-size batches, embeds them
+with a bounded number of concurrent ``aembed_documents`` calls, retries
+failures with exponential backoff and checkpoints every finished batch to
+disk. Re-running an interrupted build picks the checkpointed batches back up
+instead of paying for them again.
+
+:func:`aembed_batches` is the streaming form used by ``tools/prep_docs.py``:
+batches are pulled lazily from an iterator and at most ``max_in_flight`` of
+them are held in memory at once, however large the corpus. The batches may
+come from an async iterator; :func:`aiter_in_thread` wraps a blocking
+producer (such as the document splitter) so it runs in a worker thread while
+the embedding requests proceed on the event loop.
+"""
+
+import asyncio
+import hashlib
+import shutil
+import time
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from tools.embedding_cache import embedding_model_name
+
+
+CHECKPOINT_DIR = Path("embeddings/.build_checkpoint")
+DEFAULT_BATCH_SIZE = 128
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_IN_FLIGHT = 8
+MAX_RETRIES = 5
+
+
+class ProgressReporter:
+    """Prints throughput (chunks/s) and an ETA as batches complete.
+
+    ``total`` may be ``None`` when streaming, in which case no ETA is shown.
+    """
+
+    def __init__(self, total: Optional[int], label: str = "Embedding"):
+        self.total = total
+        self.label = label
+        self.done = 0
+        self.reused = 0
+        self.start = time.perf_counter()
+
+    def update(self, count: int, from_checkpoint: bool = False) -> None:
+        self.done += count
+        if from_checkpoint:
+            self.reused += count
+            return
+        elapsed = time.perf_counter() - self.start
+        fresh = self.done - self.reused
+        rate = fresh / elapsed if elapsed > 0 else 0.0
+        if self.total is None:
+            print(f"[⏳] {self.label}: {self.done} chunks ({rate:.1f} chunks/s)")
+            return
+        remaining = self.total - self.done
+        eta = remaining / rate if rate > 0 else float("inf")
+        print(f"[⏳] {self.label}: {self.done}/{self.total} chunks ({rate:.1f} chunks/s, ETA {eta:.0f}s)")
+
+    def summary(self) -> None:
+        elapsed = time.perf_counter() - self.start
+        fresh = self.done - self.reused
+        rate = fresh / elapsed if elapsed > 0 else 0.0
+        print(
+            f"[✅] {self.label}: {fresh} chunks embedded in {elapsed:.1f}s ({rate:.1f} chunks/s), "
+            f"{self.reused} restored from checkpoints"
+        )
+
+
+def _batch_key(model: str, texts: List[str]) -> str:
+    digest = hashlib.sha256(model.encode("utf-8"))
+    for text in texts:
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+async def _embed_batch_with_retry(embeddings: Any, texts: List[str], max_retries: int) -> List[List[float]]:
+    delay = 1.0
+    for attempt in range(1, max_retries + 1):
+        try:
+            return await embeddings.aembed_documents(texts)
+        except Exception as e:
+            if attempt == max_retries:
+                raise
+            print(f"[⚠️] Embedding batch failed (attempt {attempt}/{max_retries}): {e}. Retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+
+async def _embed_checkpointed(
+    embeddings: Any,
+    model: str,
+    texts: List[str],
+    semaphore: asyncio.Semaphore,
+    checkpoint_dir: Optional[Path],
+    max_retries: int,
+    progress: ProgressReporter,
+) -> np.ndarray:
+    """Embed one batch, or restore it from its checkpoint if one exists."""
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    checkpoint = checkpoint_dir / f"{_batch_key(model, texts)}.npy" if checkpoint_dir else None
+    if checkpoint is not None and checkpoint.exists():
+        vectors = np.load(checkpoint)
+        progress.update(len(texts), from_checkpoint=True)
+        return vectors
+    async with semaphore:
+        vectors = np.asarray(await _embed_batch_with_retry(embeddings, texts, max_retries), dtype=np.float32)
+    if checkpoint is not None:
+        tmp_path = checkpoint.with_suffix(".tmp.npy")
+        np.save(tmp_path, vectors)
+        tmp_path.replace(checkpoint)
+    progress.update(len(texts))
+    return vectors
+
+
+def _prepare_checkpoint_dir(checkpoint_dir: Optional[Path]) -> Optional[Path]:
+    if checkpoint_dir is None:
+        return None
+    checkpoint_dir = Path(checkpoint_dir)
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    return checkpoint_dir
+
+
+async def aiter_in_thread(items: Iterable[Any], block_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[Any]:
+    """Yield from the blocking iterator ``items``, advancing it in a worker thread.
+
+    Items are fetched ``block_size`` at a time, so the event loop keeps
+    serving other tasks while the producer waits on I/O or a process pool.
+    """
+    items = iter(items)
+    while True:
+        block = await asyncio.to_thread(lambda: list(islice(items, block_size)))
+        if not block:
+            return
+        for item in block:
+            yield item
+
+
+async def _aiter(items: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Any]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def aembed_batches(
+    batches: Union[Iterable[Tuple[Any, List[str]]], AsyncIterable[Tuple[Any, List[str]]]],
+    embeddings: Any,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    checkpoint_dir: Optional[Path] = CHECKPOINT_DIR,
+    max_retries: int = MAX_RETRIES,
+) -> AsyncIterator[Tuple[Any, np.ndarray]]:
+    """Stream ``(payload, texts)`` batches through the embeddings API.
+
+    Yields ``(payload, vectors)`` in input order. The input iterator is only
+    advanced while fewer than ``max_in_flight`` batches are pending, which
+    bounds how much of the corpus is held in memory at any time.
+    """
+    model = embedding_model_name(embeddings)
+    checkpoint_dir = _prepare_checkpoint_dir(checkpoint_dir)
+    semaphore = asyncio.Semaphore(concurrency)
+    progress = ProgressReporter(None)
+    pending: deque = deque()
+
+    async for payload, texts in _aiter(batches):
+        task = asyncio.ensure_future(
+            _embed_checkpointed(embeddings, model, texts, semaphore, checkpoint_dir, max_retries, progress)
+        )
+        pending.append((payload, task))
+        if len(pending) >= max_in_flight:
+            payload, task = pending.popleft()
+            yield payload, await task
+        else:
+            # Give running requests a chance to progress while we keep reading
+            await asyncio.sleep(0)
+    while pending:
+        payload, task = pending.popleft()
+        yield payload, await task
+    if progress.done:
+        progress.summary()
+
+
+async def aembed_texts(
+    texts: List[str],
+    embeddings: Any,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    checkpoint_dir: Optional[Path] = CHECKPOINT_DIR,
+    max_retries: int = MAX_RETRIES,
+) -> List[List[float]]:
+    """Embed ``texts`` in batches with at most ``concurrency`` requests in flight.
+
+    Vectors are returned in the same order as ``texts``. Each completed batch
+    is saved under ``checkpoint_dir`` keyed by a hash of the model and the
+    batch contents, so an interrupted run resumes where it stopped.
+    """
+    if not texts:
+        return []
+    model = embedding_model_name(embeddings)
+    checkpoint_dir = _prepare_checkpoint_dir(checkpoint_dir)
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    progress = ProgressReporter(len(texts))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    results = await asyncio.gather(*(
+        _embed_checkpointed(embeddings, model, batch, semaphore, checkpoint_dir, max_retries, progress)
+        for batch in batches
+    ))
+    progress.summary()
+    return [row.tolist() for block in results for row in block]
+
+
+def embed_texts(texts: List[str], embeddings: Any, **kwargs: Any) -> List[List[float]]:
+    """Synchronous wrapper around :func:`aembed_texts` for build scripts."""
+    return asyncio.run(aembed_texts(texts, embeddings, **kwargs))
+
+
+def clear_checkpoints(checkpoint_dir: Path = CHECKPOINT_DIR) -> None:
+    """Remove batch checkpoints once their vectors are safely in the index."""
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
@@ -1,30 +1,143 @@
-import os
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
-from langchain_core.documents import Document
+import hashlib
+import json
+import shutil
+import time
 from pathlib import Path
 
-VECTORSTORE_PATH = Path("embeddings/user_answers")
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from tools.clients import get_embeddings
+
+VECTORSTORE_ROOT = Path("embeddings")
+VECTORSTORE_PATH = VECTORSTORE_ROOT / "user_answers"
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Each session appends a small segment instead of rewriting the whole index.
+# Once this many segments pile up they are merged into the base FAISS index.
+COMPACT_EVERY = 8
+
+SEGMENTS_DIR = "segments"
+HASHES_FILE = "hashes.txt"
+
+
+def namespace_path(namespace: str) -> Path:
+    return VECTORSTORE_ROOT / namespace
+
+
+def answer_hash(text: str, metadata: dict) -> str:
+    """Content hash of an answer and its metadata, used to skip re-embedding."""
+    payload = json.dumps({"text": text, "metadata": metadata}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _load_seen_hashes(store_path: Path) -> set:
+    hashes_file = store_path / HASHES_FILE
+    if not hashes_file.exists():
+        return set()
+    return set(hashes_file.read_text(encoding="utf-8").split())
+
+
+def _segment_files(store_path: Path) -> list:
+    return sorted((store_path / SEGMENTS_DIR).glob("seg_*.npy"))
 
-def embed_texts_and_save(texts, metadatas, namespace="user_answers"):
-    """Embed a list of text chunks and save to a namespaced FAISS index."""
+
+def _write_segment(store_path: Path, ids, texts, metadatas, vectors) -> Path:
+    """Append one segment: vectors in ``.npy``, texts/metadata in ``.jsonl``."""
+    segments_dir = store_path / SEGMENTS_DIR
+    segments_dir.mkdir(parents=True, exist_ok=True)
+    stem = f"seg_{time.time_ns()}"
+    with open(segments_dir / f"{stem}.jsonl", "w", encoding="utf-8") as f:
+        for doc_id, txt, meta in zip(ids, texts, metadatas):
+            f.write(json.dumps({"id": doc_id, "text": txt, "metadata": meta}, ensure_ascii=False) + "\n")
+    # The vectors file is written last so a segment only counts once complete
+    tmp_path = segments_dir / f".tmp_{stem}.npy"
+    np.save(tmp_path, np.asarray(vectors, dtype=np.float32))
+    tmp_path.replace(segments_dir / f"{stem}.npy")
+    return segments_dir / f"{stem}.npy"
+
+
+def load_user_answers_store(namespace="user_answers", embeddings=None):
+    """Load the compacted base index of a namespace plus any pending segments."""
+    store_path = namespace_path(namespace)
+    embeddings = embeddings or get_embeddings(EMBEDDING_MODEL)
+    vectorstore = None
+    loaded_ids = set()
+    if (store_path / "index.faiss").exists():
+        vectorstore = FAISS.load_local(str(store_path), embeddings, allow_dangerous_deserialization=True)
+        loaded_ids.update(vectorstore.index_to_docstore_id.values())
+
+    for segment in _segment_files(store_path):
+        with open(segment.with_suffix(".jsonl"), "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        vectors = np.load(segment)
+        # A session interrupted before recording its hashes may have left a
+        # duplicate segment behind; keep the first copy of every answer.
+        pairs = [(r, vec) for r, vec in zip(records, vectors) if r["id"] not in loaded_ids]
+        if not pairs:
+            continue
+        text_embeddings = [(r["text"], vec.tolist()) for r, vec in pairs]
+        metadatas = [r["metadata"] for r, _ in pairs]
+        ids = [r["id"] for r, _ in pairs]
+        loaded_ids.update(ids)
+        if vectorstore is None:
+            vectorstore = FAISS.from_embeddings(text_embeddings, embeddings, metadatas=metadatas, ids=ids)
+        else:
+            vectorstore.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+    return vectorstore
+
+
+def compact_user_answers(namespace="user_answers", embeddings=None):
+    """Merge all pending segments into the base index and drop them."""
+    store_path = namespace_path(namespace)
+    segments = _segment_files(store_path)
+    if not segments:
+        return
+    vectorstore = load_user_answers_store(namespace, embeddings)
+    vectorstore.save_local(str(store_path))
+    shutil.rmtree(store_path / SEGMENTS_DIR, ignore_errors=True)
+    print(f"[🗜️] Compacted {len(segments)} segments into {store_path}")
+
+
+def embed_texts_and_save(texts, metadatas, namespace="user_answers", embeddings=None):
+    """Embed new text chunks and append them to a namespaced FAISS index.
+
+    Answers whose content hash was already embedded are skipped, and new
+    vectors are written as a small append-only segment, so per-session cost is
+    proportional to the new answers rather than the whole history. Segments
+    are merged into the base index every ``COMPACT_EVERY`` sessions.
+    """
     try:
         if not texts:
             print("[ℹ️] No texts to embed.")
             return
 
-        embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+        store_path = namespace_path(namespace)
+        seen = _load_seen_hashes(store_path)
+
+        new_ids, new_texts, new_metas = [], [], []
+        for txt, meta in zip(texts, metadatas):
+            digest = answer_hash(txt, meta)
+            if digest in seen or digest in new_ids:
+                continue
+            new_ids.append(digest)
+            new_texts.append(txt)
+            new_metas.append(meta)
+
+        skipped = len(texts) - len(new_texts)
+        if not new_texts:
+            print(f"[ℹ️] All {skipped} answers were already embedded.")
+            return
 
-        docs = [
-            Document(page_content=txt, metadata=meta)
-            for txt, meta in zip(texts, metadatas)
-        ]
+        embeddings = embeddings or get_embeddings(EMBEDDING_MODEL)
+        vectors = embeddings.embed_documents(new_texts)
+        _write_segment(store_path, new_ids, new_texts, new_metas, vectors)
+        with open(store_path / HASHES_FILE, "a", encoding="utf-8") as f:
+            f.write("".join(f"{digest}\n" for digest in new_ids))
 
-        vectorstore = FAISS.from_documents(docs, embedding=embeddings)
-        VECTORSTORE_PATH.mkdir(parents=True, exist_ok=True)
-        vectorstore.save_local(str(VECTORSTORE_PATH))
+        print(f"[✅] Embedded and saved {len(new_texts)} correct answers to {store_path} ({skipped} already embedded)")
 
-        print(f"[✅] Embedded and saved {len(texts)} correct answers to {VECTORSTORE_PATH}")
+        if len(_segment_files(store_path)) >= COMPACT_EVERY:
+            compact_user_answers(namespace, embeddings)
 
     except Exception as e:
         print(f"[❌] Embedding failed: {e}")
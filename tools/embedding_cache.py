@@ -0,0 +1,182 @@
+"""Content-addressed cache for query embeddings.
+
+Learn mode embeds the selected topic id and doc search embeds a templated
+``"documentation reference for ..."`` string. Both repeat constantly across
+sessions, and every repeat used to cost an embeddings API round trip. Vectors
+are cached under ``sha256(model, normalized text)`` in two tiers:
+
+- an in-memory LRU (per process), over
+- an SQLite table on disk (shared across sessions).
+
+:class:`CachedQueryEmbeddings` wraps any LangChain ``Embeddings`` object so that
+``embed_query`` goes through the cache while document embedding is passed
+straight through.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+QUERY_CACHE_PATH = Path("embeddings/query_cache.sqlite")
+DEFAULT_MEMORY_ITEMS = 1024
+
+
+def normalize_query(text: str) -> str:
+    """Normalise unicode and collapse whitespace so trivial variants share a key."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def embedding_model_name(embeddings: Any) -> str:
+    """Best-effort identifier for the model (and dimensions) behind a client."""
+    model = getattr(embeddings, "model", None) or type(embeddings).__name__
+    dimensions = getattr(embeddings, "dimensions", None)
+    return f"{model}:{dimensions}" if dimensions else str(model)
+
+
+class QueryEmbeddingCache:
+    """Two-tier (memory LRU + SQLite) cache of query vectors.
+
+    Parameters
+    ----------
+    path : Path or None
+        SQLite file for the persistent tier. ``None`` keeps the cache in memory
+        only.
+    max_memory_items : int
+        Capacity of the in-memory LRU tier.
+    """
+
+    def __init__(self, path: Optional[Path] = QUERY_CACHE_PATH, max_memory_items: int = DEFAULT_MEMORY_ITEMS):
+        self.path = Path(path) if path is not None else None
+        self.max_memory_items = max_memory_items
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{normalize_query(text)}".encode("utf-8")).hexdigest()
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Return the cached vector for ``(model, text)`` or ``None``."""
+        key = self.make_key(model, text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+            db = self._db()
+            if db is not None:
+                row = db.execute("SELECT vector FROM query_embeddings WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    vector = np.frombuffer(row[0], dtype=np.float32).tolist()
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                    return vector
+            self.misses += 1
+            return None
+
+    def put(self, model: str, text: str, vector: List[float]) -> List[float]:
+        """Store ``vector`` in both tiers and return it as cached (float32).
+
+        Vectors are rounded to float32 on the way in so a hit returns the same
+        values whichever tier serves it.
+        """
+        key = self.make_key(model, text)
+        packed = np.asarray(vector, dtype=np.float32)
+        stored = packed.tolist()
+        with self._lock:
+            self._remember(key, stored)
+            db = self._db()
+            if db is not None:
+                db.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (key, model, vector) VALUES (?, ?, ?)",
+                    (key, model, packed.tobytes()),
+                )
+                db.commit()
+        return stored
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for both tiers."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_items": len(self._memory),
+        }
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """``Embeddings`` wrapper that serves ``embed_query`` from a cache."""
+
+    def __init__(self, inner: Embeddings, cache: QueryEmbeddingCache, model: Optional[str] = None):
+        self.inner = inner
+        self.cache = cache
+        self.model = model or embedding_model_name(inner)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.inner.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.inner.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(self.model, text)
+        if vector is None:
+            vector = self.cache.put(self.model, text, self.inner.embed_query(normalize_query(text)))
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(self.model, text)
+        if vector is None:
+            vector = self.cache.put(self.model, text, await self.inner.aembed_query(normalize_query(text)))
+        return vector
+
+
+_query_cache: Optional[QueryEmbeddingCache] = None
+
+
+def get_query_cache() -> QueryEmbeddingCache:
+    """Return the process-wide query embedding cache."""
+    global _query_cache
+    if _query_cache is None:
+        _query_cache = QueryEmbeddingCache()
+    return _query_cache
+
+
+def query_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the shared cache used by the retrieval nodes."""
+    return get_query_cache().stats()
@@ -0,0 +1,189 @@
+"""Persistent cache of graded answers for the feedback node.
+
+``generate_feedback`` makes a GPT-4 call for every attempt. The same
+question is often answered the same way: short answers to the fallback
+questions, and retries after an error. This cache stores the grading result
+in SQLite, keyed by ``sha256`` of the model settings, the feedback prompt
+template, the question, the normalised answer and the documentation
+context. A repeat attempt then returns ``last_feedback``/``last_correct``
+without a network call.
+
+Entries expire after ``ttl_seconds``. The table is capped at ``max_entries``,
+evicting the least recently used rows. Each row records how long its LLM call
+took and how often it was reused, so :meth:`FeedbackCache.stats` reports the
+hit rate and the latency saved, both for this process and over the cache's
+lifetime. Run ``python -m tools.feedback_cache`` to print the stats.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+FEEDBACK_CACHE_PATH = Path("data/feedback_cache.sqlite")
+DEFAULT_TTL_SECONDS = int(os.getenv("TUTOR_FEEDBACK_CACHE_TTL", str(30 * 24 * 3600)))
+DEFAULT_MAX_ENTRIES = int(os.getenv("TUTOR_FEEDBACK_CACHE_MAX_ENTRIES", "10000"))
+
+
+# Identifiers and syntax whose case or punctuation matters when graded
+# (``MemorySaver``, ``add_edge``, ``graph.compile()``, ``a | b``)
+CODE_TOKEN_RE = re.compile(r"[a-z][A-Z]|[A-Z]{2}[a-z]|\w_\w|\w\.\w|[`()\[\]{}=|<>]")
+
+
+def normalize_answer(text: str) -> str:
+    """Normalise unicode and whitespace; case-fold and strip trailing punctuation from prose answers only.
+
+    Answers containing code tokens keep their case, so ``memorysaver`` is not
+    served the grade cached for ``MemorySaver``.
+    """
+    answer = " ".join(unicodedata.normalize("NFKC", text or "").split())
+    if CODE_TOKEN_RE.search(answer):
+        return answer
+    return answer.casefold().rstrip(" .!?")
+
+
+def feedback_key(settings: Dict[str, Any], question: str, answer: str, context: str) -> str:
+    """Key for one grading request; ``settings`` holds model name, temperature and prompt."""
+    payload = json.dumps(
+        {"settings": settings, "question": question.strip(), "answer": normalize_answer(answer), "context": context},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FeedbackCache:
+    """SQLite cache of ``(feedback, correct)`` results with TTL and LRU eviction.
+
+    Parameters
+    ----------
+    path : Path
+        SQLite file; use ``":memory:"`` for a throwaway cache.
+    ttl_seconds : int
+        Entries older than this are ignored and purged.
+    max_entries : int
+        Upper bound on stored rows; least recently used rows go first.
+    """
+
+    def __init__(
+        self,
+        path: Path = FEEDBACK_CACHE_PATH,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if str(self.path) != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS feedback ("
+                "key TEXT PRIMARY KEY, feedback TEXT NOT NULL, correct INTEGER NOT NULL, "
+                "latency REAL NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL, "
+                "hits INTEGER NOT NULL DEFAULT 0)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS feedback_last_used ON feedback (last_used)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Tuple[str, bool]]:
+        """Return the cached ``(feedback, correct)`` for ``key``, or ``None``."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT feedback, correct, latency FROM feedback WHERE key = ? AND created > ?",
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            db.execute("UPDATE feedback SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            db.commit()
+            self.hits += 1
+            self.saved_seconds += row[2]
+            return row[0], bool(row[1])
+
+    def put(self, key: str, feedback: str, correct: bool, latency: float) -> None:
+        """Store a result with the latency of the call that produced it, then evict."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO feedback (key, feedback, correct, latency, created, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (key, feedback, int(correct), latency, now, now),
+            )
+            db.execute("DELETE FROM feedback WHERE created <= ?", (now - self.ttl_seconds,))
+            db.execute(
+                "DELETE FROM feedback WHERE key IN ("
+                "SELECT key FROM feedback ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db().execute("DELETE FROM feedback")
+            self._db().commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Session and lifetime hit counts, hit rate and latency saved."""
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries, lifetime_hits, lifetime_saved = self._db().execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0), COALESCE(SUM(hits * latency), 0) FROM feedback"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_seconds": round(self.saved_seconds, 2),
+            "entries": entries,
+            "lifetime_hits": lifetime_hits,
+            "lifetime_saved_seconds": round(lifetime_saved, 2),
+        }
+
+
+_feedback_cache: Optional[FeedbackCache] = None
+
+
+def get_feedback_cache() -> FeedbackCache:
+    """Return the process-wide feedback cache."""
+    global _feedback_cache
+    if _feedback_cache is None:
+        _feedback_cache = FeedbackCache()
+    return _feedback_cache
+
+
+def feedback_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters and saved latency of the shared feedback cache."""
+    return get_feedback_cache().stats()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect the feedback cache.")
+    parser.add_argument("--clear", action="store_true", help="delete every cached result")
+    args = parser.parse_args()
+    if args.clear:
+        get_feedback_cache().clear()
+        print(f"[🧹] Cleared {FEEDBACK_CACHE_PATH}")
+    print(f"[📊] Feedback cache: {feedback_cache_stats()}")
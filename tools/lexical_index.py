@@ -0,0 +1,119 @@
+"""Prebuilt BM25 inverted index over the documentation chunks.
+
+Learn and doc-search queries are often exact API names (``StateGraph``,
+``add_conditional_edges``, ``similarity_search``). Embedding search tends to
+blur those, and it always costs a network round trip. This index is built by
+``tools/prep_docs.py`` next to the FAISS files. Postings are keyed by FAISS row
+number, so lexical hits can be fused with vector hits in either load mode.
+"""
+
+import json
+import math
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+LEXICAL_INDEX_FILE = "lexical_index.json"
+LEXICAL_INDEX_VERSION = 1
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_CAMEL_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+
+def is_api_name(token: str) -> bool:
+    """True for identifier-like tokens such as ``add_edge`` or ``StateGraph``."""
+    return "_" in token.strip("_") or (token[:1].isalpha() and any(c.isupper() for c in token[1:]) and any(c.islower() for c in token))
+
+
+def api_names(text: str) -> List[str]:
+    """Identifier-like tokens of ``text`` in their original case."""
+    return [word for word in _IDENTIFIER.findall(text) if is_api_name(word)]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased identifiers plus their snake_case/CamelCase parts.
+
+    ``add_conditional_edges`` yields itself and ``add``, ``conditional``,
+    ``edges``, so both exact API names and plain words match.
+    """
+    tokens = []
+    for word in _IDENTIFIER.findall(text):
+        lowered = word.lower()
+        tokens.append(lowered)
+        if is_api_name(word):
+            parts = [p.lower() for piece in word.split("_") for p in _CAMEL_PART.findall(piece)]
+            tokens.extend(p for p in parts if p != lowered)
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 over chunks identified by their FAISS row number."""
+
+    def __init__(self, postings: Dict[str, List[List[int]]], doc_len: List[int]):
+        self.postings = postings
+        self.doc_len = doc_len
+        self.num_docs = len(doc_len)
+        self.avgdl = (sum(doc_len) / self.num_docs) if self.num_docs else 0.0
+
+    @classmethod
+    def build(cls, texts: Iterable[str]) -> "BM25Index":
+        postings: Dict[str, List[List[int]]] = defaultdict(list)
+        doc_len = []
+        for row, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_len.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings[term].append([row, tf])
+        return cls(dict(postings), doc_len)
+
+    def save(self, directory: str) -> Path:
+        path = Path(directory) / LEXICAL_INDEX_FILE
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": LEXICAL_INDEX_VERSION, "doc_len": self.doc_len, "postings": self.postings}, f)
+        tmp_path.replace(path)
+        print(f"[🔤] Saved BM25 index ({len(self.postings)} terms, {self.num_docs} chunks) to {path}")
+        return path
+
+    @classmethod
+    def load(cls, directory: str) -> "BM25Index":
+        with open(Path(directory) / LEXICAL_INDEX_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != LEXICAL_INDEX_VERSION:
+            raise ValueError("Unsupported lexical index version; re-run tools/prep_docs.py")
+        return cls(data["postings"], data["doc_len"])
+
+    def document_frequency(self, term: str) -> int:
+        return len(self.postings.get(term.lower(), ()))
+
+    def idf(self, term: str) -> float:
+        df = self.document_frequency(term)
+        return math.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 4, mask: Optional[Sequence[bool]] = None) -> List[Tuple[int, float]]:
+        """Return up to ``k`` ``(row, score)`` pairs, best first.
+
+        With ``mask``, rows where it is false are skipped before scoring.
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for row, tf in postings:
+                if mask is not None and not mask[row]:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[row] / self.avgdl)
+                scores[row] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+def has_lexical_index(directory: str) -> bool:
+    return (Path(directory) / LEXICAL_INDEX_FILE).exists()
@@ -1,7 +1,28 @@
+"""Sync the LangChain and LangGraph docs into ``docs/``.
+
+Both repos are cloned (or fetched, if already cloned) concurrently. After the
+first full copy, each run diffs the last-synced commit against the fetched
+HEAD and only copies or deletes the files that changed, with file I/O spread
+over a thread pool. When several upstream files flatten to the same name,
+the same one of them is always written, once. The commit each repo was synced to is recorded in
+``uncleaned_docs/sync_state.json``; ``tools/prep_docs.py`` stores it in its
+manifest.
+
+Usage::
+
+    python tools/load_docs.py          # incremental sync
+    python tools/load_docs.py --full   # re-copy every file
+"""
+
+import argparse
+import json
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 import subprocess
+from typing import Dict, List, Optional, Tuple
 
 # ------------------------
 # Constants
@@ -19,6 +40,15 @@ LANGGRAPH_REPO_DIR = UNCLEANED_DIR / "langgraph_repo"
 
 ALLOWED_EXTENSIONS = [".md", ".txt", ".html"]
 
+SYNC_STATE_PATH = UNCLEANED_DIR / "sync_state.json"
+IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# label -> (remote, local clone, flattened docs dir)
+REPOS = {
+    "LangChain": (LANGCHAIN_REPO, LANGCHAIN_REPO_DIR, CLEANED_LANGCHAIN_DIR),
+    "LangGraph": (LANGGRAPH_REPO, LANGGRAPH_REPO_DIR, CLEANED_LANGGRAPH_DIR),
+}
+
 
 # ------------------------
 # Helpers
@@ -30,6 +60,17 @@ def run_command(command: str):
     except subprocess.CalledProcessError as e:
         print(f"[❌] Failed to run: {command}\n{e}")
 
+def git_output(repo_dir: Path, *args: str) -> Optional[str]:
+    """Run ``git -C repo_dir *args`` and return stdout, or ``None`` on failure."""
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(repo_dir), *args], check=True, capture_output=True, text=True
+        )
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"[❌] git {' '.join(args)} failed in {repo_dir}: {getattr(e, 'stderr', '') or e}")
+        return None
+    return result.stdout
+
 def safe_read_text(path: Path) -> str:
     try:
         return path.read_text(encoding="utf-8")
@@ -48,43 +89,172 @@ def flatten_path(path: Path) -> str:
     parts = path.relative_to(path.parents[2]).with_suffix('').parts
     return "_".join(parts) + path.suffix
 
+def is_relevant(path: Path) -> bool:
+    return path.suffix.lower() in ALLOWED_EXTENSIONS
+
+def copy_file(file_path: Path, dest_dir: Path) -> bool:
+    """Copy one file to its flattened name; skip writes that change nothing."""
+    dest_path = dest_dir / flatten_path(file_path)
+    content = safe_read_text(file_path)
+    if not content:
+        return False
+    if dest_path.exists() and safe_read_text(dest_path) == content:
+        return False
+    safe_write_text(dest_path, content)
+    return True
+
+def delete_file(file_path: Path, dest_dir: Path) -> bool:
+    dest_path = dest_dir / flatten_path(file_path)
+    if not dest_path.exists():
+        return False
+    dest_path.unlink()
+    return True
+
+def _parallel_count(fn, paths: List[Path], dest_dir: Path) -> int:
+    with ThreadPoolExecutor(max_workers=IO_WORKERS) as pool:
+        return sum(pool.map(lambda p: fn(p, dest_dir), paths))
+
+def relevant_files(src_dir: Path) -> List[Path]:
+    return [p for p in src_dir.rglob("*") if is_relevant(p) and p.is_file() and ".git" not in p.parts]
+
+def destination_sources(paths: List[Path], label: str) -> Dict[str, Path]:
+    """Flattened name → the one source written to it.
+
+    ``flatten_path`` keeps only the last directory levels, so different files
+    can share a name (``libs/a/docs/how_to/x.md`` and ``libs/b/docs/how_to/x.md``). The
+    first path in sorted order wins, so every run picks the same file.
+    """
+    groups: Dict[str, List[Path]] = {}
+    for path in paths:
+        groups.setdefault(flatten_path(path), []).append(path)
+    collisions = {name: sorted(group) for name, group in groups.items() if len(group) > 1}
+    if collisions:
+        examples = "; ".join(
+            f"{name} ← {', '.join(str(p) for p in group)}" for name, group in sorted(collisions.items())[:3]
+        )
+        print(f"[⚠️] {label}: {len(collisions)} flattened names have several sources; keeping the first of each ({examples})")
+    return {name: min(group) for name, group in groups.items()}
+
 def copy_relevant_files(src_dir: Path, dest_dir: Path, label: str):
     print(f"[↪] Copying files from {label} repo...")
-    count = 0
-    for file_path in src_dir.rglob("*"):
-        if file_path.suffix.lower() in ALLOWED_EXTENSIONS:
-            flat_name = flatten_path(file_path)
-            dest_path = dest_dir / flat_name
-            content = safe_read_text(file_path)
-            if content:
-                safe_write_text(dest_path, content)
-                count += 1
-    print(f"[✅] {count} files copied to {dest_dir}")
+    paths = relevant_files(src_dir)
+    sources = destination_sources(paths, label)
+    # One write per destination, so colliding sources never race
+    count = _parallel_count(copy_file, sorted(sources.values()), dest_dir)
+    print(f"[✅] {count} of {len(paths)} files written to {dest_dir}")
+
+def changed_files(repo_dir: Path, old_commit: str, new_commit: str) -> Optional[Tuple[List[Path], List[Path]]]:
+    """Relevant ``(changed, deleted)`` paths between two commits, or ``None``.
+
+    Renames are reported as a delete plus an add. Returns ``None`` when the
+    diff cannot be computed (e.g. the old commit is no longer available).
+    """
+    output = git_output(repo_dir, "diff", "--name-status", "--no-renames", "-z", old_commit, new_commit)
+    if output is None:
+        return None
+    fields = output.split("\0")
+    changed, deleted = [], []
+    for status, name in zip(fields[0::2], fields[1::2]):
+        path = repo_dir / name
+        if not is_relevant(path):
+            continue
+        (deleted if status.startswith("D") else changed).append(path)
+    return changed, deleted
+
+def sync_relevant_files(src_dir: Path, dest_dir: Path, label: str, old_commit: Optional[str], new_commit: str) -> Dict:
+    """Copy/delete only what changed since ``old_commit``; full copy otherwise."""
+    if old_commit == new_commit:
+        print(f"[ℹ️] {label} docs already at {new_commit[:12]}. Nothing to copy.")
+        return {"mode": "incremental", "written": 0, "deleted": 0}
+    diff = changed_files(src_dir, old_commit, new_commit) if old_commit else None
+    if diff is None:
+        copy_relevant_files(src_dir, dest_dir, label)
+        return {"mode": "full"}
+    changed, deleted = diff
+    # Resolve each touched destination against every live source, so a change
+    # to a shadowed file or the deletion of one of two sources keeps the winner
+    sources = destination_sources(relevant_files(src_dir), label)
+    writes: Dict[str, Path] = {}
+    deletes: Dict[str, Path] = {}
+    for path in changed + deleted:
+        name = flatten_path(path)
+        if name in sources:
+            writes[name] = sources[name]
+        else:
+            deletes[name] = path
+    written = _parallel_count(copy_file, sorted(writes.values()), dest_dir)
+    removed = _parallel_count(delete_file, sorted(deletes.values()), dest_dir)
+    print(f"[✅] {label}: {written} files written, {removed} deleted ({old_commit[:12]} → {new_commit[:12]})")
+    return {"mode": "incremental", "written": written, "deleted": removed}
+
+def load_sync_state() -> Dict:
+    if not SYNC_STATE_PATH.exists():
+        return {}
+    try:
+        with open(SYNC_STATE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"[⚠️] Could not read {SYNC_STATE_PATH}: {e}. Doing a full sync.")
+        return {}
+
+def save_sync_state(state: Dict):
+    SYNC_STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = SYNC_STATE_PATH.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    tmp_path.replace(SYNC_STATE_PATH)
+
+def update_repo(repo_url: str, repo_dir: Path, label: str) -> Optional[str]:
+    """Clone ``repo_dir`` or move it to the remote HEAD; return the HEAD commit."""
+    if repo_dir.exists():
+        print(f"[🔄] Fetching {label}...")
+        if git_output(repo_dir, "fetch", "--depth=1", "origin", "HEAD") is not None:
+            git_output(repo_dir, "reset", "--hard", "FETCH_HEAD")
+    else:
+        print(f"[🔄] Cloning {label}...")
+        run_command(f"git clone --depth=1 {repo_url} {repo_dir}")
+    head = git_output(repo_dir, "rev-parse", "HEAD")
+    return head.strip() if head else None
 
 
 # ------------------------
 # Main Pipeline
 # ------------------------
 
-def clone_and_extract_docs():
-    UNCLEANED_DIR.mkdir(exist_ok=True)
-    CLEANED_LANGCHAIN_DIR.mkdir(parents=True, exist_ok=True)
-    CLEANED_LANGGRAPH_DIR.mkdir(parents=True, exist_ok=True)
+def clone_and_extract_docs(full: bool = False, repos: Dict = None) -> Dict:
+    """Fetch every repo concurrently, then sync its docs; return the new state.
 
-    if LANGCHAIN_REPO_DIR.exists():
-        print("[ℹ️] LangChain repo already cloned. Skipping.")
-    else:
-        print("[🔄] Cloning LangChain...")
-        run_command(f"git clone --depth=1 {LANGCHAIN_REPO} {LANGCHAIN_REPO_DIR}")
+    ``full`` ignores the recorded commits and re-copies every file.
+    """
+    repos = repos or REPOS
+    UNCLEANED_DIR.mkdir(exist_ok=True)
+    for _, _, dest_dir in repos.values():
+        dest_dir.mkdir(parents=True, exist_ok=True)
 
-    if LANGGRAPH_REPO_DIR.exists():
-        print("[ℹ️] LangGraph repo already cloned. Skipping.")
-    else:
-        print("[🔄] Cloning LangGraph...")
-        run_command(f"git clone --depth=1 {LANGGRAPH_REPO} {LANGGRAPH_REPO_DIR}")
+    with ThreadPoolExecutor(max_workers=len(repos)) as pool:
+        futures = {
+            label: pool.submit(update_repo, url, repo_dir, label)
+            for label, (url, repo_dir, _) in repos.items()
+        }
+        heads = {label: future.result() for label, future in futures.items()}
 
-    copy_relevant_files(LANGCHAIN_REPO_DIR, CLEANED_LANGCHAIN_DIR, "LangChain")
-    copy_relevant_files(LANGGRAPH_REPO_DIR, CLEANED_LANGGRAPH_DIR, "LangGraph")
+    state = load_sync_state()
+    for label, (url, repo_dir, dest_dir) in repos.items():
+        head = heads[label]
+        if head is None:
+            print(f"[⚠️] Could not resolve {label} HEAD; keeping its previous docs.")
+            continue
+        previous = None if full else state.get(label, {}).get("commit")
+        result = sync_relevant_files(repo_dir, dest_dir, label, previous, head)
+        state[label] = {
+            "repo": url,
+            "commit": head,
+            "synced_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            **result,
+        }
+        # Saved per repo so an interrupted run keeps the progress made
+        save_sync_state(state)
+    return state
 
 
 # ------------------------
@@ -92,4 +262,7 @@ def clone_and_extract_docs():
 # ------------------------
 
 if __name__ == "__main__":
-    clone_and_extract_docs()
+    parser = argparse.ArgumentParser(description="Sync LangChain/LangGraph docs into docs/.")
+    parser.add_argument("--full", action="store_true", help="re-copy every file instead of diffing commits")
+    args = parser.parse_args()
+    clone_and_extract_docs(full=args.full)
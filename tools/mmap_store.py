@@ -0,0 +1,156 @@
+"""Pickle-free loading of the documentation vector store.
+
+``FAISS.load_local`` reads ``index.faiss`` fully into RAM and unpickles the
+whole ``InMemoryDocstore`` before the first query can run. The index builder
+instead writes the chunks once, to the row-aligned chunk store in
+``<index>/chunks`` (see :mod:`tools.chunk_store`), and this module loads the
+store back from it:
+
+- :func:`load_mmap_store` memory-maps the FAISS vectors
+  (``IO_FLAG_MMAP_IFC``) so several worker processes share one page-cached
+  copy, and uses a :class:`LazyDocstore` that decodes a chunk only when a
+  search hits it. Start-up cost does not grow with the size of the corpus.
+- :func:`load_in_memory_store` reads the vectors and every chunk into a
+  regular, mutable ``InMemoryDocstore`` keyed by chunk id. The index builder
+  uses it to update an existing index in place and :func:`save_store` to
+  write it back.
+"""
+
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Iterator, List
+
+from langchain_core.documents import Document
+from langchain_community.docstore.base import Docstore
+
+from tools.ann_index import FLAT_INDEX_FILE, read_search_index
+from tools.chunk_store import CHUNKS_DIR, META_FILE, ChunkStore, has_chunk_store, write_chunk_store
+
+
+# Relative to the index directory; rewritten whenever the chunk store is.
+MMAP_FILES = (f"{CHUNKS_DIR}/{META_FILE}",)
+
+# Written by older builds; superseded by the chunk store and removed on save.
+LEGACY_FILES = ("index.pkl", "docstore.jsonl", "docstore_offsets.npy")
+
+
+class RowIdMap(Mapping):
+    """``index_to_docstore_id`` replacement mapping FAISS row ``i`` to ``"i"``.
+
+    Avoids materialising a dict with one entry per vector.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+
+    def __getitem__(self, row: int) -> str:
+        if not 0 <= row < self._size:
+            raise KeyError(row)
+        return str(row)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self._size))
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class LazyDocstore(Docstore):
+    """Read-only docstore that decodes chunks on demand from the chunk store.
+
+    Document ids are FAISS row numbers as strings. The chunk id is preserved
+    on ``Document.id``.
+    """
+
+    def __init__(self, chunks: ChunkStore):
+        self.chunks = chunks
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def search(self, search: str) -> Document:
+        try:
+            row = int(search)
+        except ValueError:
+            return f"ID {search} not found."
+        if not 0 <= row < len(self):
+            return f"ID {search} not found."
+        return self.chunks.document(row)
+
+    def delete(self, ids: List) -> None:
+        raise NotImplementedError("LazyDocstore is read-only; rebuild the index instead.")
+
+
+def has_mmap_docstore(path: Path) -> bool:
+    """Return ``True`` if the index at ``path`` has a chunk store."""
+    return has_chunk_store(Path(path) / CHUNKS_DIR)
+
+
+def _open_chunks(path: Path, index: Any) -> ChunkStore:
+    chunks = ChunkStore(Path(path) / CHUNKS_DIR)
+    if len(chunks) != index.ntotal:
+        raise ValueError(
+            f"Chunk store at {path} has {len(chunks)} chunks but the index has "
+            f"{index.ntotal} vectors; re-run tools/prep_docs.py"
+        )
+    return chunks
+
+
+def load_mmap_store(path: Path, embeddings: Any) -> Any:
+    """Load a FAISS store with mapped vectors and a lazy, pickle-free docstore.
+
+    The search index is whichever variant ``index_meta.json`` selects (see
+    ``tools/ann_index.py``).
+    """
+    from langchain_community.vectorstores import FAISS
+
+    index, _ = read_search_index(path, mmap=True)
+    chunks = _open_chunks(path, index)
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=LazyDocstore(chunks),
+        index_to_docstore_id=RowIdMap(int(index.ntotal)),
+    )
+
+
+def load_in_memory_store(path: Path, embeddings: Any, ann: bool = False) -> Any:
+    """Load a fully in-memory FAISS store from the chunk store.
+
+    By default the exact, mutable flat index is loaded (the index builder
+    updates it in place). With ``ann=True`` the configured search index is
+    loaded instead, for serving queries.
+    """
+    import faiss
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+
+    if ann:
+        index, _ = read_search_index(path)
+    else:
+        index = faiss.read_index(str(Path(path) / FLAT_INDEX_FILE))
+    chunks = _open_chunks(path, index)
+    docs = {}
+    index_to_docstore_id = {}
+    for row, doc in enumerate(chunks.iter_documents()):
+        docs[doc.id] = doc
+        index_to_docstore_id[row] = doc.id
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=InMemoryDocstore(docs),
+        index_to_docstore_id=index_to_docstore_id,
+    )
+
+
+def save_store(vectorstore: Any, path: Path) -> None:
+    """Write the vectors and a row-aligned chunk store; drop legacy copies."""
+    import faiss
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    row_ids = (vectorstore.index_to_docstore_id[row] for row in range(int(vectorstore.index.ntotal)))
+    write_chunk_store(((doc_id, vectorstore.docstore.search(doc_id)) for doc_id in row_ids), path / CHUNKS_DIR)
+    faiss.write_index(vectorstore.index, str(path / FLAT_INDEX_FILE))
+    for name in LEGACY_FILES:
+        (path / name).unlink(missing_ok=True)
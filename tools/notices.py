@@ -0,0 +1,39 @@
+"""Console notices that background work can hold back.
+
+The CLI prepares the next session in a background task while the learner
+types (``agents/prefetch.py``). Anything that task prints would land in the
+middle of the ``Your Answer:`` prompt. Code on that path reports through
+:func:`notice`. Inside :func:`deferred_notices` the messages are collected
+instead of printed, and the caller decides whether to show them later.
+
+The buffer lives in a ``ContextVar``. Each asyncio task and each
+``asyncio.to_thread`` call gets its own copy of the context, so deferring
+in the prefetch task leaves the foreground session's output alone.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+
+_deferred: ContextVar[Optional[List[str]]] = ContextVar("deferred_notices", default=None)
+
+
+def notice(message: str) -> None:
+    """Print ``message``, or hold it back inside :func:`deferred_notices`."""
+    buffer = _deferred.get()
+    if buffer is None:
+        print(message)
+    else:
+        buffer.append(message)
+
+
+@contextmanager
+def deferred_notices() -> Iterator[List[str]]:
+    """Collect :func:`notice` messages from this context into the yielded list."""
+    buffer: List[str] = []
+    token = _deferred.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _deferred.reset(token)
@@ -0,0 +1,168 @@
+"""Category partitions of the documentation index.
+
+Every chunk used to be scored for every query, even when the learner is
+studying a LangGraph topic and LangChain chunks can never be the answer. The
+index builder now tags each chunk with its ``category`` (``LangChain`` or
+``LangGraph``, from the ``docs/langchain`` / ``docs/langgraph`` path it was
+read from) and the ``topic_ids`` whose keywords it mentions. It then writes
+the rows of each category to ``<index>/partitions/<category>.npy``.
+
+A partition is not a separate index. Searches run on the main search index,
+whatever ANN structure and vector storage it was built with (see
+``tools/ann_index.py``), with a ``faiss.IDSelectorBitmap`` over the
+partition's rows passed through the search parameters. Rows are rows of the
+full index, so results map straight back to the chunk store and the BM25
+index. A chunk folded from several files (see ``tools/dedup.py``) belongs to
+the partition of every category it appears in. ``tools.retrieval.search_docs``
+searches only the partition of the target topic's category and restricts
+BM25 scoring to the same rows.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+PARTITIONS_DIR = "partitions"
+PARTITIONS_FILE = "partitions.json"
+PARTITIONS_VERSION = 2
+
+# docs/<directory> → category, matching the ``category`` of extracted topics
+CATEGORY_DIRS = {"langchain": "LangChain", "langgraph": "LangGraph"}
+
+
+def partition_key(category: str) -> str:
+    return category.lower()
+
+
+def chunk_category(source: str) -> Optional[str]:
+    """Category of a chunk read from ``source``, or ``None`` if uncategorised."""
+    for part in Path(source).parts:
+        category = CATEGORY_DIRS.get(part.lower())
+        if category:
+            return category
+    return None
+
+
+def chunk_categories(metadata: Dict[str, Any]) -> List[str]:
+    sources = metadata.get("sources") or [metadata.get("source", "")]
+    return sorted({c for c in map(chunk_category, sources) if c})
+
+
+def topic_category(topic_id: Optional[str], topics: Sequence[Dict[str, Any]] = ()) -> Optional[str]:
+    """Category of a topic id, from the topic list or its ``<category>.`` prefix."""
+    if not topic_id:
+        return None
+    for topic in topics:
+        if topic.get("id") == topic_id:
+            return topic.get("category")
+    return CATEGORY_DIRS.get(topic_id.split(".", 1)[0].lower())
+
+
+def assign_topics(text: str, category: Optional[str], topics: Sequence[Dict[str, Any]]) -> List[str]:
+    """Ids of the topics in ``category`` whose keywords appear in ``text``."""
+    content = text.lower()
+    return [
+        topic["id"]
+        for topic in topics
+        if topic.get("category") == category
+        and any(keyword.lower() in content for keyword in topic.get("keywords", []))
+    ]
+
+
+def tag_chunks(docs: Iterable[Any], topics: Sequence[Dict[str, Any]]) -> None:
+    """Set ``category`` and ``topic_ids`` on each document's metadata in place."""
+    for doc in docs:
+        category = chunk_category(doc.metadata.get("source", ""))
+        for key, value in (("category", category), ("topic_ids", assign_topics(doc.page_content, category, topics))):
+            if value:
+                doc.metadata[key] = value
+            else:
+                doc.metadata.pop(key, None)
+
+
+def build_partitions(num_rows: int, metadatas: Sequence[Dict[str, Any]], path: Path) -> Dict[str, Any]:
+    """Write the rows of each category; ``metadatas`` is in row order.
+
+    Returns the metadata written to ``partitions.json``.
+    """
+    path = Path(path)
+    rows_by_category: Dict[str, List[int]] = {}
+    for row, metadata in enumerate(metadatas):
+        for category in chunk_categories(metadata):
+            rows_by_category.setdefault(category, []).append(row)
+
+    part_dir = path / PARTITIONS_DIR
+    part_dir.mkdir(parents=True, exist_ok=True)
+    meta = {"version": PARTITIONS_VERSION, "ntotal": int(num_rows), "partitions": {}}
+    for category, rows in sorted(rows_by_category.items()):
+        key = partition_key(category)
+        file_name = f"{PARTITIONS_DIR}/{key}.npy"
+        tmp_path = path / f"{PARTITIONS_DIR}/.tmp_{key}.npy"
+        np.save(tmp_path, np.asarray(rows, dtype=np.int64))
+        tmp_path.replace(path / file_name)
+        meta["partitions"][key] = {"category": category, "rows": len(rows), "file": file_name}
+
+    # Also removes the per-category sub-indexes older builds wrote
+    for stale in part_dir.glob("*.*"):
+        if stale.suffix != ".npy" or stale.stem not in meta["partitions"]:
+            stale.unlink()
+    tmp_meta = path / f"{PARTITIONS_FILE}.tmp"
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    tmp_meta.replace(path / PARTITIONS_FILE)
+    sizes = ", ".join(f"{p['category']} {p['rows']}" for p in meta["partitions"].values()) or "none"
+    print(f"[🗂️] Built category partitions over {num_rows} chunks: {sizes}")
+    return meta
+
+
+class Partition:
+    """The rows of one category, as a mask and as a FAISS ID selector."""
+
+    def __init__(self, category: str, rows: np.ndarray, num_rows: int):
+        import faiss
+
+        self.category = category
+        self.mask = np.zeros(num_rows, dtype=bool)
+        self.mask[rows] = True
+        self.num_selected = int(self.mask.sum())
+        # IDSelectorBitmap reads bit (row & 7) of byte (row >> 3); it does not
+        # copy the bitmap, so the packed array lives as long as the partition
+        self._bitmap = np.packbits(self.mask, bitorder="little")
+        self.selector = faiss.IDSelectorBitmap(num_rows, faiss.swig_ptr(self._bitmap))
+
+    def __len__(self) -> int:
+        return self.num_selected
+
+    def __contains__(self, row: int) -> bool:
+        return 0 <= row < len(self.mask) and bool(self.mask[row])
+
+
+def load_partitions(path: Path, ntotal: int) -> Dict[str, Partition]:
+    """Load every partition of the index at ``path``, keyed by partition key.
+
+    Returns an empty dict when there are none or they do not match an index
+    of ``ntotal`` rows (searches then use the full index).
+    """
+    path = Path(path)
+    try:
+        with open(path / PARTITIONS_FILE, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"[⚠️] Ignoring partitions at {path}: {e}")
+        return {}
+    if meta.get("version") != PARTITIONS_VERSION or meta.get("ntotal") != ntotal:
+        print(f"[⚠️] Partitions at {path} are out of date; searching the full index.")
+        return {}
+    try:
+        return {
+            key: Partition(entry["category"], np.load(path / entry["file"]), ntotal)
+            for key, entry in meta["partitions"].items()
+        }
+    except (OSError, ValueError, IndexError) as e:
+        print(f"[⚠️] Ignoring partitions at {path}: {e}")
+        return {}
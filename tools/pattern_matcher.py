@@ -0,0 +1,121 @@
+"""Single-pass multi-pattern matching for keyword-based topic extraction.
+
+:class:`PatternMatcher` compiles a pattern table into an Aho-Corasick
+automaton, flattened into a byte-level DFA (``delta[state, byte]``). Each
+state carries a bitmask of the labels of every pattern that ends there,
+following failure links. A text is scanned once, whatever the number of
+patterns. Overlapping and nested patterns such as ``state`` inside
+``stategraph`` are all reported.
+
+The DFA is stepped with numpy over a batch of texts at a time: step ``j``
+advances every text in the batch by its ``j``-th byte. Matching is
+case-insensitive; texts and patterns are lower-cased and UTF-8 encoded.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+import numpy as np
+
+
+DEFAULT_BATCH_SIZE = 2048
+
+
+class PatternMatcher:
+    """Aho-Corasick automaton mapping patterns to integer labels.
+
+    Parameters
+    ----------
+    patterns : iterable of (str, int)
+        ``(pattern, label)`` pairs. Several patterns may share a label, and a
+        pattern may carry several labels; a text matches a label when any of
+        its patterns occurs in it.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, int]]):
+        patterns = list(patterns)
+        if not patterns:
+            raise ValueError("PatternMatcher needs at least one pattern")
+        self.num_labels = max(label for _, label in patterns) + 1
+        self._words = (self.num_labels + 63) // 64
+
+        goto: List[Dict[int, int]] = [{}]
+        out: List[Set[int]] = [set()]
+        for pattern, label in patterns:
+            state = 0
+            for byte in pattern.lower().encode("utf-8"):
+                if byte not in goto[state]:
+                    goto.append({})
+                    out.append(set())
+                    goto[state][byte] = len(goto) - 1
+                state = goto[state][byte]
+            out[state].add(label)
+
+        # Breadth-first over the trie: fill in failure transitions so every
+        # (state, byte) pair has a direct successor.
+        delta = np.zeros((len(goto), 256), dtype=np.int32)
+        fail = [0] * len(goto)
+        queue = deque()
+        for byte, child in goto[0].items():
+            delta[0, byte] = child
+            queue.append(child)
+        while queue:
+            state = queue.popleft()
+            out[state] |= out[fail[state]]
+            delta[state] = delta[fail[state]]
+            for byte, child in goto[state].items():
+                fail[child] = delta[fail[state], byte]
+                delta[state, byte] = child
+                queue.append(child)
+
+        self._delta = delta
+        self._out = np.zeros((len(goto), self._words), dtype=np.uint64)
+        for state, labels in enumerate(out):
+            for label in labels:
+                self._out[state, label // 64] |= np.uint64(1) << np.uint64(label % 64)
+
+    @property
+    def num_states(self) -> int:
+        return len(self._delta)
+
+    def _scan(self, encoded: Sequence[bytes]) -> np.ndarray:
+        """Label bitmasks, shape ``(len(encoded), words)``, for one batch."""
+        width = max((len(b) for b in encoded), default=0)
+        # Column j holds byte j of every text; padding bytes (0) never match
+        data = np.zeros((width, len(encoded)), dtype=np.uint8)
+        for i, raw in enumerate(encoded):
+            data[:len(raw), i] = np.frombuffer(raw, dtype=np.uint8)
+        state = np.zeros(len(encoded), dtype=np.int32)
+        found = np.zeros((len(encoded), self._words), dtype=np.uint64)
+        for column in data:
+            state = self._delta[state, column]
+            found |= self._out[state]
+        return found
+
+    def label_bits(self, texts: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE) -> np.ndarray:
+        """Bitmask of matched labels per text, shape ``(n, ceil(labels / 64))``.
+
+        Texts are scanned in batches of similar length to keep padding low;
+        rows come back in input order.
+        """
+        encoded = [text.lower().encode("utf-8") for text in texts]
+        found = np.zeros((len(encoded), self._words), dtype=np.uint64)
+        order = sorted(range(len(encoded)), key=lambda i: len(encoded[i]))
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            found[rows] = self._scan([encoded[i] for i in rows])
+        return found
+
+    def labels(self, text: str) -> Set[int]:
+        """Labels of every pattern occurring in ``text``."""
+        return {int(label) for label in np.flatnonzero(unpack_bits(self.label_bits([text]), self.num_labels)[0])}
+
+    def count(self, texts: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE) -> np.ndarray:
+        """Number of texts in which each label occurs, shape ``(labels,)``."""
+        return unpack_bits(self.label_bits(texts, batch_size), self.num_labels).sum(axis=0)
+
+
+def unpack_bits(bits: np.ndarray, num_labels: int) -> np.ndarray:
+    """Expand ``(n, words)`` uint64 bitmasks into an ``(n, num_labels)`` bool array."""
+    as_bytes = bits.astype("<u8").view(np.uint8).reshape(len(bits), -1)
+    return np.unpackbits(as_bytes, axis=1, bitorder="little")[:, :num_labels].astype(bool)
@@ -1,38 +1,390 @@
 # tools/prep_docs.py
 
-import pickle
+import argparse
+import asyncio
+import hashlib
+import json
+import os
 from pathlib import Path
-from langchain_openai import OpenAIEmbeddings
+from tools.clients import get_embeddings
 from langchain_community.vectorstores import FAISS
-from tools.doc_loader import load_docs_from_directory, split_documents
+from tools.ann_index import INDEX_KINDS, STORAGE_CODES, AnnConfig, build_ann_index
+from tools.dedup import DEDUP_THRESHOLD, NearDuplicateIndex
+from tools.doc_loader import iter_split_files, list_doc_files
+from tools.embed_pipeline import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_MAX_IN_FLIGHT,
+    aembed_batches,
+    aiter_in_thread,
+    clear_checkpoints,
+)
+from tools.embedding_cache import embedding_model_name
+from tools.lexical_index import BM25Index
+from tools.load_docs import load_sync_state
+from tools.partitions import build_partitions, tag_chunks
+from tools.topic_cache import build_topic_cache, load_topics
+from tools.mmap_store import has_mmap_docstore, load_in_memory_store, save_store
 from dotenv import load_dotenv
 
 load_dotenv(override=True)
 
 
 DOCS_DIR = "docs"
-RAW_CHUNKS_PATH = "data/raw_docs.pkl"
 VECTORSTORE_PATH = "embeddings/vector_store"
+MANIFEST_PATH = Path(VECTORSTORE_PATH) / "manifest.json"
+MANIFEST_VERSION = 1
 
-def prepare_and_index_docs():
-    print("[📚] Loading and splitting docs...")
-    docs = load_docs_from_directory(DOCS_DIR)
-    chunks = split_documents(docs)
 
-    print(f"[💾] Saving {len(chunks)} chunks to {RAW_CHUNKS_PATH}")
-    Path(RAW_CHUNKS_PATH).parent.mkdir(parents=True, exist_ok=True)
-    with open(RAW_CHUNKS_PATH, "wb") as f:
-        pickle.dump(chunks, f)
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
 
-    print("[🧠] Embedding and indexing chunks...")
-    embeddings = OpenAIEmbeddings()
-    vectorstore = FAISS.from_documents(chunks, embeddings)
 
-    Path(VECTORSTORE_PATH).mkdir(parents=True, exist_ok=True)
-    vectorstore.save_local(VECTORSTORE_PATH)
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
+
+def chunk_id(source: str, text: str) -> str:
+    """Content-addressed id for a chunk; also used as its docstore id."""
+    return hashlib.sha256(f"{source}\0{text}".encode("utf-8")).hexdigest()
+
+
+def load_manifest(embedding_model: str) -> dict:
+    """Return the previous build's manifest, or an empty one if unusable.
+
+    The manifest records, per source file, its content hash and chunk ids, and
+    per chunk id, the hash of the chunk text. A manifest written for another
+    embedding model is discarded so everything is re-embedded.
+    """
+    empty = {"version": MANIFEST_VERSION, "embedding_model": embedding_model, "files": {}, "chunks": {}}
+    if not MANIFEST_PATH.exists() or not (Path(VECTORSTORE_PATH) / "index.faiss").exists():
+        return empty
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"[⚠️] Could not read {MANIFEST_PATH}: {e}. Rebuilding from scratch.")
+        return empty
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("embedding_model") != embedding_model:
+        print("[ℹ️] Index was built with different settings. Rebuilding from scratch.")
+        return empty
+    return manifest
+
+
+def save_manifest(manifest: dict) -> None:
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = MANIFEST_PATH.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    tmp_path.replace(MANIFEST_PATH)
+
+
+def load_index(embeddings):
+    """Load the previous build as a mutable store, from its chunk store if present."""
+    if has_mmap_docstore(VECTORSTORE_PATH):
+        return load_in_memory_store(VECTORSTORE_PATH, embeddings)
+    return FAISS.load_local(VECTORSTORE_PATH, embeddings, allow_dangerous_deserialization=True)
+
+
+def _iter_new_chunks(manifest: dict, files: dict, counters: dict, workers: int = 1):
+    """Yield ``(chunk_id, chunk)`` for new or changed files, one file at a time.
+
+    Unchanged files are recorded in ``files`` straight from the manifest and
+    never re-read or re-split. Changed files are split across ``workers``
+    processes (see ``tools/doc_loader.iter_split_files``).
+    """
+    changed = []
+    for path in list_doc_files(DOCS_DIR):
+        source = str(path)
+        digest = file_hash(path)
+        previous = manifest["files"].get(source)
+        if previous and previous["hash"] == digest:
+            files[source] = previous
+            counters["unchanged_files"] += 1
+        else:
+            changed.append((path, digest))
+
+    digests = dict(changed)
+    for path, file_chunks in iter_split_files([p for p, _ in changed], workers=workers):
+        source = str(path)
+        ids, seen = [], set()
+        for chunk in file_chunks:
+            cid = chunk_id(source, chunk.page_content)
+            if cid in seen:
+                continue
+            seen.add(cid)
+            ids.append(cid)
+            yield cid, chunk
+        files[source] = {"hash": digests[path], "chunks": ids}
+        counters["changed_files"] += 1
+
+
+async def _aiter_batches(
+    new_chunks,
+    old_ids: set,
+    reuse_vector,
+    batch_size: int,
+    counters: dict,
+    aliases: dict = None,
+    near_dups: NearDuplicateIndex = None,
+):
+    """Group chunks that are not yet indexed into embedding batches.
+
+    Each batch is ``(payload, texts_to_embed)`` where ``payload`` lists
+    ``(chunk_id, chunk, reused_vector_or_None)``. With ``near_dups``, a chunk
+    that nearly duplicates an indexed one is recorded in ``aliases`` (chunk id
+    → canonical chunk id) instead of being batched. ``new_chunks`` is an
+    async iterator, so batches are formed while earlier ones are embedded.
+    """
+    aliases = {} if aliases is None else aliases
+    batch = []
+    async for cid, chunk in new_chunks:
+        if cid in old_ids or cid in aliases:
+            continue
+        if near_dups is not None:
+            canonical, signature = near_dups.match(chunk.page_content)
+            if canonical is not None:
+                aliases[cid] = canonical
+                counters["deduplicated"] += 1
+                continue
+            near_dups.add(cid, signature=signature)
+        vector = reuse_vector(chunk.page_content)
+        counters["reused" if vector is not None else "embedded"] += 1
+        batch.append((cid, chunk, vector))
+        if len(batch) == batch_size:
+            yield batch, [c.page_content for _, c, v in batch if v is None]
+            batch = []
+    if batch:
+        yield batch, [c.page_content for _, c, v in batch if v is None]
+
+
+def _load_near_dups(vectorstore, canonical_ids: set, threshold: float) -> NearDuplicateIndex:
+    """Signatures of the indexed chunks; any missing from disk are recomputed."""
+    near_dups = NearDuplicateIndex(threshold)
+    near_dups.load(VECTORSTORE_PATH, keep=canonical_ids)
+    for cid in canonical_ids - set(near_dups.signatures):
+        doc = vectorstore.docstore.search(cid)
+        if isinstance(doc, str):
+            continue
+        near_dups.add(cid, text=doc.page_content)
+    return near_dups
+
+
+def _merge_sources(vectorstore, files: dict, aliases: dict) -> None:
+    """Record every live source path of each indexed chunk in its metadata.
+
+    ``source`` stays the canonical chunk's own path while that file exists;
+    ``sources`` lists all paths when the chunk stands for more than one.
+    """
+    sources_of = {}
+    for source, entry in files.items():
+        for cid in entry["chunks"]:
+            sources_of.setdefault(aliases.get(cid, cid), set()).add(source)
+    for cid, sources in sources_of.items():
+        doc = vectorstore.docstore.search(cid)
+        if isinstance(doc, str):
+            continue
+        ordered = sorted(sources)
+        if doc.metadata.get("source") not in sources:
+            doc.metadata["source"] = ordered[0]
+        if len(ordered) > 1:
+            doc.metadata["sources"] = ordered
+        else:
+            doc.metadata.pop("sources", None)
+
+
+async def _index_new_chunks(vectorstore, batches, embeddings, concurrency: int, max_in_flight: int):
+    """Consume embedded batches and append them to the store as they finish."""
+    async for payload, vectors in aembed_batches(
+        batches, embeddings, concurrency=concurrency, max_in_flight=max_in_flight
+    ):
+        fresh = iter(vectors)
+        text_embeddings = [
+            (chunk.page_content, vector if vector is not None else next(fresh).tolist())
+            for _, chunk, vector in payload
+        ]
+        metadatas = [chunk.metadata for _, chunk, _ in payload]
+        ids = [cid for cid, _, _ in payload]
+        if vectorstore is None:
+            vectorstore = FAISS.from_embeddings(text_embeddings, embeddings, metadatas=metadatas, ids=ids)
+        else:
+            vectorstore.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+    return vectorstore
+
+
+def prepare_and_index_docs(
+    embeddings=None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    workers: int = 1,
+    ann_config: AnnConfig = None,
+    dedup: bool = True,
+    dedup_threshold: float = DEDUP_THRESHOLD,
+):
+    """Incrementally (re-)index ``docs/`` as a streaming pipeline.
+
+    Files are read, split, embedded and appended to the index as a stream
+    (file → chunks → embed batch → add), with at most ``max_in_flight``
+    batches of ``batch_size`` chunks held at once, so the split and embed
+    stages do not hold the changed files in memory. The index itself is not
+    streamed: the finish stage (chunk store, BM25 index, partitions) works on
+    the loaded ``FAISS`` store, whose docstore holds every chunk, so peak
+    memory still grows with the number of indexed chunks. Embedding requests
+    run with up to ``concurrency`` calls in flight and completed batches are
+    checkpointed, so an interrupted build resumes (see
+    ``tools/embed_pipeline.py``). Reading and splitting can be spread over
+    ``workers`` processes; chunk order and metadata stay deterministic.
+
+    Only files whose content hash changed since the last build are re-split.
+    Chunks that disappeared are deleted from the index, chunks whose text is
+    already indexed reuse the stored vector, and only genuinely new text is
+    sent to the embeddings API.
+
+    Chunks are stored once, in the compact chunk store next to
+    ``index.faiss`` (see ``tools/chunk_store.py``). The retrieval nodes, the
+    BM25 index and the topic extractors all read from it.
+
+    ``ann_config`` selects the search index derived from the exact flat index:
+    its structure (``flat``, ``ivf_flat``, ``hnsw`` or ``ivf_pq``) and vector
+    storage (float32/float16/int8, optionally truncated). See
+    ``tools/ann_index.py``. It defaults to the ``TUTOR_INDEX_KIND``,
+    ``TUTOR_INDEX_STORAGE`` and ``TUTOR_INDEX_DIMS`` environment variables.
+
+    With ``dedup`` on, a new chunk whose estimated Jaccard similarity to an
+    indexed chunk reaches ``dedup_threshold`` is not embedded: it becomes an
+    alias of that chunk, whose ``sources`` metadata lists every file it
+    appears in (see ``tools/dedup.py``). A chunk stays indexed while any of
+    its aliases is still live.
+
+    Every chunk is tagged with its ``category`` and matching ``topic_ids``,
+    and the rows of each category are written to ``partitions/<category>.npy``.
+    Learn-mode searches pass them to the main search index as an
+    ``IDSelectorBitmap``, so only their own category is scored (see
+    ``tools/partitions.py``). Topic ids come from
+    ``data/extracted_topics.json`` as of this build.
+    """
+    embeddings = embeddings or get_embeddings()
+    model_name = embedding_model_name(embeddings)
+    manifest = load_manifest(model_name)
+
+    vectorstore = None
+    if manifest["files"]:
+        vectorstore = load_index(embeddings)
+
+    # New chunks whose text is already indexed (e.g. a moved paragraph) copy
+    # the stored vector. New rows are only appended while streaming, so these
+    # positions stay valid until removed chunks are deleted at the end.
+    row_by_text = {}
+    if vectorstore is not None:
+        position_of = {doc_id: pos for pos, doc_id in vectorstore.index_to_docstore_id.items()}
+        for cid, thash in manifest["chunks"].items():
+            if cid in position_of:
+                row_by_text.setdefault(thash, position_of[cid])
+
+    def reuse_vector(text):
+        row = row_by_text.get(text_hash(text))
+        return vectorstore.index.reconstruct(int(row)).tolist() if row is not None else None
+
+    old_ids = set(manifest["chunks"])
+    aliases = dict(manifest.get("aliases", {}))
+    near_dups = None
+    if dedup:
+        if vectorstore is None:
+            near_dups = NearDuplicateIndex(dedup_threshold)
+        else:
+            near_dups = _load_near_dups(vectorstore, old_ids, dedup_threshold)
+
+    print("[📚] Streaming changed docs through the indexing pipeline...")
+    files = {}
+    counters = {"unchanged_files": 0, "changed_files": 0, "embedded": 0, "reused": 0, "deduplicated": 0}
+    # Splitting blocks on the process pool, so it runs in a worker thread
+    # and overlaps with the embedding requests on the event loop
+    batches = _aiter_batches(
+        aiter_in_thread(_iter_new_chunks(manifest, files, counters, workers), batch_size),
+        old_ids,
+        reuse_vector,
+        batch_size,
+        counters,
+        aliases=aliases,
+        near_dups=near_dups,
+    )
+    vectorstore = asyncio.run(_index_new_chunks(vectorstore, batches, embeddings, concurrency, max_in_flight))
+    print(f"[ℹ️] {counters['unchanged_files']} unchanged files, {counters['changed_files']} new or changed")
+
+    if vectorstore is None:
+        print(f"[❌] No documents found in {DOCS_DIR}; nothing to index.")
+        return
+
+    live_ids = {cid for entry in files.values() for cid in entry["chunks"]}
+    aliases = {cid: canonical for cid, canonical in aliases.items() if cid in live_ids}
+    live_canonical = {aliases.get(cid, cid) for cid in live_ids}
+    removed_ids = old_ids - live_canonical
+    if removed_ids:
+        vectorstore.delete(list(removed_ids))
+    _merge_sources(vectorstore, files, aliases)
+
+    row_ids = [doc_id for _, doc_id in sorted(vectorstore.index_to_docstore_id.items())]
+    docs = [vectorstore.docstore.search(doc_id) for doc_id in row_ids]
+    tag_chunks(docs, load_topics())
+    save_store(vectorstore, VECTORSTORE_PATH)
+    if near_dups is not None:
+        near_dups.remove(removed_ids)
+        near_dups.save(VECTORSTORE_PATH)
+    build_ann_index(vectorstore.index, VECTORSTORE_PATH, ann_config)
+    build_partitions(len(docs), [doc.metadata for doc in docs], VECTORSTORE_PATH)
+    texts = [doc.page_content for doc in docs]
+    BM25Index.build(texts).save(VECTORSTORE_PATH)
+
+    manifest["files"] = files
+    manifest["chunks"] = {doc_id: text_hash(text) for doc_id, text in zip(row_ids, texts)}
+    manifest["aliases"] = aliases
+    # Upstream commits docs/ was synced to (see tools/load_docs.py)
+    manifest["synced_commits"] = {label: entry["commit"] for label, entry in load_sync_state().items()}
+    save_manifest(manifest)
+    clear_checkpoints()
+    # Row numbers may have changed: recompute the learn-mode topic table
+    build_topic_cache(VECTORSTORE_PATH, embeddings=embeddings)
+
+    added = counters["embedded"] + counters["reused"]
     print(f"[✅] Vectorstore saved to {VECTORSTORE_PATH}")
+    print(
+        f"[📊] Chunks added: {added} (embedded {counters['embedded']}, reused {counters['reused']}), "
+        f"removed: {len(removed_ids)}, unchanged: {len(live_canonical) - added}, "
+        f"near-duplicates folded: {counters['deduplicated']}"
+    )
 
 
 if __name__ == "__main__":
-    prepare_and_index_docs()
+    parser = argparse.ArgumentParser(description="Incrementally index docs/ into the FAISS vector store.")
+    parser.add_argument("--index-kind", choices=INDEX_KINDS, default=AnnConfig.kind)
+    parser.add_argument("--nlist", type=int, help="IVF lists (default ~4*sqrt(chunks))")
+    parser.add_argument("--pq-m", type=int, help="PQ sub-quantizers; must divide the embedding dimension")
+    parser.add_argument("--hnsw-m", type=int, default=AnnConfig.hnsw_m)
+    parser.add_argument("--nprobe", type=int, help="default IVF lists scanned per query")
+    parser.add_argument("--ef-search", type=int, default=AnnConfig.ef_search, help="default HNSW efSearch")
+    parser.add_argument("--storage", choices=tuple(STORAGE_CODES), default=AnnConfig.storage)
+    parser.add_argument("--dims", type=int, default=AnnConfig.dims, help="keep only the first N embedding dimensions")
+    parser.add_argument("--rescore", type=int, default=AnnConfig.rescore, help="candidates re-scored at full precision, as a multiple of k")
+    parser.add_argument("--storage-report", action="store_true", help="print recall vs. size for every storage option")
+    parser.add_argument("--no-dedup", action="store_true", help="embed near-duplicate chunks separately")
+    parser.add_argument("--dedup-threshold", type=float, default=DEDUP_THRESHOLD, help="MinHash Jaccard similarity to fold a chunk")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes used to split changed files")
+    args = parser.parse_args()
+    prepare_and_index_docs(
+        workers=args.workers,
+        ann_config=AnnConfig(
+            kind=args.index_kind,
+            nlist=args.nlist,
+            pq_m=args.pq_m,
+            hnsw_m=args.hnsw_m,
+            nprobe=args.nprobe,
+            ef_search=args.ef_search,
+            storage=args.storage,
+            dims=args.dims,
+            rescore=args.rescore,
+            report=args.storage_report,
+        ),
+        dedup=not args.no_dedup,
+        dedup_threshold=args.dedup_threshold,
+    )
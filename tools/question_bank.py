@@ -0,0 +1,267 @@
+"""Pre-generated question pools for learn mode.
+
+A learn session used to wait on a documentation search and a ``ChatOpenAI``
+call before its first question appeared. :func:`build_question_bank` does
+that work ahead of time, for every topic in ``data/extracted_topics.json``,
+with bounded concurrency. It stores the questions in
+``data/question_bank.json``.
+
+Each question records the chunks it was generated from: their chunk ids and
+their rows in the chunk store. It also records the index version, which is
+the corpus fingerprint (``ChunkStore.fingerprint``). Learn mode serves a
+topic's questions from the bank and skips any already recorded in
+``logs/question_log.json``. It uses the recorded chunks as feedback context.
+Questions from an older index version are never served. Once a topic's pool
+is exhausted, learn mode falls back to live retrieval and generation.
+
+Usage::
+
+    python -m tools.question_bank                  # top up every topic
+    python -m tools.question_bank --per-topic 15 --concurrency 8
+"""
+
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from prompts.question_generation_prompt import QUESTION_GENERATION_PROMPT
+from tools.chunk_store import cached_corpus, open_corpus
+from tools.notices import notice
+from tools.topic_cache import TOPICS_PATH, load_topics
+
+
+QUESTION_BANK_PATH = Path("data/question_bank.json")
+QUESTION_LOG_PATH = Path("logs/question_log.json")
+QUESTION_BANK_VERSION = 1
+
+QUESTIONS_PER_TOPIC = 12
+QUESTIONS_PER_SESSION = 3
+DEFAULT_CONCURRENCY = 4
+# Chunks retrieved per topic, and how many go into each generation prompt
+CONTEXT_CHUNKS = 8
+CHUNKS_PER_PROMPT = 4
+
+PROMPT_TEMPLATE = ChatPromptTemplate.from_messages(QUESTION_GENERATION_PROMPT)
+
+
+def usable_chunk(text: str) -> bool:
+    """Skip very short chunks and ones that look like headings, lists or tables."""
+    return len(text.strip()) > 80 and not text.strip().startswith(("-", "|", "#"))
+
+
+def split_questions(raw_output: str) -> List[str]:
+    """One question per non-empty line of the model output, bullets stripped."""
+    return [line.strip("- ").strip() for line in raw_output.split("\n") if line.strip()]
+
+
+def asked_questions(concept_id: Optional[str], log_path: Path = QUESTION_LOG_PATH) -> List[str]:
+    """Questions already logged for ``concept_id``, oldest first."""
+    if not log_path.exists() or log_path.stat().st_size == 0:
+        return []
+    try:
+        with open(log_path, "r", encoding="utf-8") as f:
+            past_questions = json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        notice(f"[⚠️] Could not load question log: {e}")
+        return []
+    return [
+        entry["question"] for entry in past_questions
+        if entry.get("concept_id") == concept_id and "question" in entry
+    ]
+
+
+class QuestionBank:
+    """Topic id → list of question entries, stored as one JSON file."""
+
+    def __init__(self, topics: Optional[Dict[str, List[Dict[str, Any]]]] = None, path: Path = QUESTION_BANK_PATH):
+        self.topics = topics or {}
+        self.path = Path(path)
+
+    @classmethod
+    def load(cls, path: Path = QUESTION_BANK_PATH) -> "QuestionBank":
+        path = Path(path)
+        if not path.exists():
+            return cls(path=path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"[⚠️] Ignoring question bank at {path}: {e}")
+            return cls(path=path)
+        if data.get("version") != QUESTION_BANK_VERSION:
+            return cls(path=path)
+        return cls(data["topics"], path)
+
+    def save(self) -> Path:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": QUESTION_BANK_VERSION, "topics": self.topics}, f, indent=2, ensure_ascii=False)
+        tmp_path.replace(self.path)
+        return self.path
+
+    def available(self, topic_id: str, asked: Set[str], index_version: Optional[str]) -> List[Dict[str, Any]]:
+        """Entries for ``topic_id`` from the current index that were not asked yet."""
+        return [
+            entry for entry in self.topics.get(topic_id, [])
+            if entry["index_version"] == index_version and entry["question"] not in asked
+        ]
+
+    def drop_stale(self, index_version: Optional[str]) -> int:
+        """Remove entries generated from another index version; returns how many."""
+        dropped = 0
+        for topic_id, entries in self.topics.items():
+            fresh = [entry for entry in entries if entry["index_version"] == index_version]
+            dropped += len(entries) - len(fresh)
+            self.topics[topic_id] = fresh
+        return dropped
+
+    def add(self, topic_id: str, question: str, chunk_ids: List[str], rows: List[int], index_version: str) -> None:
+        self.topics.setdefault(topic_id, []).append({
+            "question": question,
+            "chunk_ids": chunk_ids,
+            "rows": rows,
+            "index_version": index_version,
+            "created": time.time(),
+        })
+
+
+_bank: Optional[QuestionBank] = None
+_bank_mtime: Optional[int] = None
+_lock = threading.Lock()
+
+
+def get_question_bank(path: Path = QUESTION_BANK_PATH) -> QuestionBank:
+    """The bank at ``path``, re-read only when the file changes."""
+    global _bank, _bank_mtime
+    try:
+        mtime = Path(path).stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    with _lock:
+        if _bank is None or _bank_mtime != mtime or _bank.path != Path(path):
+            _bank = QuestionBank.load(path) if mtime is not None else QuestionBank(path=path)
+            _bank_mtime = mtime
+        return _bank
+
+
+def serve_questions(topic_id: Optional[str], n: int = QUESTIONS_PER_SESSION) -> Optional[Dict[str, Any]]:
+    """Up to ``n`` unasked bank questions for ``topic_id`` and their source chunks.
+
+    Returns ``{"questions": [...], "chunks": [...]}``, or ``None`` when the
+    topic has no unasked questions for the current index.
+    """
+    if not topic_id:
+        return None
+    bank = get_question_bank()
+    if not bank.topics.get(topic_id):
+        return None
+    # Called twice per learn session; the corpus is hashed once per index build
+    docs, fingerprint = cached_corpus()
+    if docs is None:
+        return None
+    entries = bank.available(topic_id, set(asked_questions(topic_id)), fingerprint)[:n]
+    if not entries:
+        return None
+    rows = list(dict.fromkeys(row for entry in entries for row in entry["rows"]))
+    return {"questions": [entry["question"] for entry in entries], "chunks": [docs.text(row) for row in rows]}
+
+
+async def _fill_topic(
+    bank: QuestionBank,
+    topic_id: str,
+    per_topic: int,
+    index_version: str,
+    llm: Any,
+    semaphore: asyncio.Semaphore,
+) -> int:
+    """Generate questions for one topic until it has ``per_topic`` unasked entries."""
+    from tools.retrieval import search_doc_rows
+
+    asked = set(asked_questions(topic_id))
+    known = asked | {entry["question"] for entry in bank.topics.get(topic_id, [])}
+    needed = per_topic - len(bank.available(topic_id, asked, index_version))
+    if needed <= 0:
+        return 0
+
+    docs = open_corpus()
+    rows = await asyncio.to_thread(search_doc_rows, topic_id, CONTEXT_CHUNKS, topic_id=topic_id)
+    rows = [row for row in rows if usable_chunk(docs.text(row))]
+    added = 0
+    for start in range(0, len(rows), CHUNKS_PER_PROMPT):
+        if added >= needed:
+            break
+        window = rows[start:start + CHUNKS_PER_PROMPT]
+        context = "\n\n".join(docs.text(row) for row in window)
+        async with semaphore:
+            try:
+                response = await llm.ainvoke(PROMPT_TEMPLATE.format_messages(context=context))
+            except Exception as e:
+                print(f"[⚠️] Question generation failed for {topic_id}: {e}")
+                continue
+        for question in split_questions(response.content):
+            if question in known or added >= needed:
+                continue
+            known.add(question)
+            bank.add(topic_id, question, [docs.chunk_id(row) for row in window], window, index_version)
+            added += 1
+    return added
+
+
+async def build_question_bank(
+    per_topic: int = QUESTIONS_PER_TOPIC,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    topic_ids: Optional[Sequence[str]] = None,
+    llm: Any = None,
+    path: Path = QUESTION_BANK_PATH,
+    topics_path: Path = TOPICS_PATH,
+) -> int:
+    """Top up every topic's pool to ``per_topic`` unasked questions.
+
+    Questions from an older index version are dropped first. Returns the
+    number of questions added.
+    """
+    docs = open_corpus()
+    if docs is None:
+        print("[❌] No indexed documentation found. Please run tools/prep_docs.py first.")
+        return 0
+    topic_ids = list(topic_ids or [topic["id"] for topic in load_topics(topics_path)])
+    if not topic_ids:
+        print(f"[ℹ️] No topics in {topics_path}; nothing to generate.")
+        return 0
+    if llm is None:
+        from tools.clients import get_chat_model
+        llm = get_chat_model("questions")
+
+    index_version = docs.fingerprint()
+    bank = QuestionBank.load(path)
+    dropped = bank.drop_stale(index_version)
+    semaphore = asyncio.Semaphore(concurrency)
+    added = await asyncio.gather(*(
+        _fill_topic(bank, topic_id, per_topic, index_version, llm, semaphore) for topic_id in topic_ids
+    ))
+    bank.save()
+    print(
+        f"[🏦] Added {sum(added)} questions over {sum(1 for n in added if n)} topics to {path}"
+        + (f" (dropped {dropped} from an older index)" if dropped else "")
+    )
+    return sum(added)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from dotenv import load_dotenv
+
+    load_dotenv(override=True)
+    parser = argparse.ArgumentParser(description="Pre-generate learn-mode questions for every topic.")
+    parser.add_argument("--per-topic", type=int, default=QUESTIONS_PER_TOPIC)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--topics", nargs="+", help="only these topic ids")
+    args = parser.parse_args()
+    asyncio.run(build_question_bank(args.per_topic, args.concurrency, args.topics))
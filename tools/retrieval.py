@@ -0,0 +1,146 @@
+"""Documentation retrieval shared by the learn and doc-search nodes.
+
+:func:`search_docs` combines the prebuilt BM25 index
+(:mod:`tools.lexical_index`) with vector search over the shared FAISS handle
+(:mod:`tools.vector_registry`):
+
+- Queries naming exact APIs that the lexical index answers confidently are
+  served from BM25 alone, without an embedding call.
+- Everything else runs both searches and fuses the two rankings with
+  reciprocal-rank fusion (RRF).
+
+Without a lexical index on disk it falls back to plain similarity search.
+Known learn-mode topics skip both searches and are answered from the table
+precomputed by :mod:`tools.topic_cache`. Given the learner's target topic, both
+rankers only consider chunks in that topic's category partition
+(:mod:`tools.partitions`).
+"""
+
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+from tools.lexical_index import BM25Index, api_names
+from tools.partitions import partition_key, topic_category
+from tools.topic_cache import TOPICS_PATH, get_topic_cache, load_topics
+from tools.vector_registry import DOCS_VECTORSTORE_PATH, VectorStoreHandle, get_vector_store
+
+
+RRF_K = 60
+
+# How many candidates each ranker contributes before fusion, as a multiple of k.
+FETCH_MULTIPLIER = 4
+
+# Counts of how queries were answered ("topic_cache", "lexical", "hybrid", "vector").
+RETRIEVAL_STATS: Counter = Counter()
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = RRF_K) -> List[int]:
+    """Fuse several best-first rankings of rows into one."""
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking):
+            scores[row] = scores.get(row, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda row: (-scores[row], row))
+
+
+def lexically_confident(lexical: BM25Index, query: str, hits: List[Tuple[int, float]], k: int) -> bool:
+    """Decide whether BM25 alone can answer ``query``.
+
+    True when the query names at least one API identifier, every such
+    identifier occurs verbatim in the corpus, and there are at least ``k``
+    lexical hits to return.
+    """
+    names = api_names(query)
+    if not names or len(hits) < k:
+        return False
+    return all(lexical.document_frequency(name) > 0 for name in names)
+
+
+_topics_mtime: Optional[int] = None
+_topics: List[Dict] = []
+
+
+def _known_topics() -> List[Dict]:
+    """``data/extracted_topics.json``, re-read only when it changes."""
+    global _topics_mtime, _topics
+    try:
+        mtime = TOPICS_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return []
+    if mtime != _topics_mtime:
+        _topics, _topics_mtime = load_topics(TOPICS_PATH), mtime
+    return _topics
+
+
+def resolve_partition(handle: VectorStoreHandle, topic_id: Optional[str]) -> Optional[str]:
+    """Partition key for ``topic_id``'s category, if the index has that partition."""
+    category = topic_category(topic_id, _known_topics())
+    key = partition_key(category) if category else None
+    return key if key in handle.partitions else None
+
+
+def search_rows(
+    handle: VectorStoreHandle,
+    query: str,
+    k: int = 4,
+    hybrid: bool = True,
+    partition: Optional[str] = None,
+) -> List[int]:
+    """Return the FAISS rows of the ``k`` most relevant chunks for ``query``.
+
+    With ``partition``, only rows in that partition are considered.
+    """
+    part = handle.partitions.get(partition) if partition else None
+    if not hybrid or handle.lexical is None:
+        RETRIEVAL_STATS["vector"] += 1
+        return [row for row, _ in handle.search_rows(query, k, partition=partition)]
+
+    fetch_k = max(k * FETCH_MULTIPLIER, 20)
+    lexical_hits = handle.lexical.search(query, fetch_k, mask=part.mask if part is not None else None)
+    if lexically_confident(handle.lexical, query, lexical_hits, k):
+        RETRIEVAL_STATS["lexical"] += 1
+        return [row for row, _ in lexical_hits[:k]]
+    RETRIEVAL_STATS["hybrid"] += 1
+    vector_rows = [row for row, _ in handle.search_rows(query, fetch_k, partition=partition)]
+    return reciprocal_rank_fusion([[row for row, _ in lexical_hits], vector_rows])[:k]
+
+
+def search_doc_rows(
+    query: str,
+    k: int = 4,
+    path: str = DOCS_VECTORSTORE_PATH,
+    hybrid: bool = True,
+    use_topic_cache: bool = True,
+    topic_id: Optional[str] = None,
+) -> List[int]:
+    """Rows (in the chunk store) of the ``k`` most relevant chunks; see :func:`search_docs`."""
+    handle = get_vector_store(path)
+    partition = resolve_partition(handle, topic_id)
+    if use_topic_cache:
+        rows = get_topic_cache(path).lookup(query, k, handle.signature, partition)
+        if rows is not None:
+            RETRIEVAL_STATS["topic_cache"] += 1
+            return rows
+    return search_rows(handle, query, k, hybrid, partition)
+
+
+def search_docs(
+    query: str,
+    k: int = 4,
+    path: str = DOCS_VECTORSTORE_PATH,
+    hybrid: bool = True,
+    use_topic_cache: bool = True,
+    topic_id: Optional[str] = None,
+) -> List[Document]:
+    """Return the ``k`` most relevant documentation chunks for ``query``.
+
+    ``topic_id`` (the learner's target concept) limits the search to the
+    partition of that topic's category. Queries naming a known topic (id,
+    name or keyword set) are served from the precomputed topic table when it
+    matches the loaded index and partition.
+    """
+    handle = get_vector_store(path)
+    rows = search_doc_rows(query, k, path, hybrid, use_topic_cache, topic_id)
+    return [handle.document(row) for row in rows]
@@ -0,0 +1,59 @@
+"""Token streaming from chat models, with time-to-first-token tracking.
+
+The feedback and question-generation nodes have streaming variants that
+yield text as the model produces it, instead of waiting for the whole
+``ainvoke`` response. :func:`stream_text` wraps ``llm.astream`` for them.
+It records two timings per stream under a name (``"feedback"``,
+``"questions"``): time to first token (TTFT) and total time.
+:func:`stream_stats` summarises the recent streams.
+"""
+
+import time
+from collections import defaultdict, deque
+from typing import Any, AsyncIterator, Deque, Dict, Sequence, Tuple
+
+
+# Most recent streams kept per name for the summary
+STATS_WINDOW = 500
+
+_timings: Dict[str, Deque[Tuple[float, float]]] = defaultdict(lambda: deque(maxlen=STATS_WINDOW))
+
+
+def record_stream(name: str, ttft: float, total: float) -> None:
+    """Record one stream's time to first token and total duration, in seconds."""
+    _timings[name].append((ttft, total))
+
+
+async def stream_text(llm: Any, messages: Sequence[Any], name: str) -> AsyncIterator[str]:
+    """Yield the text of each chunk ``llm.astream(messages)`` produces.
+
+    Timings are recorded under ``name`` once the stream completes.
+    """
+    started = time.perf_counter()
+    ttft = None
+    async for chunk in llm.astream(messages):
+        text = chunk.content if isinstance(chunk.content, str) else ""
+        if not text:
+            continue
+        if ttft is None:
+            ttft = time.perf_counter() - started
+        yield text
+    total = time.perf_counter() - started
+    record_stream(name, total if ttft is None else ttft, total)
+
+
+def stream_stats() -> Dict[str, Dict[str, float]]:
+    """Per-name stream count and TTFT/total latency summary, in milliseconds."""
+    stats = {}
+    for name, timings in _timings.items():
+        if not timings:
+            continue
+        ttfts = sorted(ttft for ttft, _ in timings)
+        stats[name] = {
+            "streams": len(timings),
+            "ttft_avg_ms": round(1000 * sum(ttfts) / len(ttfts), 1),
+            "ttft_p50_ms": round(1000 * ttfts[len(ttfts) // 2], 1),
+            "ttft_max_ms": round(1000 * ttfts[-1], 1),
+            "total_avg_ms": round(1000 * sum(total for _, total in timings) / len(timings), 1),
+        }
+    return stats
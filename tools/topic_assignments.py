@@ -0,0 +1,133 @@
+"""Corpus-fingerprinted topic list and per-chunk topic assignments.
+
+``data/extracted_topics.json`` used to be trusted forever once it existed.
+It is now written together with ``data/extracted_topics.meta.json``, which
+records the fingerprint of the chunk corpus it was extracted from (see
+``ChunkStore.fingerprint``) and the extractor that produced it.
+:func:`topics_status` compares that fingerprint with the indexed docs, so a
+stale list is detected at startup. A list without the sidecar predates it
+and is kept as is.
+
+The quick extractor also persists which topics each chunk mentions, keyed
+by chunk id, in ``data/topic_assignments.npz``. Chunk ids are content
+hashes (``tools/prep_docs.chunk_id``). After a docs update only chunks with
+new ids are rescanned, and the topic frequencies are recomputed from the
+stored assignments.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tools.chunk_store import open_corpus
+from tools.topic_cache import TOPICS_PATH
+
+
+TOPICS_META_PATH = Path("data/extracted_topics.meta.json")
+TOPIC_ASSIGNMENTS_PATH = Path("data/topic_assignments.npz")
+
+
+class TopicAssignments:
+    """Chunk id → topic label bitmask, valid for one pattern table.
+
+    ``table_key`` identifies the pattern tables the bitmasks were computed
+    with; assignments saved under another key are discarded on load.
+    """
+
+    def __init__(self, table_key: str, words: int, path: Path = TOPIC_ASSIGNMENTS_PATH):
+        self.table_key = table_key
+        self.path = Path(path)
+        self._rows: Dict[str, int] = {}
+        self._bits = np.zeros((0, words), dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @classmethod
+    def load(cls, table_key: str, words: int, path: Path = TOPIC_ASSIGNMENTS_PATH) -> "TopicAssignments":
+        assignments = cls(table_key, words, path)
+        if not assignments.path.exists():
+            return assignments
+        try:
+            data = np.load(assignments.path)
+            if str(data["table_key"]) != table_key or data["bits"].shape[1:] != (words,):
+                return assignments
+            assignments._rows = {raw.decode("ascii"): row for row, raw in enumerate(data["ids"])}
+            assignments._bits = data["bits"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[⚠️] Ignoring topic assignments at {assignments.path}: {e}")
+        return assignments
+
+    def get(self, chunk_id: str) -> Optional[np.ndarray]:
+        row = self._rows.get(chunk_id)
+        return None if row is None else self._bits[row]
+
+    def replace(self, chunk_ids: Sequence[str], bits: np.ndarray) -> None:
+        """Keep exactly these chunks' assignments (drops removed chunks)."""
+        self._rows = {cid: row for row, cid in enumerate(chunk_ids)}
+        self._bits = np.asarray(bits, dtype=np.uint64)
+
+    def save(self) -> Path:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        ids = sorted(self._rows, key=self._rows.get)
+        tmp_path = self.path.with_name(f".tmp_{self.path.name}")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, table_key=np.asarray(self.table_key), ids=np.asarray(ids, dtype="S"), bits=self._bits)
+        tmp_path.replace(self.path)
+        return self.path
+
+
+def current_fingerprint() -> Optional[str]:
+    """Fingerprint of the indexed chunk corpus, or ``None`` if there is none."""
+    docs = open_corpus()
+    return docs.fingerprint() if docs is not None else None
+
+
+def save_topics(topics: List[Dict[str, Any]], fingerprint: Optional[str], extractor: str) -> Path:
+    """Write the topic list and the fingerprint of the corpus it describes."""
+    TOPICS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(TOPICS_PATH, "w", encoding="utf-8") as f:
+        json.dump(topics, f, indent=2, ensure_ascii=False)
+    with open(TOPICS_META_PATH, "w", encoding="utf-8") as f:
+        json.dump({"corpus_fingerprint": fingerprint, "extractor": extractor, "topics": len(topics)}, f, indent=2)
+    return TOPICS_PATH
+
+
+def topics_status() -> Tuple[Optional[List[Dict[str, Any]]], str, Dict[str, Any]]:
+    """Read the cached topic list and say whether it matches the indexed docs.
+
+    Returns ``(topics, status, meta)``, where ``meta`` is the sidecar (empty
+    when there is none) and ``status`` is one of:
+
+    - ``"missing"``: no readable topic list (``topics`` is ``None``)
+    - ``"fresh"``: extracted from the current corpus
+    - ``"unindexed"``: no indexed corpus to compare against
+    - ``"legacy"``: written before the sidecar existed, so its corpus is unknown
+    - ``"stale"``: extracted from a different version of the docs
+    """
+    if not TOPICS_PATH.exists():
+        return None, "missing", {}
+    try:
+        with open(TOPICS_PATH, "r", encoding="utf-8") as f:
+            topics = json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"[⚠️] Could not read {TOPICS_PATH}: {e}")
+        return None, "missing", {}
+
+    try:
+        with open(TOPICS_META_PATH, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return topics, "legacy", {}
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"[⚠️] Could not read {TOPICS_META_PATH}: {e}")
+        return topics, "legacy", {}
+
+    fingerprint = current_fingerprint()
+    if fingerprint is None:
+        return topics, "unindexed", meta
+    if meta.get("corpus_fingerprint") != fingerprint:
+        return topics, "stale", meta
+    return topics, "fresh", meta
@@ -0,0 +1,192 @@
+"""Precomputed topic → chunk table for learn mode.
+
+Learn mode nearly always retrieves with a topic id picked from
+``data/extracted_topics.json``, so the same few dozen searches ran on every
+session. :func:`build_topic_cache` runs them once per index build, for every
+topic's id, name and keyword set, and stores the resulting FAISS rows in
+``topic_cache.json`` next to the index. ``tools.retrieval.search_docs`` serves
+matching queries from that table without an embedding call or vector search.
+
+Each topic is searched within its category partition (see
+``tools/partitions.py``) and the partition is stored with its rows, so a hit
+is only served to a search restricted to the same partition.
+
+The table is stamped with the index's on-disk signature (see
+``tools.vector_registry.index_signature``). Any rebuild of the index changes
+the signature, so a stale table is ignored until it is rebuilt.
+
+Usage::
+
+    python -m tools.topic_cache    # after tools/prep_docs.py or topic extraction
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from tools.embedding_cache import normalize_query
+
+
+TOPIC_CACHE_FILE = "topic_cache.json"
+TOPIC_CACHE_VERSION = 2
+TOPICS_PATH = Path("data/extracted_topics.json")
+
+# Rows stored per topic; covers the learn node (k=4) and doc search (k=8).
+TOPIC_CACHE_K = 8
+
+
+def topic_key(text: str) -> str:
+    return normalize_query(text).lower()
+
+
+def topic_queries(topics: Sequence[Dict[str, Any]]) -> List[str]:
+    """Every query string that selects a topic: its id, name and keyword set."""
+    queries, seen = [], set()
+    for topic in topics:
+        for query in (topic.get("id"), topic.get("name"), " ".join(topic.get("keywords", []))):
+            if query and topic_key(query) not in seen:
+                seen.add(topic_key(query))
+                queries.append(query)
+    return queries
+
+
+def _signature_json(signature: Tuple) -> List[List[Any]]:
+    return [list(entry) for entry in signature]
+
+
+class TopicCache:
+    """Topic → FAISS rows table, valid for one index signature.
+
+    ``partitions`` records, per key, the partition its rows were searched in
+    (absent when the full index was searched).
+    """
+
+    def __init__(
+        self,
+        signature: Optional[List[List[Any]]] = None,
+        k: int = 0,
+        rows: Optional[Dict[str, List[int]]] = None,
+        partitions: Optional[Dict[str, str]] = None,
+    ):
+        self.signature = signature
+        self.k = k
+        self.rows = rows or {}
+        self.partitions = partitions or {}
+
+    @classmethod
+    def load(cls, path: Path) -> "TopicCache":
+        cache_path = Path(path) / TOPIC_CACHE_FILE
+        if not cache_path.exists():
+            return cls()
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"[⚠️] Ignoring topic cache at {cache_path}: {e}")
+            return cls()
+        if data.get("version") != TOPIC_CACHE_VERSION:
+            return cls()
+        return cls(data["signature"], data["k"], data["rows"], data.get("partitions"))
+
+    def save(self, path: Path) -> Path:
+        cache_path = Path(path) / TOPIC_CACHE_FILE
+        tmp_path = cache_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": TOPIC_CACHE_VERSION,
+                "signature": self.signature,
+                "k": self.k,
+                "rows": self.rows,
+                "partitions": self.partitions,
+            }, f)
+        tmp_path.replace(cache_path)
+        return cache_path
+
+    def lookup(self, query: str, k: int, signature: Tuple, partition: Optional[str] = None) -> Optional[List[int]]:
+        """Rows for ``query`` if it is a known topic and the table is current."""
+        if k > self.k or not self.rows:
+            return None
+        key = topic_key(query)
+        rows = self.rows.get(key)
+        if rows is None or self.partitions.get(key) != partition or self.signature != _signature_json(signature):
+            return None
+        return rows[:k]
+
+
+_caches: Dict[str, Tuple[Optional[int], TopicCache]] = {}
+_lock = threading.Lock()
+
+
+def get_topic_cache(path: str) -> TopicCache:
+    """Return the table for the index at ``path``, re-reading it when the file changes."""
+    cache_path = Path(path) / TOPIC_CACHE_FILE
+    try:
+        mtime = cache_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    key = str(cache_path.resolve())
+    cached = _caches.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with _lock:
+        cache = TopicCache.load(path) if mtime is not None else TopicCache()
+        _caches[key] = (mtime, cache)
+        return cache
+
+
+def load_topics(topics_path: Path = TOPICS_PATH) -> List[Dict[str, Any]]:
+    if not Path(topics_path).exists():
+        return []
+    with open(topics_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_topic_cache(
+    path: Optional[str] = None,
+    topics_path: Path = TOPICS_PATH,
+    k: int = TOPIC_CACHE_K,
+    embeddings: Any = None,
+) -> int:
+    """Precompute and save the rows for every known topic query.
+
+    ``embeddings`` overrides the shared registry's query embeddings (the
+    index builder passes its own client). Returns the number of queries
+    stored; 0 when there are no topics yet.
+    """
+    from tools.partitions import partition_key
+    from tools.retrieval import search_rows
+    from tools.vector_registry import DOCS_VECTORSTORE_PATH, VectorStoreRegistry, get_vector_store
+
+    path = path or DOCS_VECTORSTORE_PATH
+    topics = load_topics(topics_path)
+    if not topics:
+        print(f"[ℹ️] No topics in {topics_path}; skipping topic cache.")
+        return 0
+
+    if embeddings is not None:
+        handle = VectorStoreRegistry(embeddings_factory=lambda: embeddings).get(path)
+    else:
+        handle = get_vector_store(path)
+    queries = topic_queries(topics)
+    # Each query is searched in the partition of the first topic it selects
+    partitions, seen = {}, set()
+    for topic in topics:
+        key = partition_key(topic["category"]) if topic.get("category") else None
+        for query in (topic.get("id"), topic.get("name"), " ".join(topic.get("keywords", []))):
+            if not query or topic_key(query) in seen:
+                continue
+            seen.add(topic_key(query))
+            if key in handle.partitions:
+                partitions[topic_key(query)] = key
+    rows = {topic_key(q): search_rows(handle, q, k, partition=partitions.get(topic_key(q))) for q in queries}
+    TopicCache(_signature_json(handle.signature), k, rows, partitions).save(path)
+    print(f"[🗂️] Cached top-{k} chunks for {len(queries)} queries over {len(topics)} topics in {Path(path) / TOPIC_CACHE_FILE}")
+    return len(queries)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv(override=True)
+    build_topic_cache()
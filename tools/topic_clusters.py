@@ -0,0 +1,231 @@
+"""Topic discovery by clustering the chunk embeddings, with no LLM calls.
+
+The docs index already holds one embedding per chunk, row-aligned with the
+chunk store. This module groups those vectors with spherical k-means: the
+vectors are unit-normalised, initialised with seeded k-means++, and
+assignments are one matrix product per iteration. It then names each
+cluster from what its chunks share:
+
+- **Terms**: class-based TF-IDF, which treats each cluster as one document.
+  Terms that every cluster uses, like ``langchain``, score zero. Terms
+  concentrated in one cluster rank first.
+- **Source paths**: when most of a cluster comes from one file, the file
+  name is the clearest label. The cluster's category (LangChain/LangGraph)
+  is the majority category of its chunks' paths.
+
+The output follows the ``data/extracted_topics.json`` schema, with
+``frequency`` set to the cluster size. The same vectors and seed always give
+the same topics.
+"""
+
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tools.ann_index import FLAT_INDEX_FILE
+from tools.lexical_index import tokenize
+from tools.partitions import chunk_category
+
+
+DEFAULT_INDEX_DIR = Path("embeddings/vector_store")
+DEFAULT_SEED = 0
+MAX_ITERATIONS = 50
+MAX_CLUSTERS = 40
+MIN_CLUSTER_CHUNKS = 2
+TOP_TERMS = 8
+
+# Prose and markup words that are never a topic on their own
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be because been before being below between both but by can
+could did do does doing down during each few for from further get gets had has have having here how if in into
+is it its just more most must need no not now of off on once only or other our out over own same see set should
+so some such than that the their them then there these they this those through to too under until up use used
+uses using very via was way we were what when where which while who why will with would you your
+http https www com org html md mdx png svg img src href div span class true false none null self return def
+import print value values example examples note let new one two first default like make makes want
+""".split())
+
+
+_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def default_clusters(n: int) -> int:
+    """``TUTOR_TOPIC_CLUSTERS`` if set, else about ``sqrt(n / 2)`` capped at :data:`MAX_CLUSTERS`."""
+    configured = os.getenv("TUTOR_TOPIC_CLUSTERS")
+    k = int(configured) if configured else round(math.sqrt(n / 2))
+    return max(1, min(k, MAX_CLUSTERS, n))
+
+
+def load_vectors(path: Path = DEFAULT_INDEX_DIR) -> np.ndarray:
+    """All vectors of the exact (flat) docs index, in chunk store row order."""
+    import faiss
+
+    index = faiss.read_index(str(Path(path) / FLAT_INDEX_FILE), faiss.IO_FLAG_MMAP)
+    return index.reconstruct_n(0, int(index.ntotal))
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+
+def kmeans(
+    vectors: np.ndarray,
+    k: int,
+    seed: int = DEFAULT_SEED,
+    max_iterations: int = MAX_ITERATIONS,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Spherical k-means; returns ``(labels, unit centroids)``.
+
+    Empty clusters are re-seeded with the point least similar to its own
+    centroid, so exactly ``k`` non-empty clusters come back when ``n >= k``.
+    """
+    x = _normalize(np.asarray(vectors, dtype=np.float32))
+    n = len(x)
+    k = min(k, n)
+    rng = np.random.default_rng(seed)
+
+    # k-means++ on cosine distance
+    centroids = np.empty((k, x.shape[1]), dtype=np.float32)
+    centroids[0] = x[rng.integers(n)]
+    distance = np.clip(1.0 - x @ centroids[0], 0.0, None)
+    for j in range(1, k):
+        total = distance.sum()
+        pick = rng.choice(n, p=distance / total) if total > 0 else rng.integers(n)
+        centroids[j] = x[pick]
+        distance = np.minimum(distance, np.clip(1.0 - x @ centroids[j], 0.0, None))
+
+    labels = np.full(n, -1, dtype=np.int64)
+    for _ in range(max_iterations):
+        similarity = x @ centroids.T
+        new_labels = similarity.argmax(axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        # Per-cluster sums as one matrix product with the one-hot assignment
+        onehot = np.zeros((k, n), dtype=np.float32)
+        onehot[labels, np.arange(n)] = 1.0
+        sums = onehot @ x
+        counts = np.bincount(labels, minlength=k)
+        for j in np.flatnonzero(counts == 0):
+            own = similarity[np.arange(n), labels]
+            worst = int(own.argmin())
+            counts[labels[worst]] -= 1
+            sums[labels[worst]] -= x[worst]
+            labels[worst] = j
+            sums[j] = x[worst]
+            counts[j] = 1
+            similarity[worst, labels[worst]] = np.inf
+        centroids = _normalize(sums)
+    return labels, centroids
+
+
+def cluster_terms(term_counts: Sequence[Counter], top_n: int = TOP_TERMS) -> List[List[str]]:
+    """Top class-based TF-IDF terms per cluster (each cluster is one document)."""
+    df = Counter(term for counts in term_counts for term in counts)
+    k = len(term_counts)
+    top = []
+    for counts in term_counts:
+        total = sum(counts.values()) or 1
+        scored = ((count / total * math.log(k / df[term]), term) for term, count in counts.items())
+        top.append([term for score, term in sorted(scored, key=lambda s: (-s[0], s[1]))[:top_n] if score > 0])
+    return top
+
+
+def _terms(text: str, display: Dict[str, Counter]) -> List[str]:
+    """Topic-worthy tokens of ``text``; records the original casing of whole words."""
+    for word in _WORD.findall(text):
+        display[word.lower()][word] += 1
+    return [t for t in tokenize(text) if len(t) > 2 and not t.isdigit() and t not in STOPWORDS]
+
+
+def _display(term: str, display: Dict[str, Counter]) -> str:
+    forms = display.get(term)
+    if forms:
+        word = min(forms, key=lambda w: (-forms[w], w))
+        if word != term:
+            return word
+    return term.replace("_", " ").title()
+
+
+def _humanize_stem(stem: str) -> str:
+    return " ".join(part.capitalize() for part in re.split(r"[-_\s]+", stem) if part)
+
+
+def _slug(name: str) -> str:
+    return "_".join(re.findall(r"[a-z0-9]+", name.lower()))
+
+
+def cluster_topics(
+    docs: Any,
+    vectors: np.ndarray,
+    k: Optional[int] = None,
+    seed: int = DEFAULT_SEED,
+    min_chunks: int = MIN_CLUSTER_CHUNKS,
+) -> List[Dict[str, Any]]:
+    """Cluster ``vectors`` (row-aligned with ``docs``) and label the clusters as topics.
+
+    Clusters smaller than ``min_chunks``, or with no LangChain/LangGraph
+    chunks, are dropped. Clusters that end up with the same topic id are
+    merged. Topics are sorted by category, then size.
+    """
+    if len(vectors) != len(docs):
+        raise ValueError(f"{len(vectors)} vectors for {len(docs)} chunks; re-run tools/prep_docs.py")
+    if not len(docs):
+        return []
+    k = k or default_clusters(len(docs))
+    labels, _ = kmeans(vectors, k, seed)
+    k = int(labels.max()) + 1
+
+    display: Dict[str, Counter] = defaultdict(Counter)
+    term_counts = [Counter() for _ in range(k)]
+    stems = [Counter() for _ in range(k)]
+    categories = [Counter() for _ in range(k)]
+    for row, label in enumerate(labels):
+        term_counts[label].update(_terms(docs.text(row), display))
+        source = docs.source(row)
+        category = chunk_category(source)
+        if category:
+            categories[label][category] += 1
+        stem = Path(source).stem.lower()
+        if stem and stem not in {"index", "readme"}:
+            stems[label][stem] += 1
+    top_terms = cluster_terms(term_counts)
+
+    sizes = np.bincount(labels, minlength=k)
+    topics: Dict[str, Dict[str, Any]] = {}
+    for label in range(k):
+        size = int(sizes[label])
+        if size < min_chunks or not categories[label]:
+            continue
+        category = min(categories[label], key=lambda c: (-categories[label][c], c))
+        terms = [_display(term, display) for term in top_terms[label]]
+        stem, stem_count = stems[label].most_common(1)[0] if stems[label] else ("", 0)
+        if stem and stem_count * 2 >= size:
+            name = _humanize_stem(stem)
+        elif terms:
+            name = " & ".join(terms[:2])
+        else:
+            continue
+        topic_id = f"{category.lower()}.{_slug(name)}"
+        keywords = [term.lower() for term in terms]
+        if topic_id in topics:
+            merged = topics[topic_id]
+            merged["frequency"] += size
+            merged["keywords"] += [kw for kw in keywords if kw not in merged["keywords"]]
+            continue
+        where = f" (mostly {stem})" if stem and stem_count * 2 >= size else ""
+        topics[topic_id] = {
+            "id": topic_id,
+            "name": name,
+            "category": category,
+            "description": f"{category} docs{where} about {', '.join(terms[:4]) or name}",
+            "keywords": keywords or [name.lower()],
+            "frequency": size,
+        }
+    return sorted(topics.values(), key=lambda t: (t["category"], -t["frequency"], t["name"]))
@@ -0,0 +1,288 @@
+"""Map-reduce LLM topic extraction over the whole chunk corpus.
+
+The original intelligent extractor sent 20 truncated excerpts from a random
+sample of 50 chunks to a single GPT-4 call, and never looked at the rest of
+the corpus. This module covers the corpus instead:
+
+- **Plan**: chunks are ordered round-robin across source files, using a
+  seeded shuffle. Every file therefore contributes an excerpt before any file
+  contributes a second one. The excerpts are packed into batches of about
+  ``batch_tokens`` tokens. Batches are planned until the next one would
+  exceed ``token_budget``, counting prompt, excerpt and reserved output
+  tokens. If the corpus fits in the budget every chunk is covered;
+  otherwise the plan is a stratified, reproducible sample.
+- **Map**: each batch goes to the LLM, with at most ``concurrency`` calls in
+  flight. Each call returns candidate topics as JSON. Replies are capped at
+  ``MAP_OUTPUT_TOKENS`` (pass ``max_tokens`` to the model), and no further
+  batch starts once the reported token usage plus the planned cost of the
+  calls in flight and the next batch would exceed ``token_budget``.
+- **Reduce**: candidates are merged locally and deterministically. They are
+  keyed by category plus normalised name. Keywords are unioned, and each
+  topic's ``support`` (the number of batches that proposed it) is used for
+  ranking and thresholding.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.prompts import ChatPromptTemplate
+
+
+CATEGORIES = ("LangChain", "LangGraph")
+
+DEFAULT_TOKEN_BUDGET = int(os.getenv("TUTOR_TOPIC_TOKEN_BUDGET", "150000"))
+DEFAULT_CONCURRENCY = 4
+DEFAULT_SEED = 0
+BATCH_TOKENS = 6000
+EXCERPT_CHARS = 1500
+# Reserved per map call for the model's answer, and its ``max_tokens`` cap
+MAP_OUTPUT_TOKENS = 800
+MAX_KEYWORDS = 8
+
+MAP_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert at analyzing technical documentation to extract main topics and concepts.
+
+Read the LangChain and LangGraph documentation excerpts and list the topics a learner would study from them.
+Only list topics the excerpts actually cover. Return a JSON list:
+[
+  {{
+    "name": "Human Readable Topic Name",
+    "category": "LangChain" or "LangGraph",
+    "description": "Brief description of what this topic covers",
+    "keywords": ["key", "terms", "related", "to", "topic"]
+  }}
+]"""),
+    ("user", "Documentation excerpts:\n\n{excerpts}"),
+])
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # not installed, or the BPE file cannot be fetched
+        print(f"[⚠️] tiktoken unavailable ({type(e).__name__}); estimating 4 characters per token")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return -(-len(text) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=1)
+def _prompt_tokens() -> int:
+    return sum(count_tokens(m.content) for m in MAP_PROMPT.format_messages(excerpts=""))
+
+
+@dataclass
+class MapBatch:
+    rows: List[int] = field(default_factory=list)
+    excerpts: List[str] = field(default_factory=list)
+    tokens: int = 0
+
+    @property
+    def text(self) -> str:
+        return "\n\n".join(self.excerpts)
+
+
+def stratified_order(docs: Any, seed: int = DEFAULT_SEED) -> List[int]:
+    """All rows, round-robin over source files in a seeded order."""
+    rng = random.Random(seed)
+    by_source: Dict[str, List[int]] = defaultdict(list)
+    for row, source in enumerate(docs.iter_sources()):
+        by_source[source].append(row)
+    sources = sorted(by_source)
+    rng.shuffle(sources)
+    queues = []
+    for source in sources:
+        rows = by_source[source]
+        rng.shuffle(rows)
+        queues.append(rows)
+    order = []
+    for depth in range(max((len(q) for q in queues), default=0)):
+        order.extend(q[depth] for q in queues if depth < len(q))
+    return order
+
+
+def plan_batches(
+    docs: Any,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    seed: int = DEFAULT_SEED,
+    batch_tokens: int = BATCH_TOKENS,
+    excerpt_chars: int = EXCERPT_CHARS,
+) -> List[MapBatch]:
+    """Pack excerpts into map batches until ``token_budget`` would be exceeded."""
+    per_call = _prompt_tokens() + MAP_OUTPUT_TOKENS
+    batches: List[MapBatch] = []
+    spent = 0
+    current = MapBatch()
+    for row in stratified_order(docs, seed):
+        excerpt = f"=== {docs.source(row)} ===\n{docs.text(row)[:excerpt_chars]}"
+        tokens = count_tokens(excerpt)
+        if current.excerpts and current.tokens + tokens > batch_tokens:
+            batches.append(current)
+            spent += per_call + current.tokens
+            current = MapBatch()
+        if spent + per_call + current.tokens + tokens > token_budget:
+            break
+        current.rows.append(row)
+        current.excerpts.append(excerpt)
+        current.tokens += tokens
+    if current.excerpts:
+        batches.append(current)
+    return batches
+
+
+def parse_topics_json(text: str) -> List[Dict[str, Any]]:
+    """Parse a JSON topic list from a model reply, tolerating code fences."""
+    text = text.strip()
+    if text.startswith("```json"):
+        text = text[7:-3].strip()
+    elif text.startswith("```"):
+        text = text[3:-3].strip()
+    topics = json.loads(text)
+    return [t for t in topics if isinstance(t, dict)] if isinstance(topics, list) else []
+
+
+def batch_cost(batch: MapBatch) -> int:
+    """Planned tokens for one map call: prompt, excerpts and reserved output."""
+    return _prompt_tokens() + batch.tokens + MAP_OUTPUT_TOKENS
+
+
+async def map_topics(
+    batches: Sequence[MapBatch],
+    llm: Any,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    token_budget: Optional[int] = None,
+) -> Tuple[List[List[Dict[str, Any]]], int]:
+    """Run the map prompt over every batch; return per-batch candidates and tokens used.
+
+    With ``token_budget``, a batch is only started while the tokens actually
+    used so far, plus the planned cost of the calls in flight and of this
+    batch, stay within it; once one batch is refused no later batch starts.
+    A failed, unparsable or skipped batch contributes no candidates.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    used = 0
+    in_flight = 0
+    stopped = False
+
+    async def run(i: int, batch: MapBatch) -> List[Dict[str, Any]]:
+        nonlocal used, in_flight, stopped
+        async with semaphore:
+            cost = batch_cost(batch)
+            if stopped or (token_budget is not None and used + in_flight + cost > token_budget):
+                if not stopped:
+                    print(f"[⚠️] Topic map stopped at batch {i + 1}/{len(batches)}: {used} tokens used of {token_budget}")
+                stopped = True
+                return []
+            in_flight += cost
+            try:
+                response = await llm.ainvoke(MAP_PROMPT.format_messages(excerpts=batch.text))
+            except Exception as e:
+                print(f"[⚠️] Topic map batch {i + 1}/{len(batches)} failed: {e}")
+                return []
+            finally:
+                in_flight -= cost
+            usage = getattr(response, "usage_metadata", None) or {}
+            # Without usage metadata, count the planned cost
+            used += usage.get("total_tokens") or cost
+        try:
+            return parse_topics_json(response.content)
+        except json.JSONDecodeError as e:
+            print(f"[⚠️] Topic map batch {i + 1}/{len(batches)} returned invalid JSON: {e}")
+            return []
+
+    results = await asyncio.gather(*(run(i, batch) for i, batch in enumerate(batches)))
+    return list(results), used
+
+
+def _slug(name: str) -> str:
+    words = re.findall(r"[a-z0-9]+", name.lower())
+    # Fold simple plurals so "Agent" and "Agents" merge
+    return "_".join(w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words)
+
+
+def reduce_topics(
+    candidates: Sequence[Sequence[Dict[str, Any]]],
+    min_support: int = 1,
+    max_topics: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Merge per-batch candidates into one ranked, de-duplicated topic list.
+
+    Topics are keyed by category and normalised name. ``support`` counts the
+    batches that proposed a topic. Topics below ``min_support`` are dropped
+    and the rest are ranked by support, then category and name.
+    """
+    merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for batch in candidates:
+        seen_in_batch = set()
+        for topic in batch:
+            name = str(topic.get("name", "")).strip()
+            category = topic.get("category")
+            if not name or category not in CATEGORIES or not _slug(name):
+                continue
+            key = (category, _slug(name))
+            entry = merged.setdefault(key, {
+                "names": Counter(), "description": "", "keywords": Counter(), "support": 0,
+            })
+            entry["names"][name] += 1
+            entry["description"] = entry["description"] or str(topic.get("description", ""))
+            entry["keywords"].update(str(k).lower() for k in topic.get("keywords", []) if str(k).strip())
+            if key not in seen_in_batch:
+                entry["support"] += 1
+                seen_in_batch.add(key)
+
+    topics = []
+    for (category, slug), entry in merged.items():
+        if entry["support"] < min_support:
+            continue
+        name = min(entry["names"], key=lambda n: (-entry["names"][n], n))
+        keywords = sorted(entry["keywords"], key=lambda k: (-entry["keywords"][k], k))[:MAX_KEYWORDS]
+        topics.append({
+            "id": f"{category.lower()}.{slug}",
+            "name": name,
+            "category": category,
+            "description": entry["description"],
+            "keywords": keywords or [name.lower()],
+            "support": entry["support"],
+        })
+    topics.sort(key=lambda t: (-t["support"], t["category"], t["name"]))
+    return topics[:max_topics] if max_topics else topics
+
+
+async def map_reduce_topics(
+    docs: Any,
+    llm: Any,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    seed: int = DEFAULT_SEED,
+    min_support: int = 1,
+    max_topics: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Plan, map and reduce; see the module docstring."""
+    batches = plan_batches(docs, token_budget, seed)
+    covered = sum(len(batch.rows) for batch in batches)
+    planned = sum(batch_cost(batch) for batch in batches)
+    print(
+        f"[🗺️] Topic map: {len(batches)} batches covering {covered}/{len(docs)} chunks "
+        f"(≤{planned} of {token_budget} budgeted tokens, seed {seed})"
+    )
+    candidates, used = await map_topics(batches, llm, concurrency, token_budget)
+    topics = reduce_topics(candidates, min_support, max_topics)
+    print(
+        f"[🧮] Topic reduce: {sum(len(c) for c in candidates)} candidates → {len(topics)} topics"
+        + (f" ({used} tokens used)" if used else "")
+    )
+    return topics
@@ -0,0 +1,335 @@
+"""Process-wide registry of loaded vector stores.
+
+Retrieval nodes used to build a fresh ``OpenAIEmbeddings`` client and call
+``FAISS.load_local`` on every invocation, which deserialised the whole index
+from disk each time. The registry loads every index directory once per process
+and hands out read-only :class:`VectorStoreHandle` objects to all callers. A
+handle is only reloaded when the files backing it change on disk.
+
+Two load modes are supported, both reading chunks from the chunk store the
+index builder writes next to the vectors (see :mod:`tools.mmap_store`).
+``"mmap"`` maps the vectors and decodes chunks lazily. ``"memory"`` reads
+everything into RAM (``"pickle"`` is accepted as an older name for it);
+indexes without a chunk store (legacy ``index.pkl`` layout) are always loaded
+this way through ``FAISS.load_local``. The default, ``"auto"``, uses ``mmap``
+whenever the chunk store is present and consistent with the index, and
+otherwise warns and falls back to an in-memory load. Override it with the
+``TUTOR_INDEX_LOAD_MODE`` environment variable. Either way the search index
+itself may be an ANN variant (IVF, HNSW, IVF-PQ) described by
+``index_meta.json``; see :mod:`tools.ann_index`. Per-category row selections
+(:mod:`tools.partitions`) are loaded alongside it.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from tools.ann_index import (
+    ANN_INDEX_FILE,
+    INDEX_META_FILE,
+    index_kind,
+    load_index_meta,
+    read_search_index,
+    search_parameters,
+    vector_bytes,
+)
+from tools.embedding_cache import CachedQueryEmbeddings, QueryEmbeddingCache, get_query_cache
+from tools.lexical_index import LEXICAL_INDEX_FILE, BM25Index, has_lexical_index
+from tools.mmap_store import MMAP_FILES, has_mmap_docstore, load_in_memory_store, load_mmap_store
+from tools.notices import notice
+from tools.partitions import PARTITIONS_FILE, Partition, load_partitions
+
+
+DOCS_VECTORSTORE_PATH = "embeddings/vector_store"
+
+# Files whose mtime/size make up an index's on-disk signature. ``manifest.json``
+# is optional and only present once the index builder writes one; ``index.pkl``
+# only exists for legacy indexes without a chunk store.
+SIGNATURE_FILES = (
+    "index.faiss", "index.pkl", "manifest.json", LEXICAL_INDEX_FILE, INDEX_META_FILE, ANN_INDEX_FILE,
+    PARTITIONS_FILE,
+) + MMAP_FILES
+
+LOAD_MODES = ("auto", "mmap", "memory")
+# Older names still accepted for TUTOR_INDEX_LOAD_MODE / ``load_mode``
+LOAD_MODE_ALIASES = {"pickle": "memory"}
+DEFAULT_LOAD_MODE = os.getenv("TUTOR_INDEX_LOAD_MODE", "auto")
+
+
+@dataclass(frozen=True)
+class IndexStats:
+    """Load-time facts about a registered index."""
+
+    path: str
+    mode: str
+    num_vectors: int
+    load_seconds: float
+    # Bytes held privately by this process (vectors and/or decoded chunks).
+    resident_bytes: int
+    # Bytes served from a shared, page-cached file mapping.
+    mapped_bytes: int
+    loaded_at: float
+    # ``flat``, ``ivf_flat``, ``hnsw`` or ``ivf_pq`` (see ``tools/ann_index.py``).
+    index_kind: str = "flat"
+
+
+class VectorStoreHandle:
+    """Read-only view over a loaded FAISS vector store.
+
+    Only the search methods used by the nodes are exposed so that callers
+    cannot mutate (``add_texts``/``delete``) a store that is shared by the
+    whole process. ``lexical`` holds the BM25 index built alongside the
+    vectors, or ``None`` if there is none. ``partitions`` maps partition keys
+    (``langchain``, ``langgraph``) to their rows.
+    """
+
+    def __init__(
+        self,
+        store: Any,
+        stats: IndexStats,
+        signature: Tuple,
+        embeddings: Any = None,
+        lexical: Optional[BM25Index] = None,
+        partitions: Optional[Dict[str, Partition]] = None,
+    ):
+        self._store = store
+        self._embeddings = embeddings
+        self.stats = stats
+        self.signature = signature
+        self.lexical = lexical
+        self.partitions = partitions or {}
+
+    @property
+    def num_vectors(self) -> int:
+        return self.stats.num_vectors
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> list:
+        return self._store.similarity_search(query, k=k, **kwargs)
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> list:
+        return self._store.similarity_search_with_score(query, k=k, **kwargs)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> list:
+        return self._store.similarity_search_by_vector(embedding, k=k, **kwargs)
+
+    def embed_query(self, query: str) -> List[float]:
+        return self._embeddings.embed_query(query)
+
+    def search_rows(
+        self,
+        query: str,
+        k: int = 4,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        rescore: Optional[int] = None,
+        partition: Optional[str] = None,
+    ) -> List[Tuple[int, float]]:
+        """Vector search returning ``(row, distance)`` pairs instead of documents.
+
+        ``nprobe`` (IVF kinds), ``ef_search`` (HNSW) and ``rescore`` (candidate
+        multiple re-scored at full precision) override the index's default
+        search parameters for this query only. With a known ``partition`` the
+        same search index only considers that category's rows.
+        """
+        vector = np.asarray([self.embed_query(query)], dtype=np.float32)
+        part = self.partitions.get(partition) if partition else None
+        selector = part.selector if part is not None else None
+        params = search_parameters(self._store.index, nprobe, ef_search, rescore, selector)
+        distances, rows = self._store.index.search(vector, k, params=params)
+        return [(int(row), float(dist)) for row, dist in zip(rows[0], distances[0]) if row != -1]
+
+    def document(self, row: int) -> Any:
+        """Return the chunk stored at FAISS row ``row``."""
+        return self._store.docstore.search(self._store.index_to_docstore_id[row])
+
+
+def index_signature(path: Path) -> Tuple:
+    """Return a cheap fingerprint of the files backing an index directory."""
+    signature = []
+    for name in SIGNATURE_FILES:
+        file_path = path / name
+        try:
+            st = file_path.stat()
+        except FileNotFoundError:
+            continue
+        signature.append((name, st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+
+def _estimate_memory(store: Any, mode: str) -> Tuple[int, int]:
+    """Approximate ``(resident_bytes, mapped_bytes)`` for a loaded store."""
+    search_bytes, rescore_bytes = vector_bytes(store.index)
+    if mode == "mmap":
+        # Only the interned source table is private; vectors and chunks are mapped
+        chunks = store.docstore.chunks
+        resident = sum(len(source) for source in chunks.sources)
+        return resident, search_bytes + rescore_bytes + chunks.nbytes
+    # Full-precision re-scoring vectors are always mapped
+    total = search_bytes
+    docs = getattr(store.docstore, "_dict", {})
+    for doc in docs.values():
+        total += len(doc.page_content.encode("utf-8"))
+    return total, rescore_bytes
+
+
+def _default_embeddings() -> Any:
+    from tools.clients import get_embeddings
+    return get_embeddings()
+
+
+def _load_faiss(path: Path, embeddings: Any) -> Any:
+    from langchain_community.vectorstores import FAISS
+    return FAISS.load_local(
+        str(path),
+        embeddings,
+        allow_dangerous_deserialization=True,
+    )
+
+
+class VectorStoreRegistry:
+    """Load each vector store once per process and share it between nodes.
+
+    Parameters
+    ----------
+    embeddings_factory : callable, optional
+        Zero-argument callable returning the embeddings client used for
+        queries. It is invoked lazily, once per registry.
+    load_mode : str
+        ``"auto"``, ``"mmap"`` or ``"memory"`` (alias ``"pickle"``).
+    query_cache : QueryEmbeddingCache, optional
+        When given, query embeddings are served through this cache.
+    """
+
+    def __init__(
+        self,
+        embeddings_factory: Optional[Callable[[], Any]] = None,
+        load_mode: str = DEFAULT_LOAD_MODE,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+    ):
+        load_mode = LOAD_MODE_ALIASES.get(load_mode, load_mode)
+        if load_mode not in LOAD_MODES:
+            raise ValueError(f"Unknown load mode {load_mode!r}; expected one of {LOAD_MODES}")
+        self._embeddings_factory = embeddings_factory or _default_embeddings
+        self._load_mode = load_mode
+        self._query_cache = query_cache
+        self._embeddings = None
+        self._handles: Dict[str, VectorStoreHandle] = {}
+        self._lock = threading.Lock()
+
+    def _get_embeddings(self) -> Any:
+        if self._embeddings is None:
+            embeddings = self._embeddings_factory()
+            if self._query_cache is not None:
+                embeddings = CachedQueryEmbeddings(embeddings, self._query_cache)
+            self._embeddings = embeddings
+        return self._embeddings
+
+    def _load(self, path: Path) -> Tuple[Any, str]:
+        embeddings = self._get_embeddings()
+        if not has_mmap_docstore(path):
+            if self._load_mode == "mmap":
+                raise FileNotFoundError(f"No chunk store at {path}; re-run tools/prep_docs.py")
+            store = _load_faiss(path, embeddings)
+            if load_index_meta(path):
+                # Same rows, possibly quantized / approximate (see tools/ann_index.py)
+                store.index, _ = read_search_index(path)
+            return store, "pickle"
+        if self._load_mode == "memory":
+            return load_in_memory_store(path, embeddings, ann=True), "memory"
+        if self._load_mode == "mmap":
+            return load_mmap_store(path, embeddings), "mmap"
+        try:
+            return load_mmap_store(path, embeddings), "mmap"
+        except ValueError as e:
+            notice(f"[⚠️] {e}. Falling back to in-memory loading.")
+        if (path / "index.pkl").exists():
+            # A pickled docstore written by an older build
+            return _load_faiss(path, embeddings), "pickle"
+        # The exact flat index, in case only the search index is out of date
+        return load_in_memory_store(path, embeddings), "memory"
+
+    def get(self, path: str = DOCS_VECTORSTORE_PATH) -> VectorStoreHandle:
+        """Return a handle for ``path``, loading or reloading it if needed."""
+        index_path = Path(path)
+        key = str(index_path.resolve())
+        signature = index_signature(index_path)
+        if not signature:
+            raise FileNotFoundError(f"No vector store found at {path}")
+
+        handle = self._handles.get(key)
+        if handle is not None and handle.signature == signature:
+            return handle
+
+        with self._lock:
+            # Another thread may have finished the reload while we waited
+            handle = self._handles.get(key)
+            if handle is not None and handle.signature == signature:
+                return handle
+
+            start = time.perf_counter()
+            store, mode = self._load(index_path)
+            elapsed = time.perf_counter() - start
+
+            resident, mapped = _estimate_memory(store, mode)
+            kind = index_kind(store.index)
+            stats = IndexStats(
+                path=str(path),
+                mode=mode,
+                num_vectors=int(store.index.ntotal),
+                load_seconds=elapsed,
+                resident_bytes=resident,
+                mapped_bytes=mapped,
+                loaded_at=time.time(),
+                index_kind=kind,
+            )
+            verb = "Reloaded" if handle is not None else "Loaded"
+            notice(
+                f"[📦] {verb} {path} ({mode}, {kind}): {stats.num_vectors} vectors in "
+                f"{elapsed * 1000:.0f} ms (~{resident / 1_048_576:.1f} MiB resident, "
+                f"{mapped / 1_048_576:.1f} MiB mapped)"
+            )
+            lexical = None
+            if has_lexical_index(index_path):
+                try:
+                    lexical = BM25Index.load(index_path)
+                except (ValueError, OSError) as e:
+                    notice(f"[⚠️] Ignoring lexical index at {path}: {e}")
+            if lexical is not None and lexical.num_docs != stats.num_vectors:
+                notice(f"[⚠️] Lexical index at {path} is out of date; using vector search only.")
+                lexical = None
+            partitions = load_partitions(index_path, stats.num_vectors)
+            handle = VectorStoreHandle(store, stats, signature, self._get_embeddings(), lexical, partitions)
+            self._handles[key] = handle
+            return handle
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Drop one cached handle (or all of them) so the next ``get`` reloads."""
+        with self._lock:
+            if path is None:
+                self._handles.clear()
+            else:
+                self._handles.pop(str(Path(path).resolve()), None)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Return load time and resident size for every loaded index."""
+        return [asdict(handle.stats) for handle in self._handles.values()]
+
+
+# The shared, process-wide registry used by the agent nodes. Query embeddings
+# go through the persistent query cache (see ``tools/embedding_cache.py``).
+_registry = VectorStoreRegistry(query_cache=get_query_cache())
+
+
+def get_vector_store(path: str = DOCS_VECTORSTORE_PATH) -> VectorStoreHandle:
+    """Return the shared read-only handle for the index stored at ``path``."""
+    return _registry.get(path)
+
+
+def registry_stats() -> List[Dict[str, Any]]:
+    """Return stats for every index loaded by the shared registry."""
+    return _registry.stats()
@@ -3,8 +3,9 @@
 import gradio as gr
 from dotenv import load_dotenv
 import asyncio
-from agents.tutor_agent import define_graph
 from agents.state import TutorAgentState
+from agents.nodes.generate_feedback_node import stream_feedback
+from agents.tutor_agent import define_graph, stream_graph
 from agents.nodes.store_answers_node import embed_and_store_user_answers
 
 
@@ -33,30 +34,43 @@ async def chat(user_input: str, history: list):
     On the first call, the user input is treated as the concept to learn. On
     subsequent calls it is treated as an answer to the current question. The
     agent state is maintained on the ``chat`` function itself.
+
+    This is an async generator: question generation and feedback are streamed
+    to the chat as the model writes them, and the final messages are yielded
+    once the state is complete.
     """
-    # Initialise the graph once
-    if not chat.graph:
-        chat.graph = await define_graph()
     # If this is the first message of the session, set up a new state
     if not chat.session_state:
-        chat.session_state = TutorAgentState(
+        state = TutorAgentState(
             mode="learn",
             target_concept_id=user_input,
             user_input=user_input
         )
-        # Run the graph to get initial questions
-        chat.session_state = await chat.graph.ainvoke(chat.session_state)
+        # Run the graph's learn branch, streaming the questions as they are generated
+        if chat.graph is None:
+            chat.graph = await define_graph()
+        partial = ""
+        async for kind, value in stream_graph(chat.graph, dict(state)):
+            if kind == "text":
+                partial += value
+                yield [{"role": "assistant", "content": f"Preparing questions...\n{partial}"}]
+            else:
+                state = TutorAgentState(**value)
         
         # Set the first question as current if available
-        if chat.session_state.questions:
-            chat.session_state.current_question = chat.session_state.questions[0]
+        if state.questions:
+            state.current_question = state.questions[0]
+        chat.session_state = state
     else:
         # Otherwise treat the input as an answer to the current question
         chat.session_state.user_input = user_input
+        chat.session_state.last_feedback = None
         
-        # Generate feedback
-        from agents.nodes.generate_feedback_node import generate_feedback
-        chat.session_state = await generate_feedback(chat.session_state)
+        # Stream feedback; last_correct is set once the stream completes
+        partial = ""
+        async for text in stream_feedback(chat.session_state):
+            partial += text
+            yield state_to_messages(chat.session_state) + [{"role": "assistant", "content": f"Feedback: {partial}"}]
         
         # Store the answer if correct
         if chat.session_state.last_correct:
@@ -80,11 +94,11 @@ async def chat(user_input: str, history: list):
                     chat.session_state = await suggest_next_unseen_concept(chat.session_state)
                     chat.session_state.current_question = None
             
-    return state_to_messages(chat.session_state)
+    yield state_to_messages(chat.session_state)
 
 
-chat.graph = None  # type: ignore[attr-defined]
 chat.session_state = None  # type: ignore[attr-defined]
+chat.graph = None  # type: ignore[attr-defined]
 
 
 # Instantiate the Gradio chat interface